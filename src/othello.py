@@ -1,22 +1,134 @@
 import os
 import time
 import copy
+import random
+import sqlite3
+import mmap
+import json
+import struct
+import threading
+import multiprocessing
+import concurrent.futures
 
 # === ゲーム設定 ===
-BOARD_SIZE = 8
+BOARD_SIZE = int(os.environ.get("OTHELLO_BOARD_SIZE", "8"))  # 盤面の一辺（4〜26の偶数。10, 12, 16 なども可）
+if BOARD_SIZE % 2 or not 4 <= BOARD_SIZE <= 26:
+    raise ValueError(f"OTHELLO_BOARD_SIZE は4〜26の偶数にしてください: {BOARD_SIZE}")
 PLAYER_STONE = "@"  # プレイヤーの石（黒）
 COMPUTER_STONE = "O"  # コンピュータの石（白）
 EMPTY = "."  # 空のセル
 DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]  # 8方向
-CORNERS = [(0, 0), (0, 7), (7, 0), (7, 7)]  # ボードの角
-MINIMAX_DEPTH = 5  # ミニマックスの探索深さ
+CORNERS = [(0, 0), (0, BOARD_SIZE - 1), (BOARD_SIZE - 1, 0), (BOARD_SIZE - 1, BOARD_SIZE - 1)]  # ボードの角
+MINIMAX_DEPTH = 5  # ミニマックスの探索深さ（時間制限なしで探索する場合）
+SEARCH_TIME_LIMIT = 1.0  # コンピュータの1手あたりの思考時間（秒）
+TIME_CHECK_INTERVAL = 1024  # 時間切れを確認するノード間隔（2のべき乗）
+ASPIRATION_WINDOW = 16  # 反復深化で前の反復の評価値の前後この幅に窓を絞って探索する
+# 手の並べ替えに使うヒューリスティック（置換表の手、角、キラー手、ヒストリー、X・Cマスを後回し）
+MOVE_ORDERING = ("hash", "corner", "killer", "history", "xc")
+SEARCH_WORKERS = 1  # ルートの手を分担して探索するプロセス数（1なら並列化しない）
+# 並列探索のベンチマークで使う中盤の局面（初期局面から黒が先に打った20手。8x8のみ）と探索深さ
+BENCHMARK_MOVES = "e3f5e6d3c4f2f4c5c6d6g5f6c7d7c3b6b5g6d8a5"
+BENCHMARK_DEPTH = 7
+PONDERING = True  # プレイヤーの入力待ちの間に、プレイヤーの各手への応手をバックグラウンドで探索する
+ENDGAME_EMPTIES = 12  # 空きマスがこの数以下になったら最後まで読み切る（ENDGAME_TIME_LIMIT内に読み切れる目安）
+ENDGAME_MODE = "disc"  # 終盤完全読みの目的（"disc": 石数差を最大化、"wld": 勝敗のみ）
+ENDGAME_TIME_LIMIT = 5.0  # 終盤完全読みに使える時間（秒）。読み切れなければ通常の探索を行う
+ENDGAME_FASTEST_FIRST_EMPTIES = 6  # 空きマスがこれより多い局面では相手の着手可能数が少ない手から読む
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "othello_book.bin")  # 定石ブック
+BOOK_PLIES = 6  # 定石ブックに登録する最大の手数（初期局面から）
+BOOK_SEARCH_DEPTH = 6  # 定石ブック作成時に各局面を探索する深さ
+BOOK_MAGIC = b"OBK1"  # 定石ブックファイルの識別子
+BOOK_HEADER = struct.Struct("<4sI")  # 識別子、登録局面数
+BOOK_RECORD = struct.Struct("<QQBxh")  # 手番側の石、相手の石、最善手のマス番号、評価値
+BOOK_KEY = struct.Struct("<QQ")  # レコード先頭の局面部分（二分探索で比較する）
+ANALYSIS_CACHE_PATH = None  # 探索結果をプロセス・ゲームをまたいで保存するSQLiteファイル（Noneなら使わない）
+ANALYSIS_CACHE_MAX_ENTRIES = 1000000  # 解析キャッシュに残す最大の局面数（超えたら最後に使われたのが古い順に消す）
+ANALYSIS_CACHE_TOUCH_INTERVAL = 60.0  # ヒットした局面の最終使用時刻を更新する最小間隔（秒）。書き込みを減らす
 CORNER_VALUE = 25  # 角の評価点
 MOBILITY_VALUE = 5  # 着手可能数の評価点
+# 末端の評価関数（"pattern": パターン評価（8x8のみ）、"simple": 角・着手可能数・石の数）
+EVALUATOR = "pattern" if BOARD_SIZE == 8 else "simple"
+PATTERN_CORNER_VALUE = 30  # パターン評価: 角の石
+PATTERN_X_VALUE = 15  # パターン評価: 角が空いているときのXマスの石（減点）
+PATTERN_C_VALUE = 8  # パターン評価: 角が空いているときのCマスの石（減点）
+PATTERN_EDGE_VALUES = (0, 0, 3, 1, 1, 3, 0, 0)  # パターン評価: 辺の各マスの石の基本点（角・Cマスは別扱い）
+STABLE_VALUE = 6  # パターン評価: 辺の確定石1つあたりの評価点（対角線上は半分）
+FRONTIER_VALUE = 3  # パターン評価: 空きマスに接する石（開放石）1つあたりの評価点（減点）
+BOARD_BACKEND = "bitboard"  # 探索で使う盤面表現（"bitboard" または "list"）
+SEARCH_TRACE_PATH = None  # 探索の統計をJSON Lines形式で1手ごとに追記するファイル（Noneなら記録しない）
+GAME_RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "othello_games.txt")  # 棋譜（Noneなら記録しない）
+TT_SIZE_BITS = 17  # 置換表のエントリ数（2のべき乗）。これを超えてメモリを使わない
+ZOBRIST_SEED = 20240601  # Zobristキー生成用の乱数シード（実行ごとに同じキーにする）
 
 # 初期ボード（中央4マスに黒白の石を配置）
+_CENTER = BOARD_SIZE // 2
 INITIAL_BOARD = [[EMPTY] * BOARD_SIZE for _ in range(BOARD_SIZE)]
-INITIAL_BOARD[3][3], INITIAL_BOARD[3][4] = PLAYER_STONE, COMPUTER_STONE
-INITIAL_BOARD[4][3], INITIAL_BOARD[4][4] = COMPUTER_STONE, PLAYER_STONE
+INITIAL_BOARD[_CENTER - 1][_CENTER - 1], INITIAL_BOARD[_CENTER - 1][_CENTER] = PLAYER_STONE, COMPUTER_STONE
+INITIAL_BOARD[_CENTER][_CENTER - 1], INITIAL_BOARD[_CENTER][_CENTER] = COMPUTER_STONE, PLAYER_STONE
+
+# ビットボード用の定数（マス(row, col)を row * BOARD_SIZE + col 番目のビットに対応させる）
+BB_FULL = (1 << (BOARD_SIZE * BOARD_SIZE)) - 1  # 全マス
+BB_FIRST_COL = sum(1 << (r * BOARD_SIZE) for r in range(BOARD_SIZE))  # a列
+BB_LAST_COL = BB_FIRST_COL << (BOARD_SIZE - 1)  # 右端の列
+BB_NOT_FIRST_COL = BB_FULL ^ BB_FIRST_COL  # 右方向へのシフトで折り返したビットを除くマスク
+BB_NOT_LAST_COL = BB_FULL ^ BB_LAST_COL  # 左方向へのシフトで折り返したビットを除くマスク
+BB_CORNERS = sum(1 << (r * BOARD_SIZE + c) for r, c in CORNERS)  # 角
+# (角のビット, その角に隣接するX・Cマスのビット)。角が空いている間は隣接マスを後回しにする
+BB_CORNER_NEIGHBORS = [
+    (1 << (r * BOARD_SIZE + c),
+     sum(1 << ((r + dr) * BOARD_SIZE + (c + dc)) for dr, dc in DIRECTIONS
+         if 0 <= r + dr < BOARD_SIZE and 0 <= c + dc < BOARD_SIZE))
+    for r, c in CORNERS
+]
+BB_FILL_STEPS = BOARD_SIZE - 3  # 連続する相手の石をたどる追加シフト回数
+# (シフト量, シフト後に残すマスク)。左シフトは下・右方向、右シフトは上・左方向に対応
+BB_LEFT_SHIFTS = [
+    (1, BB_NOT_FIRST_COL),  # 右
+    (BOARD_SIZE, BB_FULL),  # 下
+    (BOARD_SIZE + 1, BB_NOT_FIRST_COL),  # 右下
+    (BOARD_SIZE - 1, BB_NOT_LAST_COL),  # 左下
+]
+BB_RIGHT_SHIFTS = [
+    (1, BB_NOT_LAST_COL),  # 左
+    (BOARD_SIZE, BB_FULL),  # 上
+    (BOARD_SIZE + 1, BB_NOT_LAST_COL),  # 左上
+    (BOARD_SIZE - 1, BB_NOT_FIRST_COL),  # 右上
+]
+
+# 盤面を4分割した象限（終盤の偶数理論による手の並べ替えに使う）
+BB_QUADRANTS = [
+    sum(1 << (r * BOARD_SIZE + c) for r in rows for c in cols)
+    for rows in (range(BOARD_SIZE // 2), range(BOARD_SIZE // 2, BOARD_SIZE))
+    for cols in (range(BOARD_SIZE // 2), range(BOARD_SIZE // 2, BOARD_SIZE))
+]
+
+# 盤面の8通りの対称変換（恒等、左右反転、上下反転、180度回転、転置、90度回転、270度回転、反対角転置）
+_SYMMETRY_MAPS = [
+    lambda r, c: (r, c), lambda r, c: (r, BOARD_SIZE - 1 - c),
+    lambda r, c: (BOARD_SIZE - 1 - r, c), lambda r, c: (BOARD_SIZE - 1 - r, BOARD_SIZE - 1 - c),
+    lambda r, c: (c, r), lambda r, c: (c, BOARD_SIZE - 1 - r),
+    lambda r, c: (BOARD_SIZE - 1 - c, r), lambda r, c: (BOARD_SIZE - 1 - c, BOARD_SIZE - 1 - r),
+]
+# 変換ごとの マス番号 -> 変換後のマス番号 と、その逆変換
+BB_SYMMETRIES = [
+    [row * BOARD_SIZE + col
+     for row, col in (mapping(*divmod(sq, BOARD_SIZE)) for sq in range(BOARD_SIZE * BOARD_SIZE))]
+    for mapping in _SYMMETRY_MAPS
+]
+BB_SYMMETRIES_INVERSE = [
+    [permutation.index(sq) for sq in range(BOARD_SIZE * BOARD_SIZE)] for permutation in BB_SYMMETRIES
+]
+
+# Zobristキー（最大化側・最小化側の石ごと、マスごとの64ビット乱数と手番の乱数）
+_zobrist_random = random.Random(ZOBRIST_SEED)
+ZOBRIST_MAX = [_zobrist_random.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+ZOBRIST_MIN = [_zobrist_random.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+ZOBRIST_FLIP = [a ^ b for a, b in zip(ZOBRIST_MAX, ZOBRIST_MIN)]  # 石の反転で変わる分
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)  # 最小化側の手番
+# 置換表エントリの評価値の種類
+TT_EXACT = 0  # 正確な値
+TT_LOWER = 1  # 下限（β以上で枝刈りした）
+TT_UPPER = 2  # 上限（α以下だった）
 
 # === 画面表示 ===
 def clear_screen():
@@ -40,7 +152,7 @@ def draw_board(board):
 
     処理:
         1. コンソールをクリア。
-        2. 列ラベル（a-h）を表示。
+        2. 列ラベル（a-h。盤面の大きさに合わせる）を表示。
         3. 各行を番号（1-8）とともに表示。
         4. ボードの罫線を表示。
 
@@ -48,11 +160,12 @@ def draw_board(board):
         なし
     """
     clear_screen()
-    print("  a b c d e f g h")  # 列ラベル
-    print(" " + "-" * 17)  # 上部罫線
+    width = len(str(BOARD_SIZE))  # 行番号の桁数
+    print(" " * (width + 1) + " ".join(chr(ord('a') + c) for c in range(BOARD_SIZE)))  # 列ラベル
+    print(" " * width + "-" * (BOARD_SIZE * 2 + 1))  # 上部罫線
     for i, row in enumerate(board, 1):
-        print(f"{i}|{' '.join(row)}")  # 行番号とボード内容
-    print(" " + "-" * 17)  # 下部罫線
+        print(f"{i:>{width}}|{' '.join(row)}")  # 行番号とボード内容
+    print(" " * width + "-" * (BOARD_SIZE * 2 + 1))  # 下部罫線
 
 def display_game_state(board):
     """
@@ -186,13 +299,15 @@ def flip_stones(board, row, col, stone):
     処理:
         1. 指定位置に石を配置。
         2. 8方向をチェックし、挟める相手の石を特定。
-        3. 挟める石を反転。
+        3. 挟める石を反転し、反転した位置を記録。
 
     戻り値:
-        なし（ボードを直接更新）
+        tuple: 元に戻すための記録（row, col, 反転した石の座標リスト）。
+               undo_flip_stonesに渡すと着手前の状態に戻る（ボードは直接更新）
     """
     board[row][col] = stone  # 石を配置
     opponent_stone = COMPUTER_STONE if stone == PLAYER_STONE else PLAYER_STONE
+    flipped = []
     for dr, dc in DIRECTIONS:
         r, c = row + dr, col + dc
         stones_to_flip = []
@@ -202,6 +317,29 @@ def flip_stones(board, row, col, stone):
         if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and board[r][c] == stone:
             for fr, fc in stones_to_flip:
                 board[fr][fc] = stone  # 挟める石を反転
+            flipped.extend(stones_to_flip)
+    return row, col, flipped
+
+def undo_flip_stones(board, undo):
+    """
+    flip_stonesで行った着手を取り消す。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        undo: flip_stonesが返した記録（row, col, 反転した石の座標リスト）
+
+    処理:
+        1. 反転した石を相手の石に戻す。
+        2. 着手位置を空マスに戻す。
+
+    戻り値:
+        なし（ボードを直接更新）
+    """
+    row, col, flipped = undo
+    opponent_stone = COMPUTER_STONE if board[row][col] == PLAYER_STONE else PLAYER_STONE
+    for r, c in flipped:
+        board[r][c] = opponent_stone  # 反転した石を戻す
+    board[row][col] = EMPTY  # 着手位置を空に戻す
 
 def check_game_end(board, player_moves, computer_moves, pass_count):
     """
@@ -229,6 +367,749 @@ def check_game_end(board, player_moves, computer_moves, pass_count):
         return True
     return False
 
+# === ビットボード ===
+def board_to_bitboards(board, stone):
+    """
+    2次元リストのボードを、指定した石から見たビットボードの組に変換する。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        stone: 手番側の石（PLAYER_STONEまたはCOMPUTER_STONE）
+
+    処理:
+        1. 全マスを走査し、自分の石と相手の石の位置をそれぞれビットに立てる。
+
+    戻り値:
+        tuple: (自分の石のビットボード, 相手の石のビットボード)
+    """
+    own = opp = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == stone:
+                own |= bit
+            elif cell != EMPTY:
+                opp |= bit
+            bit <<= 1
+    return own, opp
+
+def bitboards_to_board(own, opp, stone):
+    """
+    ビットボードの組を2次元リストのボードに戻す。
+
+    引数:
+        own: 自分の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        stone: 自分の石（PLAYER_STONEまたはCOMPUTER_STONE）
+
+    処理:
+        1. 各マスのビットを調べ、対応する石または空マスを配置する。
+
+    戻り値:
+        list: 8x8の2次元リスト（ボード状態）
+    """
+    opponent_stone = COMPUTER_STONE if stone == PLAYER_STONE else PLAYER_STONE
+    board = [[EMPTY] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for i in range(BOARD_SIZE):
+        for j in range(BOARD_SIZE):
+            bit = 1 << (i * BOARD_SIZE + j)
+            if own & bit:
+                board[i][j] = stone
+            elif opp & bit:
+                board[i][j] = opponent_stone
+    return board
+
+def bb_get_moves(own, opp):
+    """
+    ビットボード上で手番側の有効な手をまとめて求める。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    処理:
+        1. 8方向それぞれについて、自分の石から連続する相手の石をシフトとマスクでたどる。
+        2. その先の空マスを有効な手として集める。
+
+    戻り値:
+        int: 有効な手のマスにビットが立った整数
+    """
+    empty = BB_FULL & ~(own | opp)
+    moves = 0
+    for shift, mask in BB_LEFT_SHIFTS:
+        line = opp & mask
+        run = line & (own << shift)
+        for _ in range(BB_FILL_STEPS):
+            run |= line & (run << shift)
+        moves |= (run << shift) & mask
+    for shift, mask in BB_RIGHT_SHIFTS:
+        line = opp & mask
+        run = line & (own >> shift)
+        for _ in range(BB_FILL_STEPS):
+            run |= line & (run >> shift)
+        moves |= (run >> shift) & mask
+    return moves & empty
+
+def bb_get_flips(own, opp, move):
+    """
+    ビットボード上で、指定した手により反転する相手の石を求める。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        move: 着手するマスのビット（1ビットだけ立った整数）
+
+    処理:
+        1. 8方向それぞれについて、着手位置から相手の石が続く範囲をたどる。
+        2. その先に自分の石があれば、たどった範囲を反転対象に加える。
+
+    戻り値:
+        int: 反転する石のマスにビットが立った整数
+    """
+    flips = 0
+    for shift, mask in BB_LEFT_SHIFTS:
+        line = 0
+        bit = (move << shift) & mask
+        while bit & opp:
+            line |= bit
+            bit = (bit << shift) & mask
+        if bit & own:
+            flips |= line
+    for shift, mask in BB_RIGHT_SHIFTS:
+        line = 0
+        bit = (move >> shift) & mask
+        while bit & opp:
+            line |= bit
+            bit = (bit >> shift) & mask
+        if bit & own:
+            flips |= line
+    return flips
+
+def bb_zobrist_key(max_bits, min_bits, is_maximizing):
+    """
+    ビットボードの局面からZobristキーを計算する。
+
+    引数:
+        max_bits: 最大化側の石のビットボード（整数）
+        min_bits: 最小化側の石のビットボード（整数）
+        is_maximizing: 最大化側の手番ならTrue
+
+    処理:
+        1. 石のあるマスの乱数をすべてXORする。
+        2. 最小化側の手番ならZOBRIST_SIDEをXORする。
+
+    戻り値:
+        int: 64ビットのZobristキー
+    """
+    key = 0 if is_maximizing else ZOBRIST_SIDE
+    for bits, table in ((max_bits, ZOBRIST_MAX), (min_bits, ZOBRIST_MIN)):
+        while bits:
+            bit = bits & -bits
+            key ^= table[bit.bit_length() - 1]
+            bits ^= bit
+    return key
+
+def bb_flip_key(flips):
+    """
+    反転する石によるZobristキーの変化分を求める。
+
+    引数:
+        flips: 反転する石のビットボード（整数）
+
+    処理:
+        1. 反転する各マスについてZOBRIST_FLIPをXORする。
+
+    戻り値:
+        int: 元のキーにXORする値
+    """
+    key = 0
+    while flips:
+        bit = flips & -flips
+        key ^= ZOBRIST_FLIP[bit.bit_length() - 1]
+        flips ^= bit
+    return key
+
+def bb_to_moves(moves):
+    """
+    手のビットボードを座標のリストに変換する。
+
+    引数:
+        moves: 有効な手のマスにビットが立った整数
+
+    処理:
+        1. 下位ビット（左上のマス）から順に取り出し、(row, col) に変換する。
+
+    戻り値:
+        list: 有効な手の座標リスト（get_valid_movesと同じ行優先の順）
+    """
+    result = []
+    while moves:
+        bit = moves & -moves
+        index = bit.bit_length() - 1
+        result.append(divmod(index, BOARD_SIZE))
+        moves ^= bit
+    return result
+
+# === パターン評価 ===
+def _gather_multiplier(positions):
+    """
+    指定したマスのビットを、掛け算1回で連続したビットに集める乗数を求める。
+
+    引数:
+        positions: 集めるマス番号の並び（j番目のマスが結果のjビット目になる）
+
+    処理:
+        1. 各マスを目的の位置に移す2のべき乗の和を乗数の候補とし、結果を取り出すシフト量を順に試す。
+        2. 全2 ** len(positions) 通りの石の配置で、桁上がりなどで結果が崩れないかを確かめる。
+
+    戻り値:
+        tuple: (マスク, 乗数, シフト量)。 ((bits & マスク) * 乗数 >> シフト量) の下位ビットが集めた結果
+    """
+    mask = sum(1 << p for p in positions)
+    width = (1 << len(positions)) - 1
+    for shift in range(max(positions), max(positions) + BOARD_SIZE * BOARD_SIZE):
+        if any(shift + j < p for j, p in enumerate(positions)):
+            continue
+        multiplier = sum(1 << (shift + j - p) for j, p in enumerate(positions))
+        for bits in range(width + 1):
+            board_bits = sum(1 << p for j, p in enumerate(positions) if bits >> j & 1)
+            if board_bits * multiplier >> shift & width != bits:
+                break
+        else:
+            return mask, multiplier, shift
+    raise ValueError(f"ビットを集める乗数が見つかりません: {positions}")
+
+def _edge_pattern_value(line):
+    """
+    辺の8マスのパターンの評価値を求める（パターン評価の表を作るときだけ使う）。
+
+    引数:
+        line: 角から角までの8マスの状態（1: 評価する側、-1: 相手、0: 空き）
+
+    処理:
+        1. 角が空いていれば、隣のCマスの石を減点する。
+        2. 角以外の石にPATTERN_EDGE_VALUESの基本点を加える。
+        3. 石の埋まった角から同じ色で続く石、または8マスすべて埋まった辺の石を確定石として加点する。
+           （角自体の点は隅の3x3パターンで数える）
+
+    戻り値:
+        int: 評価する側から見た評価値（左右反転しても同じ値になる）
+    """
+    value = sum(PATTERN_EDGE_VALUES[i] * line[i] for i in range(1, 7))
+    for corner, c_square in ((0, 1), (7, 6)):
+        if not line[corner]:
+            value -= PATTERN_C_VALUE * line[c_square]
+    stable = [all(line)] * 8
+    for start, step in ((0, 1), (7, -1)):
+        i = start
+        while line[start] and 0 <= i < 8 and line[i] == line[start]:
+            stable[i] = True
+            i += step
+    return value + sum(STABLE_VALUE * line[i] for i in range(1, 7) if stable[i])
+
+def _diagonal_pattern_value(line):
+    """
+    対角線の8マスのパターンの評価値を求める（パターン評価の表を作るときだけ使う）。
+
+    引数:
+        line: 角から角までの対角線の8マスの状態（1: 評価する側、-1: 相手、0: 空き）
+
+    処理:
+        1. 石の埋まった角から同じ色で続く石を、確定石の半分の点で加点する（角自体は除く）。
+
+    戻り値:
+        int: 評価する側から見た評価値（逆向きに並べても同じ値になる）
+    """
+    value = 0
+    for start, step in ((0, 1), (7, -1)):
+        i = start + step
+        while line[start] and 0 <= i < 8 and line[i] == line[start]:
+            value += STABLE_VALUE // 2 * line[i]
+            i += step
+    return value
+
+def _corner_pattern_value(cells):
+    """
+    隅の3x3マスのパターンの評価値を求める（パターン評価の表を作るときだけ使う）。
+
+    引数:
+        cells: 角を(0, 0)とした3x3マスの状態を r * 3 + c の順に並べたもの（1: 評価する側、-1: 相手、0: 空き）
+
+    処理:
+        1. 角の石を加点する。
+        2. 角が空いていれば、斜め隣のXマスの石を減点する。
+
+    戻り値:
+        int: 評価する側から見た評価値
+    """
+    value = PATTERN_CORNER_VALUE * cells[0]
+    if not cells[0]:
+        value -= PATTERN_X_VALUE * cells[4]
+    return value
+
+def _build_pattern_table(size, value, order=None):
+    """
+    パターンの全配置の評価値を、3進数の番号で引ける表にする。
+
+    引数:
+        size: パターンのマス数
+        value: マスの状態の並び（-1, 0, 1）から評価値を返す関数
+        order: 番号のj桁目のマスが、valueに渡す並びの何番目かを表すリスト（省略時はそのまま）
+
+    処理:
+        1. 0から 3 ** size - 1 までの番号を3進数の各桁（0: 空き、1: 評価する側、2: 相手）に分解する。
+        2. orderに従って並べ替え、valueで評価値を求める。
+
+    戻り値:
+        list: 番号 -> 評価値
+    """
+    order = order or list(range(size))
+    table = []
+    for index in range(3 ** size):
+        cells = [0] * size
+        for j in range(size):
+            cells[order[j]] = (0, 1, -1)[index // 3 ** j % 3]
+        table.append(value(cells))
+    return table
+
+if BOARD_SIZE == 8:  # パターンの表は8x8の盤面用（ほかの大きさでは"simple"で評価する）
+    # ビットの並び（最大9ビット）-> 3進数の番号（評価する側の石は1、相手の石は2の桁）
+    PATTERN_BASE3 = [sum(3 ** j for j in range(9) if bits >> j & 1) for bits in range(1 << 9)]
+    PATTERN_BASE3_OPP = [2 * index for index in PATTERN_BASE3]
+    # 辺・対角線のビットを集める (マスク, 乗数, シフト量)。行は1バイトなのでシフトだけで取り出す
+    PATTERN_A_COL = _gather_multiplier([r * BOARD_SIZE for r in range(BOARD_SIZE)])
+    PATTERN_H_COL = _gather_multiplier([r * BOARD_SIZE + BOARD_SIZE - 1 for r in range(BOARD_SIZE)])
+    PATTERN_DIAGONAL = _gather_multiplier([i * (BOARD_SIZE + 1) for i in range(BOARD_SIZE)])
+    PATTERN_ANTI_DIAGONAL = _gather_multiplier([(BOARD_SIZE - 1 - i) * BOARD_SIZE + i for i in range(BOARD_SIZE)])
+    # 起動時に一度だけ作る評価値の表（辺・対角線は向きによらず同じ表、隅は取り出すビットの並びが隅ごとに違う）
+    PATTERN_EDGE_TABLE = _build_pattern_table(8, _edge_pattern_value)
+    PATTERN_DIAGONAL_TABLE = _build_pattern_table(8, _diagonal_pattern_value)
+    PATTERN_CORNER_TABLES = [
+        _build_pattern_table(9, _corner_pattern_value, [(r if top else 2 - r) * 3 + (c if left else 2 - c)
+                                                        for r in range(3) for c in range(3)])
+        for top, left in ((True, True), (True, False), (False, True), (False, False))  # a1, h1, a8, h8
+    ]
+    # パターンの全インスタンス（評価値の表, 番号の0桁目から順に対応するマス番号）。bb_pattern_evaluateと同じ10か所
+    PATTERN_INSTANCES = [
+        (PATTERN_EDGE_TABLE, [c for c in range(BOARD_SIZE)]),  # 1行目
+        (PATTERN_EDGE_TABLE, [(BOARD_SIZE - 1) * BOARD_SIZE + c for c in range(BOARD_SIZE)]),  # 8行目
+        (PATTERN_EDGE_TABLE, [r * BOARD_SIZE for r in range(BOARD_SIZE)]),  # a列
+        (PATTERN_EDGE_TABLE, [r * BOARD_SIZE + BOARD_SIZE - 1 for r in range(BOARD_SIZE)]),  # h列
+        (PATTERN_DIAGONAL_TABLE, [i * (BOARD_SIZE + 1) for i in range(BOARD_SIZE)]),  # a1-h8
+        (PATTERN_DIAGONAL_TABLE, [(BOARD_SIZE - 1 - i) * BOARD_SIZE + i for i in range(BOARD_SIZE)]),  # a8-h1
+    ] + [
+        (table, [(row + r) * BOARD_SIZE + col + c for r in range(3) for c in range(3)])
+        for table, (row, col) in zip(PATTERN_CORNER_TABLES, ((0, 0), (0, 5), (5, 0), (5, 5)))  # a1, h1, a8, h8
+    ]
+else:
+    PATTERN_INSTANCES = []
+
+
+def bb_neighbors(bits):
+    """
+    指定したマスに8方向で隣接するマスを求める。
+
+    引数:
+        bits: マスのビットボード（整数）
+
+    戻り値:
+        int: 隣接するマスのビットボード（元のマスを含むことがある）
+    """
+    neighbors = 0
+    for shift, mask in BB_LEFT_SHIFTS:
+        neighbors |= (bits << shift) & mask
+    for shift, mask in BB_RIGHT_SHIFTS:
+        neighbors |= (bits >> shift) & mask
+    return neighbors
+
+def bb_pattern_evaluate(own, opp):
+    """
+    パターン評価の表を引いてビットボードを評価する。
+
+    引数:
+        own: 評価する側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    処理:
+        1. 4辺・2本の対角線・4隅の3x3マスについて、両者の石のビットを集めて3進数の番号にし、表を引く。
+           （表には角・Xマス・Cマスの扱いと、辺・対角線の確定石の評価が含まれている）
+        2. 空きマスに接する石（開放石）の数の差を減点する。
+        3. 着手可能数の差（bb_mobility）を加点する。
+
+    戻り値:
+        int: ボードの評価スコア（ownにとって高いほど良い）
+    """
+    b3 = PATTERN_BASE3
+    b3_opp = PATTERN_BASE3_OPP
+    edge = PATTERN_EDGE_TABLE
+    diagonal = PATTERN_DIAGONAL_TABLE
+    corner_a1, corner_h1, corner_a8, corner_h8 = PATTERN_CORNER_TABLES
+    score = edge[b3[own & 0xFF] + b3_opp[opp & 0xFF]]  # 1行目
+    score += edge[b3[own >> 56] + b3_opp[opp >> 56]]  # 8行目
+    for mask, multiplier, shift in (PATTERN_A_COL, PATTERN_H_COL):
+        score += edge[b3[(own & mask) * multiplier >> shift & 0xFF] + b3_opp[(opp & mask) * multiplier >> shift & 0xFF]]
+    for mask, multiplier, shift in (PATTERN_DIAGONAL, PATTERN_ANTI_DIAGONAL):
+        score += diagonal[b3[(own & mask) * multiplier >> shift & 0xFF]
+                          + b3_opp[(opp & mask) * multiplier >> shift & 0xFF]]
+    score += corner_a1[b3[own & 7 | own >> 5 & 0x38 | own >> 10 & 0x1C0]
+                       + b3_opp[opp & 7 | opp >> 5 & 0x38 | opp >> 10 & 0x1C0]]
+    score += corner_h1[b3[own >> 5 & 7 | own >> 10 & 0x38 | own >> 15 & 0x1C0]
+                       + b3_opp[opp >> 5 & 7 | opp >> 10 & 0x38 | opp >> 15 & 0x1C0]]
+    score += corner_a8[b3[own >> 40 & 7 | own >> 45 & 0x38 | own >> 50 & 0x1C0]
+                       + b3_opp[opp >> 40 & 7 | opp >> 45 & 0x38 | opp >> 50 & 0x1C0]]
+    score += corner_h8[b3[own >> 45 & 7 | own >> 50 & 0x38 | own >> 55 & 0x1C0]
+                       + b3_opp[opp >> 45 & 7 | opp >> 50 & 0x38 | opp >> 55 & 0x1C0]]
+    frontier = bb_neighbors(BB_FULL & ~(own | opp))
+    score -= ((own & frontier).bit_count() - (opp & frontier).bit_count()) * FRONTIER_VALUE
+    return score + bb_mobility(own, opp) * MOBILITY_VALUE
+
+# === 置換表 ===
+class TranspositionTable:
+    """
+    Zobristキーで局面の探索結果を引く固定サイズの置換表。
+
+    属性:
+        mask: キーからスロット番号を求めるマスク
+        slots: エントリ（key, depth, flag, score, move, age）またはNoneのリスト
+        age: 探索の世代（find_best_moveの呼び出しごとに1増える）
+
+    スロット数は 2 ** TT_SIZE_BITS で固定し、エントリ数がそれを超えることはない。
+    ターンをまたいで保持し、前のターンの探索結果も再利用する。
+    """
+
+    def __init__(self, size_bits=TT_SIZE_BITS):
+        self.mask = (1 << size_bits) - 1
+        self.slots = [None] * (1 << size_bits)
+        self.age = 0
+
+    def new_search(self):
+        """
+        新しい探索の開始を記録し、世代を進める。
+
+        戻り値:
+            なし
+        """
+        self.age += 1
+
+    def clear(self):
+        """
+        すべてのエントリを消去する。
+
+        戻り値:
+            なし
+        """
+        self.slots = [None] * len(self.slots)
+        self.age = 0
+
+    def probe(self, key):
+        """
+        局面のエントリを取得する。
+
+        引数:
+            key: 局面のZobristキー
+
+        戻り値:
+            tuple or None: (key, depth, flag, score, move, age)。見つからなければNone
+        """
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        """
+        探索結果を保存する。
+
+        引数:
+            key: 局面のZobristキー
+            depth: 探索した残り深さ
+            flag: TT_EXACT、TT_LOWER、TT_UPPERのいずれか
+            score: 評価値（最大化側から見た値）
+            move: 最善手のビット（なければ0）
+
+        処理:
+            1. スロットが空、古い世代のエントリ、または保存済み以上の深さの探索なら置き換える。
+            2. それ以外（今回の探索で得た、より深い結果）は残す。
+
+        戻り値:
+            なし
+        """
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None or entry[5] != self.age or depth >= entry[1]:
+            self.slots[index] = (key, depth, flag, score, move, self.age)
+
+    def usage(self):
+        """
+        使用中のスロット数を数える。
+
+        戻り値:
+            int: Noneでないスロットの数
+        """
+        return sum(1 for entry in self.slots if entry is not None)
+
+TRANSPOSITION_TABLE = TranspositionTable()  # ターンをまたいで共有する置換表
+
+# === 探索の状態 ===
+class SearchTimeout(Exception):
+    """
+    思考時間を使い切ったときに探索を打ち切るための例外。
+    """
+
+class SearchContext:
+    """
+    1回の find_best_move の間、探索全体で共有する状態。
+
+    属性:
+        deadline: 打ち切り時刻（time.perf_counter()の値）。Noneなら時間制限なし
+        nodes: 訪れたノード数
+        completed_depth: 最後に完了した反復深化の深さ
+        pv_moves: 前の反復の読み筋（Zobristキー -> 手のビット）。各局面で最初に試す
+        table: 使用する置換表
+        ordering: 有効にする手の並べ替えヒューリスティック（MOVE_ORDERINGの部分集合）
+        root_depth: 現在の反復の探索深さ（root_depth - depth が手数（ply）になる）
+        killers: 手数ごとに直近でβカットを起こした手（2手分）
+        history: 手番側ごと・マスごとのヒストリースコア（βカットで深さの2乗を加算）
+        workers: ルートの手を分担するプロセス数（1なら並列化しない）
+        best_score: 最後に完了した反復の最善手の評価値
+        scores: 完了した反復ごとの最善手の評価値（深さ1から順）
+        best_move: 最後に完了した反復の最善手のビット
+        root_moves: 最後に完了した反復のスコア順に並べたルートの手（続きの反復で使う）
+        stats: 探索の統計を集計するSearchStats。Noneなら集計しない
+        cache_hit: 探索せずに解析キャッシュの結果を使ったならTrue（bb_search_with_cacheが設定する）
+    """
+
+    def __init__(self, deadline=None, table=None, ordering=MOVE_ORDERING, workers=1, stats=None):
+        self.deadline = deadline
+        self.nodes = 0
+        self.completed_depth = 0
+        self.pv_moves = {}
+        self.table = TRANSPOSITION_TABLE if table is None else table
+        self.ordering = frozenset(ordering)
+        self.root_depth = 0
+        self.killers = [[0, 0] for _ in range(BOARD_SIZE * BOARD_SIZE + 1)]
+        self.history = [[0] * (BOARD_SIZE * BOARD_SIZE), [0] * (BOARD_SIZE * BOARD_SIZE)]
+        self.workers = workers
+        self.best_score = 0
+        self.scores = []
+        self.best_move = 0
+        self.root_moves = []
+        self.stats = stats
+        self.cache_hit = False
+
+class SearchStats:
+    """
+    1回の探索の統計。SearchContext.statsに設定したときだけ集計する
+    （設定しなければ、探索はNoneの確認以外に何もしない）。
+
+    属性:
+        nodes: 訪れたノード数（探索終了時にSearchContext.nodesから写す）
+        leaves: 深さ0で静的評価したノード数
+        beta_cutoffs: βカット（枝刈り）の回数
+        first_move_cutoffs: 最初に試した手でβカットした回数
+        tt_hits: 置換表に局面のエントリが見つかった回数
+        seconds: 探索にかかった時間（秒）
+        iterations: 完了した反復ごとの {"depth", "nodes", "seconds", "score", "move", "root_moves"}
+                    （root_movesはルートの手ごとの {"move", "score", "nodes", "seconds"}）
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_hits = 0
+        self.seconds = 0.0
+        self.iterations = []
+        self._start = time.perf_counter()
+        self._iteration_start = (self._start, 0)
+        self._root_moves = []
+
+    def start_iteration(self, nodes):
+        """
+        反復深化の1回分の開始を記録する。
+
+        引数:
+            nodes: 開始時点のノード数
+
+        戻り値:
+            なし
+        """
+        self._iteration_start = (time.perf_counter(), nodes)
+        self._root_moves = []
+
+    def record_root_move(self, move, score, nodes, seconds):
+        """
+        ルートの1手の探索結果を記録する。
+
+        引数:
+            move: 手のビット
+            score: 評価値（最善手以外はαで打ち切った上限のこともある）
+            nodes: その手の探索で訪れたノード数
+            seconds: その手の探索にかかった時間（秒）
+
+        戻り値:
+            なし
+        """
+        self._root_moves.append({"move": move_to_text(move), "score": score, "nodes": nodes, "seconds": seconds})
+
+    def finish_iteration(self, depth, nodes, score, move):
+        """
+        完了した反復を記録する（時間切れで捨てた反復は記録しない）。
+
+        引数:
+            depth: 反復の探索深さ
+            nodes: 終了時点のノード数
+            score: 最善手の評価値
+            move: 最善手のビット
+
+        戻り値:
+            なし
+        """
+        start, start_nodes = self._iteration_start
+        self.iterations.append({"depth": depth, "nodes": nodes - start_nodes, "seconds": time.perf_counter() - start,
+                                "score": score, "move": move_to_text(move), "root_moves": self._root_moves})
+        self._root_moves = []
+
+    def finish(self, nodes):
+        """
+        探索の終了を記録する。
+
+        引数:
+            nodes: 探索全体のノード数
+
+        戻り値:
+            なし
+        """
+        self.nodes = nodes
+        self.seconds = time.perf_counter() - self._start
+
+    def merge(self, counters):
+        """
+        ワーカープロセスで集計したカウンタを加える。
+
+        引数:
+            counters: (leaves, beta_cutoffs, first_move_cutoffs, tt_hits) のタプル
+
+        戻り値:
+            なし
+        """
+        self.leaves += counters[0]
+        self.beta_cutoffs += counters[1]
+        self.first_move_cutoffs += counters[2]
+        self.tt_hits += counters[3]
+
+    def counters(self):
+        """
+        ワーカープロセスから親プロセスに返すカウンタを取り出す。
+
+        戻り値:
+            tuple: (leaves, beta_cutoffs, first_move_cutoffs, tt_hits)
+        """
+        return self.leaves, self.beta_cutoffs, self.first_move_cutoffs, self.tt_hits
+
+    def tt_hit_rate(self):
+        """
+        置換表のヒット率を求める（深さ0以外のノードはすべて置換表を引く）。
+
+        戻り値:
+            float: ヒット数 / 置換表を引いた回数（引いていなければ0.0）
+        """
+        probes = self.nodes - self.leaves
+        return self.tt_hits / probes if probes > 0 else 0.0
+
+    def first_move_cutoff_rate(self):
+        """
+        βカットのうち、最初に試した手で起きた割合を求める（手の並べ替えの良さの目安）。
+
+        戻り値:
+            float: 最初の手でのβカット数 / βカット数（βカットがなければ0.0）
+        """
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    def effective_branching_factor(self):
+        """
+        実効分岐数（最後の反復のノード数 / その1つ前の反復のノード数）を求める。
+
+        戻り値:
+            float or None: 実効分岐数（完了した反復が2回未満ならNone）
+        """
+        if len(self.iterations) < 2 or not self.iterations[-2]["nodes"]:
+            return None
+        return self.iterations[-1]["nodes"] / self.iterations[-2]["nodes"]
+
+    def to_dict(self):
+        """
+        統計をJSONに変換できる辞書にまとめる。
+
+        戻り値:
+            dict: カウンタ、比率、反復ごとの記録
+        """
+        return {
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "beta_cutoffs": self.beta_cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate(),
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": self.tt_hit_rate(),
+            "effective_branching_factor": self.effective_branching_factor(),
+            "seconds": self.seconds,
+            "nps": self.nodes / self.seconds if self.seconds else 0.0,
+            "completed_depth": self.iterations[-1]["depth"] if self.iterations else 0,
+            "iterations": self.iterations,
+        }
+
+def move_to_text(move):
+    """
+    手のビットを "d3" のような表記に変換する。
+
+    引数:
+        move: 手のビット（0ならパス）
+
+    戻り値:
+        str: 列の英字と行番号（パスなら "pass"）
+    """
+    if not move:
+        return "pass"
+    row, col = divmod(move.bit_length() - 1, BOARD_SIZE)
+    return f"{chr(ord('a') + col)}{row + 1}"
+
+def text_to_move(text):
+    """
+    "d3" のような表記を手のビットに変換する（move_to_textの逆）。
+
+    引数:
+        text: 列の英字と行番号、または "pass"（大文字・小文字は区別しない）
+
+    戻り値:
+        int: 手のビット（パスなら0）
+
+    例外:
+        ValueError: 表記が正しくない場合
+    """
+    text = text.strip().lower()
+    if text == "pass":
+        return 0
+    if (not 2 <= len(text) <= 3 or not "a" <= text[0] < chr(ord("a") + BOARD_SIZE) or not text[1:].isdigit()
+            or not 1 <= int(text[1:]) <= BOARD_SIZE):
+        raise ValueError(f"手の表記が正しくありません: {text}")
+    return 1 << ((int(text[1:]) - 1) * BOARD_SIZE + ord(text[0]) - ord("a"))
+
+def write_search_trace(path, record):
+    """
+    探索の記録をJSON Lines形式で1行追記する。
+
+    引数:
+        path: 追記するファイルのパス
+        record: JSONに変換できる辞書
+
+    戻り値:
+        なし
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
 # === AIロジック ===
 def evaluate_board(board):
     """
@@ -238,34 +1119,146 @@ def evaluate_board(board):
         board: 8x8の2次元リスト（ボード状態）
 
     処理:
-        1. 角の石を評価（コンピュータ有利なら加点、プレイヤー有利なら減点）。
-        2. 着手可能数を評価（コンピュータが多いと加点）。
-        3. 石の数を評価（コンピュータが多いと加点）。
-        4. 総合スコアを返す。
+        1. ボードをコンピュータから見たビットボードに変換。
+        2. bb_evaluateで評価する（EVALUATORに応じてパターン評価、または角・着手可能数・石の数）。
 
     戻り値:
         int: ボードの評価スコア（コンピュータにとって高いほど良い）
     """
-    score = 0
-    player_count, computer_count = get_stone_counts(board)  # 石の数取得
-    # 角の評価
-    for r, c in CORNERS:
-        if board[r][c] == COMPUTER_STONE:
-            score += CORNER_VALUE  # コンピュータが角を確保
-        elif board[r][c] == PLAYER_STONE:
-            score -= CORNER_VALUE  # プレイヤーが角を確保
-    # 着手可能数の評価
-    computer_mobility = len(get_valid_moves(board, COMPUTER_STONE))
-    player_mobility = len(get_valid_moves(board, PLAYER_STONE))
-    score += (computer_mobility - player_mobility) * MOBILITY_VALUE
-    # 石の数の評価
-    score += computer_count - player_count
-    return score
+    computer, player = board_to_bitboards(board, COMPUTER_STONE)
+    return bb_evaluate(computer, player)
+
+def bb_evaluate(own, opp):
+    """
+    ビットボードを評価してスコアを計算する。
+
+    引数:
+        own: 評価する側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    処理:
+        1. EVALUATORが"pattern"なら、bb_pattern_evaluateで評価する。
+        2. それ以外は角の石と石の数（bb_material）と、着手可能数（bb_mobilityで両者の手の数の差を
+           popcountで求める）を評価する。
+        3. 総合スコアを返す。
+
+    戻り値:
+        int: ボードの評価スコア（ownにとって高いほど良い）
+    """
+    if EVALUATOR == "pattern":
+        return bb_pattern_evaluate(own, opp)
+    return bb_material(own, opp) + bb_mobility(own, opp) * MOBILITY_VALUE
+
+def bb_material(own, opp):
+    """
+    評価値のうち、着手によって差分で更新できる部分（角と石の数）を計算する。
+
+    引数:
+        own: 評価する側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    処理:
+        1. 角の石を評価（自分が確保していれば加点、相手なら減点）。
+        2. 石の数を評価（自分が多いと加点）。
+
+    戻り値:
+        int: 角と石の数による評価値（ownにとって高いほど良い）
+    """
+    score = ((own & BB_CORNERS).bit_count() - (opp & BB_CORNERS).bit_count()) * CORNER_VALUE
+    return score + own.bit_count() - opp.bit_count()
+
+def bb_material_delta(move, flips):
+    """
+    着手による bb_material の変化量を求める（着手した側から見た値）。
+
+    引数:
+        move: 着手するマスのビット
+        flips: 反転する石のビットボード（整数）
+
+    処理:
+        1. 置いた石1つと反転した石（相手が減って自分が増えるので2倍）を数える。
+        2. 角に置いた場合は角の評価点を加える（角の石は反転しないので、置いたときだけ変わる）。
+
+    戻り値:
+        int: 着手した側にとっての bb_material の増加量
+    """
+    delta = 2 * flips.bit_count() + 1
+    if move & BB_CORNERS:
+        delta += CORNER_VALUE
+    return delta
+
+def bb_mobility(own, opp):
+    """
+    両者の着手可能数の差を1回の走査で求める。
+
+    引数:
+        own: 評価する側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    処理:
+        1. 8方向それぞれについて、bb_get_movesと同じシフトとマスクの計算を両者分まとめて行う。
+        2. 空マスに限った手のビット数（popcount）の差を返す。
+
+    戻り値:
+        int: ownの着手可能数 - oppの着手可能数
+    """
+    empty = BB_FULL & ~(own | opp)
+    own_moves = opp_moves = 0
+    for shift, mask in BB_LEFT_SHIFTS:
+        own_line = opp & mask
+        opp_line = own & mask
+        own_run = own_line & (own << shift)
+        opp_run = opp_line & (opp << shift)
+        for _ in range(BB_FILL_STEPS):
+            own_run |= own_line & (own_run << shift)
+            opp_run |= opp_line & (opp_run << shift)
+        own_moves |= (own_run << shift) & mask
+        opp_moves |= (opp_run << shift) & mask
+    for shift, mask in BB_RIGHT_SHIFTS:
+        own_line = opp & mask
+        opp_line = own & mask
+        own_run = own_line & (own >> shift)
+        opp_run = opp_line & (opp >> shift)
+        for _ in range(BB_FILL_STEPS):
+            own_run |= own_line & (own_run >> shift)
+            opp_run |= opp_line & (opp_run >> shift)
+        own_moves |= (own_run >> shift) & mask
+        opp_moves |= (opp_run >> shift) & mask
+    return (own_moves & empty).bit_count() - (opp_moves & empty).bit_count()
 
 def minimax(board, depth, is_maximizing, alpha, beta):
     """
     アルファベータ枝刈り付きミニマックスでボードの最善手を評価する。
 
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        depth: 残りの探索深さ（整数）
+        is_maximizing: コンピュータ（最大化: True）かプレイヤー（最小化: False）か
+        alpha: 最大化プレイヤーが確保できる最低スコア（整数またはfloat('-inf')）
+        beta: 最小化プレイヤーが許容する最高スコア（整数またはfloat('inf')）
+
+    処理:
+        1. BOARD_BACKENDが"list"ならlist_minimaxで探索する。
+        2. それ以外はビットボードに変換し、手番側から見たbb_negamaxの値をコンピュータから見た値に直す。
+
+    戻り値:
+        int: 評価スコア（コンピュータにとって高いほど良い）
+    """
+    if BOARD_BACKEND == "list":
+        return list_minimax(board, depth, is_maximizing, alpha, beta)
+    computer, player = board_to_bitboards(board, COMPUTER_STONE)
+    key = bb_zobrist_key(computer, player, is_maximizing)
+    material = bb_material(computer, player)
+    ctx = SearchContext()
+    ctx.root_depth = depth  # この局面を手数0として数える
+    if is_maximizing:
+        return bb_negamax(computer, player, depth, alpha, beta, key, material, 0, ctx)
+    return -bb_negamax(player, computer, depth, -beta, -alpha, key, -material, 1, ctx)
+
+def list_minimax(board, depth, is_maximizing, alpha, beta):
+    """
+    2次元リストのボードのままミニマックスで評価する（"list"バックエンド）。
+
     引数:
         board: 8x8の2次元リスト（ボード状態）
         depth: 残りの探索深さ（整数）
@@ -293,12 +1286,12 @@ def minimax(board, depth, is_maximizing, alpha, beta):
         valid_moves = get_valid_moves(board, COMPUTER_STONE)
         if not valid_moves:
             # 有効な手がない場合、パスして相手のターンで再評価
-            return minimax(board, depth - 1, False, alpha, beta)
+            return list_minimax(board, depth - 1, False, alpha, beta)
         for move in valid_moves:
-            # 手を試し、次の状態を評価
-            new_board = copy.deepcopy(board)
-            flip_stones(new_board, move[0], move[1], COMPUTER_STONE)
-            score = minimax(new_board, depth - 1, False, alpha, beta)
+            # 手をその場で試し、次の状態を評価してから元に戻す
+            undo = flip_stones(board, move[0], move[1], COMPUTER_STONE)
+            score = list_minimax(board, depth - 1, False, alpha, beta)
+            undo_flip_stones(board, undo)
             best_score = max(best_score, score)
             alpha = max(alpha, best_score)  # アルファを更新
             if beta <= alpha:
@@ -311,21 +1304,1221 @@ def minimax(board, depth, is_maximizing, alpha, beta):
         valid_moves = get_valid_moves(board, PLAYER_STONE)
         if not valid_moves:
             # 有効な手がない場合、パスして相手のターンで再評価
-            return minimax(board, depth - 1, True, alpha, beta)
+            return list_minimax(board, depth - 1, True, alpha, beta)
         for move in valid_moves:
-            # 手を試し、次の状態を評価
-            new_board = copy.deepcopy(board)
-            flip_stones(new_board, move[0], move[1], PLAYER_STONE)
-            score = minimax(new_board, depth - 1, True, alpha, beta)
+            # 手をその場で試し、次の状態を評価してから元に戻す
+            undo = flip_stones(board, move[0], move[1], PLAYER_STONE)
+            score = list_minimax(board, depth - 1, True, alpha, beta)
+            undo_flip_stones(board, undo)
             best_score = min(best_score, score)
             beta = min(beta, best_score)  # ベータを更新
             if beta <= alpha:
                 break  # 枝刈り: これ以上の探索は不要
         return best_score
 
-def find_best_move(board, stone, depth):
+def bb_order_moves(moves, empty, first_moves, ply, side, ctx):
     """
-    アルファベータ枝刈り付きミニマックスで最善手を選択する。
+    アルファベータ枝刈りが早く起きるように手を並べ替える。
+
+    引数:
+        moves: 有効な手のビットボード（整数）
+        empty: 空きマスのビットボード（整数）
+        first_moves: 最初に試す手のビットの並び（前の反復の読み筋の手、置換表の最善手）
+        ply: ルートからの手数
+        side: 手番側（0: 最大化側、1: 最小化側）
+        ctx: SearchContext（有効なヒューリスティック、キラー手、ヒストリー）
+
+    処理:
+        1. 読み筋の手・置換表の手（"hash"）を先頭に置く。
+        2. 角の手（"corner"）を次に置く。
+        3. その手数のキラー手（"killer"）を次に置く。
+        4. 残りの手をヒストリースコアの高い順（"history"）に並べる。
+        5. 空いている角に隣接するX・Cマスの手（"xc"）は最後に回す。
+
+    戻り値:
+        list: 試す順に並べた手のビットのリスト
+    """
+    ordering = ctx.ordering
+    ordered = []
+    if "hash" in ordering:
+        for move in first_moves:
+            if move & moves:
+                ordered.append(move)
+                moves ^= move
+    late = 0
+    if "xc" in ordering:
+        for corner, neighbors in BB_CORNER_NEIGHBORS:
+            if corner & empty:
+                late |= moves & neighbors
+        moves ^= late
+    if "corner" in ordering:
+        corners = moves & BB_CORNERS
+        moves ^= corners
+        while corners:
+            move = corners & -corners
+            ordered.append(move)
+            corners ^= move
+    if "killer" in ordering:
+        for move in ctx.killers[ply]:
+            if move & moves:
+                ordered.append(move)
+                moves ^= move
+    history = ctx.history[side] if "history" in ordering else None
+    for group in (moves, late):
+        rest = []
+        while group:
+            move = group & -group
+            rest.append(move)
+            group ^= move
+        if history is not None and len(rest) > 1:
+            rest.sort(key=lambda move: -history[move.bit_length() - 1])
+        ordered.extend(rest)
+    return ordered
+
+def bb_record_cutoff(ctx, move, depth, ply, side, first_move):
+    """
+    βカットを起こした手をキラー手とヒストリー（統計を取っていれば統計にも）に記録する。
+
+    引数:
+        ctx: SearchContext
+        move: 枝刈りを起こした手のビット
+        depth: その局面の残り深さ
+        ply: ルートからの手数
+        side: 手番側（0: 最大化側、1: 最小化側）
+        first_move: その局面で最初に試した手のビット
+
+    戻り値:
+        なし
+    """
+    killers = ctx.killers[ply]
+    if killers[0] != move:
+        killers[1] = killers[0]
+        killers[0] = move
+    ctx.history[side][move.bit_length() - 1] += depth * depth
+    if ctx.stats is not None:
+        ctx.stats.beta_cutoffs += 1
+        if move == first_move:
+            ctx.stats.first_move_cutoffs += 1
+
+def bb_negamax(own, opp, depth, alpha, beta, key, material, side, ctx):
+    """
+    ビットボード上でネガマックス形式の主変化探索（PVS）を行う（"bitboard"バックエンド）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        depth: 残りの探索深さ（整数）
+        alpha: 手番側が確保できる最低スコア
+        beta: 相手が許容する最高スコア
+        key: 局面のZobristキー（着手・反転・手番交代に合わせて差分で更新する）
+        material: 手番側から見た角と石の数による評価値（bb_material）。着手ごとに差分で更新する
+        side: 手番側（0: ルートの手番側（最大化側）、1: その相手）。Zobristキーとヒストリーの区別に使う
+        ctx: SearchContext（時間制限・ノード数・前回の読み筋・統計）
+
+    処理:
+        1. ノード数を数え、一定間隔で時間切れならSearchTimeoutを送出する。
+        2. 深さ0なら、差分で持っているmaterialに着手可能数の差（bb_mobility）を加えて評価する。
+           EVALUATORが"pattern"ならbb_pattern_evaluateで評価する。
+        3. 置換表を引き、十分な深さの結果があれば値またはα・βの範囲に使う。
+        4. 手番側に手がなければ、相手にも手がなければ評価して終了し、あればパスして相手のターンで再評価。
+        5. bb_order_moves で手を並べ替え、最初の手だけ(α, β)の窓で探索する。
+        6. 2手目以降は(α, α+1)の幅のない窓で「αを超えるか」だけを調べ（スカウト探索）、
+           超えた場合だけ(α, β)の窓で探索し直す。
+        7. α ≥ β なら枝刈りして探索を終了し、枝刈りを起こした手をキラー手・ヒストリーに記録する。
+        8. 結果を値の種類（正確・下限・上限）と最善手とともに置換表に保存する。
+        ctx.statsがあれば、静的評価・置換表のヒット・βカットの回数を数える。
+        評価値はすべて整数なので、幅のない窓で値の大小を正しく判定できる。
+
+    戻り値:
+        int: 評価スコア（手番側にとって高いほど良い。窓の外ならその方向の境界値）
+    """
+    ctx.nodes += 1
+    if ctx.deadline is not None and not ctx.nodes & (TIME_CHECK_INTERVAL - 1) and time.perf_counter() > ctx.deadline:
+        raise SearchTimeout
+    if depth == 0:
+        if ctx.stats is not None:
+            ctx.stats.leaves += 1
+        if EVALUATOR == "pattern":
+            return bb_pattern_evaluate(own, opp)
+        return material + bb_mobility(own, opp) * MOBILITY_VALUE
+
+    table = ctx.table
+    hash_move = 0
+    entry = table.probe(key)
+    if entry is not None:
+        if ctx.stats is not None:
+            ctx.stats.tt_hits += 1
+        hash_move = entry[4]
+        if entry[1] >= depth:
+            flag, score = entry[2], entry[3]
+            if flag == TT_EXACT:
+                return score
+            if flag == TT_LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+    moves = bb_get_moves(own, opp)
+    if not moves:
+        if not bb_get_moves(opp, own):
+            if EVALUATOR == "pattern":
+                return bb_pattern_evaluate(own, opp)
+            return material  # 両者とも手がないので着手可能数の差は0
+        # 有効な手がない場合、パスして相手のターンで再評価
+        return -bb_negamax(opp, own, depth - 1, -beta, -alpha, key ^ ZOBRIST_SIDE, -material, 1 - side, ctx)
+
+    ply = ctx.root_depth - depth
+    empty = BB_FULL & ~(own | opp)
+    move_list = bb_order_moves(moves, empty, (ctx.pv_moves.get(key, 0), hash_move), ply, side, ctx)
+    zobrist = ZOBRIST_MIN if side else ZOBRIST_MAX
+
+    window_alpha = alpha
+    best_score = float('-inf')
+    best_move = 0
+    for move in move_list:
+        flips = bb_get_flips(own, opp, move)
+        child_own, child_opp = opp ^ flips, own | move | flips
+        child_key = key ^ ZOBRIST_SIDE ^ zobrist[move.bit_length() - 1] ^ bb_flip_key(flips)
+        child_material = -(material + bb_material_delta(move, flips))
+        if best_move:
+            # スカウト探索: αを超えなければ値は不要
+            score = -bb_negamax(child_own, child_opp, depth - 1, -alpha - 1, -alpha, child_key, child_material,
+                                1 - side, ctx)
+            if alpha < score < beta:
+                score = -bb_negamax(child_own, child_opp, depth - 1, -beta, -alpha, child_key, child_material,
+                                    1 - side, ctx)  # αを超えたので正しい値を求め直す
+        else:
+            score = -bb_negamax(child_own, child_opp, depth - 1, -beta, -alpha, child_key, child_material,
+                                1 - side, ctx)
+        if score > best_score:
+            best_score = score
+            best_move = move
+            if score > alpha:
+                alpha = score  # アルファを更新
+                if alpha >= beta:
+                    bb_record_cutoff(ctx, move, depth, ply, side, move_list[0])
+                    break  # 枝刈り
+
+    if best_score <= window_alpha:
+        flag = TT_UPPER
+    elif best_score >= beta:
+        flag = TT_LOWER
+    else:
+        flag = TT_EXACT
+    table.store(key, depth, flag, best_score, best_move)
+    return best_score
+
+def bb_search_root(own, opp, depth, root_moves, ctx, alpha=float('-inf'), beta=float('inf')):
+    """
+    ルート局面の各手を指定の深さで評価する（反復深化の1回分）。
+
+    引数:
+        own: 手番側（最大化側）の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        depth: 探索深さ（整数）
+        root_moves: 試す順に並べたルートの手のビットのリスト
+        ctx: SearchContext（時間制限・ノード数・前回の読み筋）
+        alpha: 探索窓の下限（アスピレーション窓。省略時は-∞）
+        beta: 探索窓の上限（アスピレーション窓。省略時は+∞）
+
+    処理:
+        1. 最初の手は(α, β)の窓で、2手目以降は幅のない窓のスカウト探索で評価し、
+           αを超えた手だけ(α, β)の窓で探索し直してαを更新する。
+        2. β以上の手が見つかったら残りの手は探索しない（呼び出し側で窓を広げて探索し直す）。
+        3. 最高スコアの手と値を置換表に保存する。
+        4. 次の反復のために、スコアの高い順に並べ替えた手のリストを作る（探索しなかった手は最後）。
+        ctx.statsがあれば、手ごとのノード数と時間を記録する。
+
+    戻り値:
+        tuple: (最善手のビット, 最高スコア, スコア順に並べ替えた手のリスト)
+               最高スコアがα以下なら上限、β以上なら下限でしかない
+    """
+    key = bb_zobrist_key(own, opp, True)
+    material = bb_material(own, opp)
+    ctx.root_depth = depth
+    stats = ctx.stats
+    window_alpha = alpha
+    best_score = float('-inf')
+    best_move = 0
+    scored = []
+    for move in root_moves:
+        if stats is not None:
+            start, start_nodes = time.perf_counter(), ctx.nodes
+        flips = bb_get_flips(own, opp, move)  # 手を試す
+        child_own, child_opp = opp ^ flips, own | move | flips
+        child_key = key ^ ZOBRIST_SIDE ^ ZOBRIST_MAX[move.bit_length() - 1] ^ bb_flip_key(flips)
+        child_material = -(material + bb_material_delta(move, flips))
+        if best_move:
+            score = -bb_negamax(child_own, child_opp, depth - 1, -alpha - 1, -alpha, child_key, child_material, 1, ctx)
+            if alpha < score < beta:
+                score = -bb_negamax(child_own, child_opp, depth - 1, -beta, -alpha, child_key, child_material, 1, ctx)
+        else:
+            score = -bb_negamax(child_own, child_opp, depth - 1, -beta, -alpha, child_key, child_material, 1, ctx)
+        if stats is not None:
+            stats.record_root_move(move, score, ctx.nodes - start_nodes, time.perf_counter() - start)
+        scored.append((score, move))
+        if score > best_score:
+            best_score = score
+            best_move = move
+        alpha = max(alpha, best_score)  # アルファを更新
+        if alpha >= beta:
+            break  # 窓の上限を超えた
+    if best_score <= window_alpha:
+        flag = TT_UPPER
+    elif best_score >= beta:
+        flag = TT_LOWER
+    else:
+        flag = TT_EXACT
+    ctx.table.store(key, depth, flag, best_score, best_move)
+    ordered = [move for _, move in sorted(scored, key=lambda item: -item[0])]
+    ordered += root_moves[len(scored):]
+    return best_move, best_score, ordered
+
+def bb_principal_variation(max_bits, min_bits, depth, table):
+    """
+    置換表の最善手をたどって読み筋（最善応手手順）を取り出す。
+
+    引数:
+        max_bits: ルートの手番側の石のビットボード（整数）
+        min_bits: 相手の石のビットボード（整数）
+        depth: たどる最大の手数
+        table: 参照する置換表
+
+    処理:
+        1. 局面のエントリから最善手を取り出し、合法手なら着手して次の局面へ進む。
+        2. エントリがない、手がない（パス）、または非合法手なら終了する。
+
+    戻り値:
+        list: (Zobristキー, 手のビット) のリスト（ルートから順）
+    """
+    line = []
+    is_maximizing = True
+    key = bb_zobrist_key(max_bits, min_bits, True)
+    for _ in range(depth):
+        entry = table.probe(key)
+        if entry is None or not entry[4]:
+            break
+        move = entry[4]
+        if is_maximizing:
+            if not move & bb_get_moves(max_bits, min_bits):
+                break
+            flips = bb_get_flips(max_bits, min_bits, move)
+            max_bits, min_bits = max_bits | move | flips, min_bits ^ flips
+            next_key = key ^ ZOBRIST_SIDE ^ ZOBRIST_MAX[move.bit_length() - 1] ^ bb_flip_key(flips)
+        else:
+            if not move & bb_get_moves(min_bits, max_bits):
+                break
+            flips = bb_get_flips(min_bits, max_bits, move)
+            max_bits, min_bits = max_bits ^ flips, min_bits | move | flips
+            next_key = key ^ ZOBRIST_SIDE ^ ZOBRIST_MIN[move.bit_length() - 1] ^ bb_flip_key(flips)
+        line.append((key, move))
+        key = next_key
+        is_maximizing = not is_maximizing
+    return line
+
+def find_best_move(board, stone, depth=None, time_limit=None, workers=None, use_book=True, stats=None,
+                   resume=None):
+    """
+    反復深化とアルファベータ枝刈り付きミニマックスで最善手を選択する。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        stone: 対象の石（PLAYER_STONEまたはCOMPUTER_STONE）
+        depth: 最大の探索深さ（整数）。省略時、time_limitがなければMINIMAX_DEPTH、
+               あればゲーム終了までの空きマス数
+        time_limit: 1手あたりの思考時間（秒）。Noneなら時間制限なし
+        workers: ルートの手を分担するプロセス数。省略時はSEARCH_WORKERS
+        use_book: Trueなら探索の前に定石ブックを引く
+        stats: 探索の統計を集計するSearchStats。省略時はSEARCH_TRACE_PATHがあるときだけ集計する
+        resume: ポンダリングで同じ局面を途中まで探索したSearchContext。あればその続きの深さから探索する
+
+    処理:
+        1. 有効な手をすべて取得。有効な手がない場合、Noneを返す。
+           定石ブックに登録された局面なら、探索せずにその手を返す。
+        2. bb_search_with_cacheで、解析キャッシュ（ANALYSIS_CACHE_PATH）を引いてから深さ1, 2, 3, ... と順に探索する
+           （反復深化）。前の反復のスコア順にルートの手を並べ、読み筋の手を各局面で最初に試す。
+        3. 時間切れになったら途中の反復を捨て、最後に完了した深さの最善手を返す。
+           （深さ1の探索は必ず完了させる）
+        4. SEARCH_TRACE_PATHが設定されていれば、統計をJSON Lines形式で1行追記する。
+        5. BOARD_BACKENDが"list"なら反復深化を使わずlist_find_best_moveで探索する。
+
+    戻り値:
+        tuple or None: 最善手の座標（row, col）またはNone（有効な手がない場合）
+    """
+    if depth is None:
+        depth = MINIMAX_DEPTH if time_limit is None else BOARD_SIZE * BOARD_SIZE
+    if BOARD_BACKEND == "list":
+        return list_find_best_move(board, stone, depth)
+    own, opp = board_to_bitboards(board, stone)
+    if not bb_get_moves(own, opp):
+        return None
+    book = get_opening_book() if use_book else None
+    if book:
+        entry = book.lookup(own, opp)
+        if entry:
+            return divmod(entry[0].bit_length() - 1, BOARD_SIZE)  # 定石の手（探索しない）
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    if stats is None and SEARCH_TRACE_PATH:
+        stats = SearchStats()
+    if resume is not None:
+        ctx = resume
+        ctx.workers = SEARCH_WORKERS if workers is None else workers
+        ctx.stats = stats
+    else:
+        ctx = SearchContext(workers=SEARCH_WORKERS if workers is None else workers, stats=stats)
+    best_move = bb_search_with_cache(own, opp, depth, deadline, ctx)
+    if SEARCH_TRACE_PATH:
+        write_search_trace(SEARCH_TRACE_PATH, {"board": ["".join(row) for row in board], "stone": stone,
+                                               "move": move_to_text(best_move), **stats.to_dict()})
+    return divmod(best_move.bit_length() - 1, BOARD_SIZE)
+
+def bb_search_with_cache(own, opp, depth, deadline, ctx):
+    """
+    解析キャッシュを引いてから反復深化で探索する（find_best_move・自己対戦・エンジン・棋譜解析で共通に使う）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        depth: 最大の探索深さ（空きマス数を超える分は切り詰める）
+        deadline: 打ち切り時刻（time.perf_counter()の値）。Noneなら時間制限なし
+        ctx: SearchContext
+
+    処理:
+        1. 解析キャッシュ（ANALYSIS_CACHE_PATH）に、探索する深さ（depthと空きマス数の小さいほう）以上の結果があれば、
+           探索せずにその手を返す（時間制限があっても、その深さまで読んだ結果なので使う）。
+           ctx.best_move・best_score・completed_depthはキャッシュの値にし、ctx.cache_hitをTrueにする。
+        2. なければbb_iterative_deepeningで探索し、完了した深さの結果をキャッシュに保存する。
+
+    戻り値:
+        int: 最善手のビット（有効な手があることが前提）
+    """
+    cache = get_analysis_cache()
+    if cache is not None:
+        entry = cache.lookup(own, opp, min(depth, (BB_FULL & ~(own | opp)).bit_count()))
+        if entry:
+            ctx.best_move, ctx.best_score, ctx.completed_depth = entry
+            ctx.cache_hit = True
+            return ctx.best_move  # 同じ深さ以上で解析済みの手（探索しない）
+    best_move = bb_iterative_deepening(own, opp, depth, deadline, ctx)
+    if cache is not None and ctx.completed_depth:
+        cache.store(own, opp, ctx.completed_depth, ctx.best_score, best_move)
+    return best_move
+
+def bb_iterative_deepening(own, opp, depth, deadline, ctx):
+    """
+    ビットボード上で反復深化を行い、最後に完了した深さの最善手を求める。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        depth: 最大の探索深さ（空きマス数を超える分は切り詰める）
+        deadline: 打ち切り時刻（time.perf_counter()の値）。Noneなら時間制限なし
+        ctx: SearchContext（置換表・並べ替えの設定を含む）
+
+    処理:
+        1. 置換表の世代を進め、ルートの手を行優先の順に並べる。
+           ctxが途中まで探索済み（ポンダリングの結果など）なら、その手の順序を引き継いで続きの深さから始める。
+        2. 深さ1から順にbb_search_root（ctx.workersが2以上ならbb_parallel_search_root）で探索し、
+           次の反復のために手の順序と読み筋を更新する。
+           深さ2以降は前の反復の評価値±ASPIRATION_WINDOWの窓（アスピレーション窓）で探索し、
+           窓から外れたら外れた側を広げて探索し直す。
+        3. 時間切れ（SearchTimeout）になったら途中の反復を捨てて終了する。
+        4. ctx.statsがあれば、完了した反復ごとの記録と探索全体のノード数・時間を残す。
+
+    戻り値:
+        int: 最善手のビット（有効な手があることが前提）
+    """
+    depth = min(depth, (BB_FULL & ~(own | opp)).bit_count())  # 空きマス数より深くは読まない
+    if ctx.completed_depth:
+        root_moves = ctx.root_moves
+        best_move = ctx.best_move
+    else:
+        ctx.table.new_search()
+        moves = bb_get_moves(own, opp)
+        root_moves = []
+        while moves:
+            move = moves & -moves
+            root_moves.append(move)
+            moves ^= move
+        best_move = root_moves[0]
+    stats = ctx.stats
+    for current_depth in range(ctx.completed_depth + 1, max(depth, 1) + 1):
+        ctx.deadline = deadline if current_depth > 1 else None
+        if stats is not None:
+            stats.start_iteration(ctx.nodes)
+        try:
+            if ctx.workers > 1 and len(root_moves) > 1:
+                move, score, root_moves = bb_parallel_search_root(own, opp, current_depth, root_moves, ctx)
+            else:
+                alpha, beta = float('-inf'), float('inf')
+                if current_depth > 1:
+                    # 評価値は読みの深さの偶奇で揺れるので、同じ偶奇の2つ前の反復の値を中心にする
+                    center = ctx.scores[-2] if len(ctx.scores) > 1 else ctx.scores[-1]
+                    alpha, beta = center - ASPIRATION_WINDOW, center + ASPIRATION_WINDOW
+                while True:
+                    move, score, root_moves = bb_search_root(own, opp, current_depth, root_moves, ctx, alpha, beta)
+                    if score <= alpha:
+                        alpha = float('-inf')  # 窓の下に外れたので下側を広げて探索し直す
+                    elif score >= beta:
+                        beta = float('inf')  # 窓の上に外れたので上側を広げて探索し直す
+                    else:
+                        break
+        except SearchTimeout:
+            break  # 途中の反復は捨てる
+        best_move = move
+        ctx.best_move = move
+        ctx.best_score = score
+        ctx.scores.append(score)
+        ctx.root_moves = root_moves
+        ctx.completed_depth = current_depth
+        ctx.pv_moves = dict(bb_principal_variation(own, opp, current_depth, ctx.table))
+        if stats is not None:
+            stats.finish_iteration(current_depth, ctx.nodes, score, move)
+    if stats is not None:
+        stats.finish(ctx.nodes)
+    return best_move
+
+def measure_move_ordering(board, stone, depth=MINIMAX_DEPTH):
+    """
+    手の並べ替えヒューリスティックごとの効果を、固定深さの探索ノード数で比べる。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        stone: 手番側の石（PLAYER_STONEまたはCOMPUTER_STONE）
+        depth: 探索深さ（整数）
+
+    処理:
+        1. すべてのヒューリスティックを有効にした場合、すべて無効にした場合、
+           1つずつ外した場合について、空の置換表で深さdepthまで反復深化する。
+        2. それぞれの合計ノード数を記録する。
+
+    戻り値:
+        dict: 設定名（"all"、"none"、"-killer" など） -> ノード数
+    """
+    own, opp = board_to_bitboards(board, stone)
+    configs = [("all", MOVE_ORDERING), ("none", ())]
+    configs += [("-" + name, tuple(h for h in MOVE_ORDERING if h != name)) for name in MOVE_ORDERING]
+    counts = {}
+    for name, ordering in configs:
+        ctx = SearchContext(table=TranspositionTable(), ordering=ordering)
+        if bb_get_moves(own, opp):
+            bb_iterative_deepening(own, opp, depth, None, ctx)
+        counts[name] = ctx.nodes
+    return counts
+
+# === 終盤完全読み ===
+def bb_final_score(own, opp):
+    """
+    終局時の石数差を計算する（空きマスは勝った側に加える）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    戻り値:
+        int: 手番側から見た最終石数差
+    """
+    diff = own.bit_count() - opp.bit_count()
+    empties = BB_FULL.bit_count() - own.bit_count() - opp.bit_count()
+    if diff > 0:
+        return diff + empties
+    if diff < 0:
+        return diff - empties
+    return diff
+
+def bb_order_endgame_moves(own, opp, moves):
+    """
+    終盤完全読みのために手を並べ替える。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        moves: 有効な手のビットボード（整数）
+
+    処理:
+        1. 空きマスが奇数個の象限（偶数理論で有利になりやすい）にある手を優先する。
+        2. 空きマスがENDGAME_FASTEST_FIRST_EMPTIESより多い場合は、着手後の相手の着手可能数が
+           少ない手から試す（fastest-first）。同数なら偶数理論の順を保つ。
+
+    戻り値:
+        list: 試す順に並べた手のビットのリスト
+    """
+    empty = BB_FULL & ~(own | opp)
+    odd = 0
+    for quadrant in BB_QUADRANTS:
+        if (empty & quadrant).bit_count() & 1:
+            odd |= quadrant
+    ordered = []
+    for group in (moves & odd, moves & ~odd):
+        while group:
+            move = group & -group
+            ordered.append(move)
+            group ^= move
+    if empty.bit_count() > ENDGAME_FASTEST_FIRST_EMPTIES and len(ordered) > 1:
+        def opponent_mobility(move):
+            flips = bb_get_flips(own, opp, move)
+            return bb_get_moves(opp ^ flips, own | move | flips).bit_count()
+        ordered.sort(key=opponent_mobility)
+    return ordered
+
+def bb_solve_endgame(own, opp, alpha, beta, ctx):
+    """
+    最終石数差を最後まで読み切る（ネガマックス形式のアルファベータ）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        alpha: 手番側が確保できる最低スコア
+        beta: 相手が許容する最高スコア
+        ctx: SearchContext（時間制限・ノード数）
+
+    処理:
+        1. ノード数を数え、一定間隔で時間切れならSearchTimeoutを送出する。
+        2. 手番側に手がなければ、相手にも手がなければ終局の石数差、あれば相手番で読む。
+        3. bb_order_endgame_movesの順に手を試し、α ≥ β なら枝刈りする。
+        窓を(-1, 1)にすると勝ち・負け・引き分けだけを判定できる（結果の符号が勝敗）。
+
+    戻り値:
+        int: 手番側から見た最終石数差（窓の外ならその方向の境界値）
+    """
+    ctx.nodes += 1
+    if ctx.deadline is not None and not ctx.nodes & (TIME_CHECK_INTERVAL - 1) and time.perf_counter() > ctx.deadline:
+        raise SearchTimeout
+    moves = bb_get_moves(own, opp)
+    if not moves:
+        if not bb_get_moves(opp, own):
+            return bb_final_score(own, opp)
+        return -bb_solve_endgame(opp, own, -beta, -alpha, ctx)  # パス
+    best_score = float('-inf')
+    for move in bb_order_endgame_moves(own, opp, moves):
+        flips = bb_get_flips(own, opp, move)
+        score = -bb_solve_endgame(opp ^ flips, own | move | flips, -beta, -alpha, ctx)
+        if score > best_score:
+            best_score = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break  # 枝刈り
+    return best_score
+
+def solve_endgame(board, stone, mode=None, time_limit=None):
+    """
+    終盤の局面を最後まで読み切って最善手を求める。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        stone: 手番側の石（PLAYER_STONEまたはCOMPUTER_STONE）
+        mode: "disc"（最終石数差を最大化）または "wld"（勝ち・負け・引き分けだけを判定）。
+              省略時はENDGAME_MODE
+        time_limit: 読み切りに使える時間（秒）。Noneなら時間制限なし
+
+    処理:
+        1. 有効な手がなければNoneを返す。
+        2. 各手についてbb_solve_endgameで読み切り、最善の値の手を選ぶ。
+           "wld"では窓を(-1, 1)に絞り、勝ちが見つかった時点で打ち切る。
+        3. 時間切れならNoneを返す（呼び出し側で通常の探索に切り替える）。
+
+    戻り値:
+        tuple or None: (最善手の座標(row, col), 最終石数差または勝敗の符号)。読み切れなければNone
+    """
+    own, opp = board_to_bitboards(board, stone)
+    if not bb_get_moves(own, opp):
+        return None
+    ctx = SearchContext(deadline=None if time_limit is None else time.perf_counter() + time_limit)
+    try:
+        move, score = bb_solve_endgame_root(own, opp, ENDGAME_MODE if mode is None else mode, ctx)
+    except SearchTimeout:
+        return None
+    return divmod(move.bit_length() - 1, BOARD_SIZE), score
+
+def bb_solve_endgame_root(own, opp, mode, ctx):
+    """
+    ビットボードの局面を最後まで読み切り、最善手と値を求める（solve_endgameの本体）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        mode: "disc"（最終石数差を最大化）または "wld"（勝ち・負け・引き分けだけを判定）
+        ctx: SearchContext（時間制限・ノード数）。時間切れならSearchTimeoutを送出する
+
+    戻り値:
+        tuple: (最善手のビット, 最終石数差または勝敗の符号)。有効な手があることが前提
+    """
+    alpha, beta = (-1, 1) if mode == "wld" else (float('-inf'), float('inf'))
+    best_score = float('-inf')
+    best_move = 0
+    for move in bb_order_endgame_moves(own, opp, bb_get_moves(own, opp)):
+        flips = bb_get_flips(own, opp, move)
+        score = -bb_solve_endgame(opp ^ flips, own | move | flips, -beta, -alpha, ctx)
+        if score > best_score:
+            best_score = score
+            best_move = move
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break  # "wld"で勝ちが見つかった
+    if mode == "wld":
+        best_score = (best_score > 0) - (best_score < 0)
+    return best_move, best_score
+
+# === 定石ブック ===
+def bb_transform(bits, permutation):
+    """
+    ビットボードに盤面の対称変換（回転・反転）を適用する。
+
+    引数:
+        bits: ビットボード（整数）
+        permutation: 変換前のマス番号 -> 変換後のマス番号 のリスト（BB_SYMMETRIESの要素）
+
+    戻り値:
+        int: 変換後のビットボード
+    """
+    result = 0
+    while bits:
+        bit = bits & -bits
+        result |= 1 << permutation[bit.bit_length() - 1]
+        bits ^= bit
+    return result
+
+def bb_canonical(own, opp):
+    """
+    8通りの対称変換のうち、(own, opp) が最小になる向きに正規化する。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+
+    戻り値:
+        tuple: (正規化したown, 正規化したopp, 使った変換の番号)
+    """
+    best = None
+    for index, permutation in enumerate(BB_SYMMETRIES):
+        candidate = (bb_transform(own, permutation), bb_transform(opp, permutation), index)
+        if best is None or candidate[:2] < best[:2]:
+            best = candidate
+    return best
+
+class OpeningBook:
+    """
+    定石ブックのファイルをメモリマップして二分探索で引く。
+
+    ファイル形式:
+        ヘッダ: BOOK_MAGIC（4バイト）と登録局面数（uint32、リトルエンディアン）
+        レコード: 正規化した手番側・相手の石（uint64 × 2）、正規化した向きでの最善手のマス番号（uint8）、
+                  パディング（1バイト）、評価値（int16）。局面の昇順に並ぶ
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = BOOK_HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC:
+            self.close()
+            raise ValueError(f"定石ブックの形式が正しくありません: {path}")
+
+    def close(self):
+        """
+        メモリマップとファイルを閉じる。
+
+        戻り値:
+            なし
+        """
+        self.data.close()
+        self.file.close()
+
+    def lookup(self, own, opp):
+        """
+        局面の最善手を定石ブックから探す。
+
+        引数:
+            own: 手番側の石のビットボード（整数）
+            opp: 相手の石のビットボード（整数）
+
+        処理:
+            1. 局面を正規化し、レコードを二分探索する。
+            2. 見つかった手を元の向きに戻し、合法手であることを確認する。
+
+        戻り値:
+            tuple or None: (手のビット, 評価値)。登録されていなければNone
+        """
+        canonical_own, canonical_opp, symmetry = bb_canonical(own, opp)
+        target = (canonical_own, canonical_opp)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if BOOK_KEY.unpack_from(self.data, BOOK_HEADER.size + middle * BOOK_RECORD.size) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        record_own, record_opp, square, score = BOOK_RECORD.unpack_from(
+            self.data, BOOK_HEADER.size + low * BOOK_RECORD.size)
+        if (record_own, record_opp) != target:
+            return None
+        move = 1 << BB_SYMMETRIES_INVERSE[symmetry][square]
+        if not move & bb_get_moves(own, opp):
+            return None
+        return move, score
+
+_OPENING_BOOK = None  # 読み込み済みの定石ブック（Falseならファイルがない）
+
+def get_opening_book():
+    """
+    OPENING_BOOK_PATHの定石ブックを開く（初回だけ開いて使い回す）。
+
+    戻り値:
+        OpeningBook or None: ファイルがない、または盤面が8x8でなければNone
+    """
+    global _OPENING_BOOK
+    if _OPENING_BOOK is None:
+        # ファイル形式が64ビットの局面なので、8x8以外の盤面では使わない
+        _OPENING_BOOK = (BOARD_SIZE == 8 and os.path.exists(OPENING_BOOK_PATH)) and OpeningBook(OPENING_BOOK_PATH)
+    return _OPENING_BOOK or None
+
+def build_opening_book(path=None, plies=BOOK_PLIES, depth=BOOK_SEARCH_DEPTH, progress=None):
+    """
+    初期局面から一定手数までの局面を探索し、定石ブックのファイルを作る。
+
+    引数:
+        path: 出力するファイル。省略時はOPENING_BOOK_PATH
+        plies: 登録する最大の手数（初期局面から）
+        depth: 各局面の最善手を決める探索深さ
+        progress: 局面を1つ登録するたびに登録数を渡して呼ぶ関数（省略可）
+
+    処理:
+        1. 初期局面から幅優先で、plies手までのすべての局面をたどる（パスも含む）。
+        2. 対称な局面は正規化して1つにまとめ、それぞれを深さdepthで探索する。
+        3. 局面の昇順に並べてヘッダとレコードを書き出す。
+
+    戻り値:
+        int: 登録した局面数
+
+    例外:
+        ValueError: 盤面が8x8でない場合（ファイル形式が64ビットの局面のため）
+    """
+    if BOARD_SIZE != 8:
+        raise ValueError("定石ブックは8x8の盤面でのみ作成できます")
+    path = OPENING_BOOK_PATH if path is None else path
+    black, white = board_to_bitboards(INITIAL_BOARD, PLAYER_STONE)  # 黒（プレイヤー）が先手
+    records = {}
+    frontier = [(black, white)]
+    for _ in range(plies + 1):
+        next_frontier = []
+        for own, opp in frontier:
+            canonical_own, canonical_opp, symmetry = bb_canonical(own, opp)
+            if (canonical_own, canonical_opp) in records:
+                continue
+            moves = bb_get_moves(own, opp)
+            if not moves:
+                if bb_get_moves(opp, own):
+                    next_frontier.append((opp, own))  # パス
+                continue
+            ctx = SearchContext(table=TranspositionTable())
+            move = bb_iterative_deepening(own, opp, depth, None, ctx)
+            square = BB_SYMMETRIES[symmetry][move.bit_length() - 1]
+            score = max(-32768, min(32767, int(ctx.best_score)))
+            records[(canonical_own, canonical_opp)] = (square, score)
+            if progress:
+                progress(len(records))
+            while moves:
+                move = moves & -moves
+                moves ^= move
+                flips = bb_get_flips(own, opp, move)
+                next_frontier.append((opp ^ flips, own | move | flips))
+        frontier = next_frontier
+    with open(path, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, len(records)))
+        for (own, opp), (square, score) in sorted(records.items()):
+            f.write(BOOK_RECORD.pack(own, opp, square, score))
+    return len(records)
+
+# === 解析キャッシュ ===
+def _to_sqlite_int(bits):
+    """
+    64ビットのビットボードを、SQLiteのINTEGER（符号付き64ビット）に収まる値にする。
+
+    引数:
+        bits: ビットボード（0以上 2 ** 64 未満の整数）
+
+    戻り値:
+        int: 同じビット並びの符号付き64ビット整数
+    """
+    return bits - (1 << 64) if bits >> 63 else bits
+
+class AnalysisCache:
+    """
+    探索結果（局面, 深さ, 評価値, 最善手）をSQLiteのファイルに保存し、ゲームやプロセスをまたいで再利用する。
+
+    属性:
+        connection: SQLiteの接続（WALモード。複数プロセスが同時に読み、書き込みは順番に行う）
+        max_entries: 残す最大の局面数
+        hits: このプロセスでのヒット数
+        misses: このプロセスでのミス数
+
+    局面は定石ブックと同じく8通りの対称のうち最小の向きに正規化し、評価関数（EVALUATOR）ごとに別に保存する。
+    同じ局面は深い探索の結果だけを残し、局面数がmax_entriesを超えたら最後に使われたのが古い順に消す（LRU）。
+    """
+
+    def __init__(self, path, max_entries=ANALYSIS_CACHE_MAX_ENTRIES):
+        self.connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS analysis (own INTEGER NOT NULL, opp INTEGER NOT NULL, "
+            "evaluator TEXT NOT NULL, depth INTEGER NOT NULL, score INTEGER NOT NULL, square INTEGER NOT NULL, "
+            "used REAL NOT NULL, UNIQUE (own, opp, evaluator))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used)")
+        # 局面数をトリガーで数えておき、保存のたびに全件を数えずに上限を確認できるようにする
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS analysis_count (entries INTEGER NOT NULL)")
+            if self.connection.execute("SELECT COUNT(*) FROM analysis_count").fetchone()[0] == 0:
+                self.connection.execute("INSERT INTO analysis_count SELECT COUNT(*) FROM analysis")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS analysis_inserted AFTER INSERT ON analysis "
+                "BEGIN UPDATE analysis_count SET entries = entries + 1; END")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS analysis_deleted AFTER DELETE ON analysis "
+                "BEGIN UPDATE analysis_count SET entries = entries - 1; END")
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        """
+        SQLiteの接続を閉じる。
+
+        戻り値:
+            なし
+        """
+        self.connection.close()
+
+    def lookup(self, own, opp, depth):
+        """
+        指定の深さ以上で探索済みの局面の結果を探す。
+
+        引数:
+            own: 手番側の石のビットボード（整数）
+            opp: 相手の石のビットボード（整数）
+            depth: 必要な探索深さ
+
+        処理:
+            1. 局面を正規化して引き、保存された深さがdepth以上なら最善手を元の向きに戻す。
+            2. 最終使用時刻がANALYSIS_CACHE_TOUCH_INTERVAL秒より古ければ更新する。
+
+        戻り値:
+            tuple or None: (手のビット, 評価値, 保存された深さ)。なければNone
+        """
+        canonical_own, canonical_opp, symmetry = bb_canonical(own, opp)
+        key = (_to_sqlite_int(canonical_own), _to_sqlite_int(canonical_opp), EVALUATOR)
+        row = self.connection.execute(
+            "SELECT depth, score, square, used FROM analysis WHERE own = ? AND opp = ? AND evaluator = ?",
+            key).fetchone()
+        if row is None or row[0] < depth:
+            self.misses += 1
+            return None
+        stored_depth, score, square, used = row
+        move = 1 << BB_SYMMETRIES_INVERSE[symmetry][square]
+        if not move & bb_get_moves(own, opp):
+            self.misses += 1
+            return None
+        now = time.time()
+        if used < now - ANALYSIS_CACHE_TOUCH_INTERVAL:
+            self.connection.execute("UPDATE analysis SET used = ? WHERE own = ? AND opp = ? AND evaluator = ?",
+                                    (now,) + key)
+        self.hits += 1
+        return move, score, stored_depth
+
+    def store(self, own, opp, depth, score, move):
+        """
+        探索結果を保存する（保存済みの結果より浅ければ何もしない）。
+
+        引数:
+            own: 手番側の石のビットボード（整数）
+            opp: 相手の石のビットボード（整数）
+            depth: 探索深さ
+            score: 手番側から見た評価値
+            move: 最善手のビット
+
+        処理:
+            1. 局面と手を正規化し、同じ局面がなければ追加、あれば深さが同じ以上のときだけ上書きする。
+            2. 局面数がmax_entriesを超えたら、evictで上限の9割に減らす（局面数が上限を超えたままにはしない）。
+
+        戻り値:
+            なし
+        """
+        canonical_own, canonical_opp, symmetry = bb_canonical(own, opp)
+        square = BB_SYMMETRIES[symmetry][move.bit_length() - 1]
+        self.connection.execute("BEGIN IMMEDIATE")  # 追加と上限の確認を1つのトランザクションにする
+        try:
+            self.connection.execute(
+                "INSERT INTO analysis (own, opp, evaluator, depth, score, square, used) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (own, opp, evaluator) DO UPDATE SET depth = excluded.depth, score = excluded.score, "
+                "square = excluded.square, used = excluded.used WHERE excluded.depth >= analysis.depth",
+                (_to_sqlite_int(canonical_own), _to_sqlite_int(canonical_opp), EVALUATOR, depth, int(score), square,
+                 time.time()))
+            if len(self) > self.max_entries:
+                self.evict()
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def evict(self):
+        """
+        局面数がmax_entriesを超えていたら、最後に使われたのが古い局面から消して上限の9割にする。
+
+        戻り値:
+            int: 消した局面数
+        """
+        count = len(self)
+        if count <= self.max_entries:
+            return 0
+        excess = count - self.max_entries * 9 // 10
+        self.connection.execute(
+            "DELETE FROM analysis WHERE rowid IN (SELECT rowid FROM analysis ORDER BY used LIMIT ?)", (excess,))
+        return excess
+
+    def __len__(self):
+        return self.connection.execute("SELECT entries FROM analysis_count").fetchone()[0]
+
+_ANALYSIS_CACHE = None  # (プロセスID, パス, AnalysisCache)。fork後の子プロセスでは開き直す
+
+def get_analysis_cache():
+    """
+    ANALYSIS_CACHE_PATHの解析キャッシュを開く（プロセスごとに初回だけ開いて使い回す）。
+
+    戻り値:
+        AnalysisCache or None: ANALYSIS_CACHE_PATHがNone、または盤面が8x8でなければNone
+    """
+    global _ANALYSIS_CACHE
+    if not ANALYSIS_CACHE_PATH or BOARD_SIZE != 8:
+        return None  # 局面を64ビット整数で保存するので、8x8以外の盤面では使わない
+    if _ANALYSIS_CACHE is None or _ANALYSIS_CACHE[:2] != (os.getpid(), ANALYSIS_CACHE_PATH):
+        _ANALYSIS_CACHE = (os.getpid(), ANALYSIS_CACHE_PATH, AnalysisCache(ANALYSIS_CACHE_PATH))
+    return _ANALYSIS_CACHE[2]
+
+# === 並列探索 ===
+_SEARCH_POOLS = {}  # ワーカー数 -> (プロセスプール, 共有α)
+_SHARED_ALPHA = None  # ワーカープロセス内で参照する共有α
+
+def _init_parallel_worker(shared_alpha):
+    """
+    並列探索のワーカープロセスを初期化する（プロセスプールのinitializer）。
+
+    引数:
+        shared_alpha: 全ワーカーで共有するα（multiprocessing.Value）
+
+    戻り値:
+        なし
+    """
+    global _SHARED_ALPHA
+    _SHARED_ALPHA = shared_alpha
+
+def get_search_pool(workers):
+    """
+    並列探索用のプロセスプールと共有αを取得する（ワーカー数ごとに1つ作って使い回す）。
+
+    引数:
+        workers: ワーカープロセス数
+
+    戻り値:
+        tuple: (ProcessPoolExecutor, multiprocessing.Value('d'))
+    """
+    if workers not in _SEARCH_POOLS:
+        shared_alpha = multiprocessing.Value('d', float('-inf'))
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_parallel_worker, initargs=(shared_alpha,))
+        _SEARCH_POOLS[workers] = (pool, shared_alpha)
+    return _SEARCH_POOLS[workers]
+
+def shutdown_search_pools():
+    """
+    作成済みのプロセスプールをすべて終了する。
+
+    戻り値:
+        なし
+    """
+    for pool, _ in _SEARCH_POOLS.values():
+        pool.shutdown(cancel_futures=True)
+    _SEARCH_POOLS.clear()
+
+def _parallel_root_worker(own, opp, move, depth, remaining, pv_moves, age, collect_stats=False):
+    """
+    ワーカープロセスでルートの1手を探索する。
+
+    引数:
+        own: ルートの手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        move: 探索するルートの手のビット
+        depth: 探索深さ（整数）
+        remaining: 残り思考時間（秒）。Noneなら時間制限なし
+        pv_moves: 前の反復の読み筋（Zobristキー -> 手のビット）
+        age: 置換表の世代（親プロセスと合わせる）
+        collect_stats: Trueならこの手の探索の統計を集計して返す
+
+    処理:
+        1. 探索開始時点の共有αを読み、幅のない窓のスカウト探索でαを超えるかを調べる。
+        2. 超えた場合は(α, +∞)の窓で探索し直して正確な値を求め、ロックを取って共有αを更新する。
+
+    戻り値:
+        tuple: (スコア, 手のビット, ノード数, 探索に使ったα, 統計のカウンタ（集計しなければNone）, 探索時間（秒）)
+    """
+    start = time.perf_counter()
+    deadline = None if remaining is None else start + remaining
+    ctx = SearchContext(deadline=deadline, stats=SearchStats() if collect_stats else None)
+    ctx.table.age = age
+    ctx.pv_moves = pv_moves
+    ctx.root_depth = depth
+    alpha = _SHARED_ALPHA.value
+    flips = bb_get_flips(own, opp, move)
+    key = bb_zobrist_key(own, opp, True) ^ ZOBRIST_SIDE ^ ZOBRIST_MAX[move.bit_length() - 1] ^ bb_flip_key(flips)
+    child_material = -(bb_material(own, opp) + bb_material_delta(move, flips))
+    score = -bb_negamax(opp ^ flips, own | move | flips, depth - 1, -alpha - 1, -alpha, key, child_material, 1, ctx)
+    if score > alpha:
+        score = -bb_negamax(opp ^ flips, own | move | flips, depth - 1, float('-inf'), -alpha, key, child_material,
+                            1, ctx)
+        with _SHARED_ALPHA.get_lock():
+            if score > _SHARED_ALPHA.value:
+                _SHARED_ALPHA.value = score  # 他のワーカーに良くなったαを知らせる
+    counters = ctx.stats.counters() if collect_stats else None
+    return score, move, ctx.nodes, alpha, counters, time.perf_counter() - start
+
+def bb_parallel_search_root(own, opp, depth, root_moves, ctx):
+    """
+    ルートの手を複数プロセスに分けて探索する（bb_search_rootの並列版）。
+
+    引数:
+        own: 手番側（最大化側）の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        depth: 探索深さ（整数）
+        root_moves: 試す順に並べたルートの手のビットのリスト
+        ctx: SearchContext（workersにワーカー数を持つ）
+
+    処理:
+        1. 最初の手（長男）は自プロセスで全幅の窓で探索し、αを確定させる（Young Brothers Wait）。
+        2. そのαを共有αに設定し、残りの手をワーカープロセスに配る。
+        3. 各ワーカーは共有αを読んで探索し、αを更新したら共有αに書き戻す。
+        4. 結果を集め、αより良い値（正確な値）が返った手の中から最善手を選ぶ。
+        5. どれかのワーカーが時間切れになったら残りを取り消してSearchTimeoutを送出する。
+        ctx.statsがあれば、ワーカーの統計も合算し、手ごとのノード数と時間を記録する。
+
+    戻り値:
+        tuple: (最善手のビット, 最高スコア, スコア順に並べ替えた手のリスト)
+    """
+    key = bb_zobrist_key(own, opp, True)
+    material = bb_material(own, opp)
+    ctx.root_depth = depth
+    stats = ctx.stats
+    start, start_nodes = time.perf_counter(), ctx.nodes
+    first = root_moves[0]
+    flips = bb_get_flips(own, opp, first)
+    child_key = key ^ ZOBRIST_SIDE ^ ZOBRIST_MAX[first.bit_length() - 1] ^ bb_flip_key(flips)
+    best_score = -bb_negamax(opp ^ flips, own | first | flips, depth - 1, float('-inf'), float('inf'), child_key,
+                             -(material + bb_material_delta(first, flips)), 1, ctx)
+    if stats is not None:
+        stats.record_root_move(first, best_score, ctx.nodes - start_nodes, time.perf_counter() - start)
+    best_move = first
+    scored = [(best_score, first)]
+    pool, shared_alpha = get_search_pool(ctx.workers)
+    shared_alpha.value = best_score
+    remaining = None if ctx.deadline is None else max(ctx.deadline - time.perf_counter(), 0.0)
+    futures = [pool.submit(_parallel_root_worker, own, opp, move, depth, remaining, ctx.pv_moves, ctx.table.age,
+                           stats is not None)
+               for move in root_moves[1:]]
+    try:
+        for future in futures:
+            score, move, nodes, alpha, counters, seconds = future.result()
+            ctx.nodes += nodes
+            if stats is not None:
+                stats.merge(counters)
+                stats.record_root_move(move, score, nodes, seconds)
+            scored.append((score, move))
+            # α以下の値は上限でしかないので、正確な値が返った手だけを最善手の候補にする
+            if score > alpha and score > best_score:
+                best_score = score
+                best_move = move
+    except SearchTimeout:
+        for future in futures:
+            future.cancel()
+        raise
+    ctx.table.store(key, depth, TT_EXACT, best_score, best_move)
+    ordered = [move for _, move in sorted(scored, key=lambda item: -item[0])]
+    return best_move, best_score, ordered
+
+def benchmark_position():
+    """
+    並列探索のベンチマークで使う中盤の局面を作る。
+
+    処理:
+        初期局面からBENCHMARK_MOVESの手を黒から交互に打つ（8x8のみ）。
+
+    戻り値:
+        tuple: (ボード, 手番側の石)
+
+    例外:
+        ValueError: 盤面が8x8でない場合
+    """
+    if BOARD_SIZE != 8:
+        raise ValueError("既定のベンチマーク局面は8x8の盤面専用です。局面を指定してください")
+    board = copy.deepcopy(INITIAL_BOARD)
+    stone = PLAYER_STONE
+    for i in range(0, len(BENCHMARK_MOVES), 2):
+        row, col = divmod(text_to_move(BENCHMARK_MOVES[i:i + 2]).bit_length() - 1, BOARD_SIZE)
+        flip_stones(board, row, col, stone)
+        stone = COMPUTER_STONE if stone == PLAYER_STONE else PLAYER_STONE
+    return board, stone
+
+def benchmark_parallel_search(board=None, stone=None, depth=BENCHMARK_DEPTH, worker_counts=None):
+    """
+    並列探索の速度向上をワーカー数ごとに計測する。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）。省略時はbenchmark_positionの中盤の局面
+        stone: 手番側の石（PLAYER_STONEまたはCOMPUTER_STONE）。boardを省略した場合は無視する
+        depth: 固定の探索深さ（整数）
+        worker_counts: 計測するワーカー数のリスト。省略時は1からCPUコア数まで倍々に増やす
+
+    処理:
+        1. ワーカー数ごとに新しいプロセスプールと空の置換表を用意する。
+        2. 深さdepthまでの反復深化にかかった時間とノード数を計測する。
+        3. ワーカー数1の時間を基準に速度向上率を計算する。
+        初期局面のように探索するノードが少ない局面では、プロセス間の通信の時間が勝って速度向上は出ない。
+
+    戻り値:
+        list: {"workers", "seconds", "nodes", "speedup"} の辞書のリスト
+    """
+    if board is None:
+        board, stone = benchmark_position()
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= (os.cpu_count() or 1):
+            worker_counts.append(worker_counts[-1] * 2)
+    own, opp = board_to_bitboards(board, stone)
+    results = []
+    for workers in worker_counts:
+        shutdown_search_pools()  # ワーカー側の置換表も空の状態から始める
+        if workers > 1:
+            get_search_pool(workers)  # プロセス起動時間を計測に含めない
+        ctx = SearchContext(table=TranspositionTable(), workers=workers)
+        start = time.perf_counter()
+        bb_iterative_deepening(own, opp, depth, None, ctx)
+        seconds = time.perf_counter() - start
+        results.append({"workers": workers, "seconds": seconds, "nodes": ctx.nodes,
+                        "speedup": results[0]["seconds"] / seconds if results else 1.0})
+    shutdown_search_pools()
+    return results
+
+def list_find_best_move(board, stone, depth):
+    """
+    2次元リストのボードのまま最善手を選択する（"list"バックエンド）。
 
     引数:
         board: 8x8の2次元リスト（ボード状態）
@@ -334,7 +2527,7 @@ def find_best_move(board, stone, depth):
 
     処理:
         1. 有効な手をすべて取得。
-        2. 各手を試し、アルファベータ枝刈り付きミニマックスでスコアを評価。
+        2. 各手を試し、list_minimaxでスコアを評価。
         3. 最高スコアの手を選択。
         4. 有効な手がない場合、Noneを返す。
 
@@ -349,15 +2542,184 @@ def find_best_move(board, stone, depth):
     alpha = float('-inf')  # 初期アルファ
     beta = float('inf')   # 初期ベータ
     for move in valid_moves:
-        new_board = copy.deepcopy(board)
-        flip_stones(new_board, move[0], move[1], stone)  # 手を試す
-        score = minimax(new_board, depth - 1, False, alpha, beta)  # 次の状態を評価
+        undo = flip_stones(board, move[0], move[1], stone)  # 手をその場で試す
+        score = list_minimax(board, depth - 1, False, alpha, beta)  # 次の状態を評価
+        undo_flip_stones(board, undo)  # 手を戻す
         if score > best_score:
             best_score = score
             best_move = move
         alpha = max(alpha, best_score)  # アルファを更新
     return best_move
 
+# === ポンダリング ===
+class Ponderer:
+    """
+    プレイヤーの入力待ちの間に、プレイヤーの各手に対するコンピュータの応手を探索するバックグラウンドスレッド。
+
+    属性:
+        contexts: 応手を探す局面（コンピュータ側, プレイヤー側のビットボード） -> SearchContext
+        seconds: 局面 -> その局面の探索に使った時間（秒）
+
+    プレイヤーの手を1手ずつ順番に、深さ1, 2, 3, ... と少しずつ深く探索する（全部の手を同じ深さまで読んでから次の深さへ）。
+    結果は共有の置換表と局面ごとのSearchContextに残り、実際の手が決まったらその局面の続きから探索できる。
+    """
+
+    def __init__(self):
+        self.contexts = {}
+        self.seconds = {}
+        self._stopped = False
+        self._thread = None
+
+    def start(self, board):
+        """
+        プレイヤーの手番の局面で先読みを始める。
+
+        引数:
+            board: 8x8の2次元リスト（プレイヤーの手番のボード状態）
+
+        処理:
+            1. プレイヤーの各手を打った後の局面のうち、コンピュータに手があり、空きマスがENDGAME_EMPTIESより多い
+               局面を集める（終盤完全読みに切り替わる局面は先読みの結果が使われないため除く）。
+            2. 局面ごとにSearchContextを作り、デーモンスレッドで探索を始める（集まらなければスレッドは作らない）。
+
+        戻り値:
+            なし
+        """
+        player, computer = board_to_bitboards(board, PLAYER_STONE)
+        replies = bb_get_moves(player, computer)
+        while replies:
+            reply = replies & -replies
+            replies ^= reply
+            flips = bb_get_flips(player, computer, reply)
+            own, opp = computer ^ flips, player | reply | flips
+            if (BB_FULL & ~(own | opp)).bit_count() <= ENDGAME_EMPTIES:
+                continue  # handle_computer_turnが読み切るので、先読みしても使われない
+            moves = bb_get_moves(own, opp)
+            if not moves:
+                continue  # コンピュータはパスするので探索しない
+            ctx = SearchContext(deadline=float('inf'))
+            while moves:
+                move = moves & -moves
+                ctx.root_moves.append(move)
+                moves ^= move
+            ctx.best_move = ctx.root_moves[0]
+            self.contexts[(own, opp)] = ctx
+            self.seconds[(own, opp)] = 0.0
+        if self.contexts:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """
+        先読みスレッドの本体。止められるか、すべての局面を最後まで読み切るまで探索する。
+
+        戻り値:
+            なし
+        """
+        TRANSPOSITION_TABLE.new_search()
+        depth = 1
+        while any(depth <= (BB_FULL & ~(own | opp)).bit_count() for own, opp in self.contexts):
+            for (own, opp), ctx in self.contexts.items():
+                if self._stopped:
+                    return
+                if depth > (BB_FULL & ~(own | opp)).bit_count():
+                    continue
+                start = time.perf_counter()
+                try:
+                    move, score, ctx.root_moves = bb_search_root(own, opp, depth, ctx.root_moves, ctx)
+                except SearchTimeout:
+                    return  # 止められた（途中の反復は捨てる）
+                finally:
+                    self.seconds[(own, opp)] += time.perf_counter() - start
+                ctx.best_move = move
+                ctx.best_score = score
+                ctx.scores.append(score)
+                ctx.completed_depth = depth
+                ctx.pv_moves = dict(bb_principal_variation(own, opp, depth, ctx.table))
+            depth += 1
+
+    def stop(self, board):
+        """
+        先読みを止め、実際の局面の探索結果を取り出す。
+
+        引数:
+            board: 8x8の2次元リスト（プレイヤーが打った後のボード状態）
+
+        処理:
+            1. 止める合図を出し、探索中の局面の打ち切り時刻を過去にしてスレッドの終了を待つ。
+            2. 実際の局面と一致する局面のSearchContextと、その局面に使った時間を返す。
+
+        戻り値:
+            tuple or None: (SearchContext, 先読みに使った時間（秒）)。一致する局面を読んでいなければNone
+        """
+        self._stopped = True
+        for ctx in self.contexts.values():
+            ctx.deadline = 0.0  # 次の時間確認でSearchTimeoutになる
+        if self._thread is not None:
+            self._thread.join()
+        position = board_to_bitboards(board, COMPUTER_STONE)
+        ctx = self.contexts.get(position)
+        if ctx is None or not ctx.completed_depth:
+            return None
+        return ctx, self.seconds[position]
+
+# === 棋譜 ===
+def find_played_move(before, after):
+    """
+    1手前後のボードを比べて、打たれた手を求める。
+
+    引数:
+        before: 着手前のボード
+        after: 着手後のボード
+
+    戻り値:
+        tuple or None: 新しく石が置かれたマスの座標（row, col）。パスならNone
+    """
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            if before[row][col] == EMPTY and after[row][col] != EMPTY:
+                return row, col
+    return None
+
+def format_game_record(moves, metadata):
+    """
+    1局を棋譜の1行にする。
+
+    引数:
+        moves: 手の表記（"e3" など）のリスト。黒から交互に打った順（パスは含めない）
+        metadata: JSONに変換できる辞書（日時、結果など）
+
+    処理:
+        手の表記を区切りなしでつなげ、タブの後にメタデータのJSONを続ける
+        （パスは棋譜に残さず、読み込むときに打てる手がないことから補う）。
+        10x10以上の盤面では "a10" のように3文字の手があるが、どの手も英字1文字で始まるので、
+        読み込むときは英字とそれに続く数字で1手に区切る。
+
+    戻り値:
+        str: 改行を含まない1行（例: "e3f6f5...\t{"result": ...}"）
+    """
+    return "".join(moves) + "\t" + json.dumps(metadata, ensure_ascii=False)
+
+def save_game_record(path, moves, board, finished):
+    """
+    main()で打った1局の棋譜をファイルに1行追記する。
+
+    引数:
+        path: 追記するファイルのパス
+        moves: 手の表記のリスト
+        board: 最後の局面のボード
+        finished: 終局まで打ったならTrue（途中で終了したならFalse）
+
+    戻り値:
+        なし
+    """
+    player_count, computer_count = get_stone_counts(board)
+    metadata = {"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "black": "player", "white": "computer",
+                "board_size": BOARD_SIZE, "evaluator": EVALUATOR, "time_limit": SEARCH_TIME_LIMIT, "finished": finished,
+                "black_discs": player_count, "white_discs": computer_count}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(format_game_record(moves, metadata) + "\n")
+
 # === ターン処理 ===
 def handle_player_turn(board):
     """
@@ -388,27 +2750,34 @@ def handle_player_turn(board):
             print("ゲームを終了します。")
             time.sleep(1)  # メッセージを読みやすくする待機
             return None
-        if len(move_str) != 2 or move_str[0] not in 'abcdefgh' or move_str[1] not in '12345678':
+        try:
+            move = text_to_move(move_str)
+        except ValueError:
+            move = 0
+        if not move:
             print("無効な入力です（例: a1）。")
             continue
-        col, row = ord(move_str[0]) - ord('a'), int(move_str[1]) - 1
+        row, col = divmod(move.bit_length() - 1, BOARD_SIZE)
         if (row, col) in valid_moves:
             flip_stones(board, row, col, PLAYER_STONE)  # 石を配置
             return True
         print("その場所には置けません。")
 
-def handle_computer_turn(board):
+def handle_computer_turn(board, pondered=None):
     """
     コンピュータのターンを処理する。
 
     引数:
         board: 8x8の2次元リスト（ボード状態）
+        pondered: Ponderer.stopの戻り値（この局面を先読みしたSearchContextと使った時間）またはNone
 
     処理:
         1. 有効な手を確認。
         2. 有効な手がない場合、パスを通知しFalseを返す。
-        3. ミニマックスで最善手を選択。
-        4. 選択した手に石を配置し、Trueを返す。
+        3. 空きマスがENDGAME_EMPTIES以下なら、ENDGAME_TIME_LIMITの範囲で最後まで読み切る。
+        4. 読み切れない場合は、思考時間SEARCH_TIME_LIMITの範囲で反復深化により最善手を選択。
+           先読みしていれば、その続きの深さから、先読みに使った時間を差し引いた思考時間で探索する。
+        5. 選択した手に石を配置し、Trueを返す。
 
     戻り値:
         bool: 手が置けた場合はTrue、パスならFalse
@@ -419,8 +2788,18 @@ def handle_computer_turn(board):
         time.sleep(1)  # メッセージを読みやすくする待機
         return False
     print("コンピュータのターン（白）。")
-    time.sleep(1)  # 思考を演出（2秒から1秒に短縮）
-    move = find_best_move(board, COMPUTER_STONE, MINIMAX_DEPTH)
+    move = None
+    empties = sum(row.count(EMPTY) for row in board)
+    if empties <= ENDGAME_EMPTIES:
+        solved = solve_endgame(board, COMPUTER_STONE, time_limit=ENDGAME_TIME_LIMIT)  # 終盤は読み切る
+        if solved:
+            move = solved[0]
+    if move is None:
+        resume, time_limit = None, SEARCH_TIME_LIMIT
+        if pondered:
+            resume, seconds = pondered
+            time_limit = max(SEARCH_TIME_LIMIT - seconds, 0.0)  # 先読みした分だけ思考時間を短くする
+        move = find_best_move(board, COMPUTER_STONE, time_limit=time_limit, resume=resume)  # 思考時間いっぱいまで探索
     if move:
         row, col = move
         print(f"コンピュータが {chr(ord('a') + col)}{row + 1} に置きました。")
@@ -436,8 +2815,9 @@ def main():
     処理:
         1. 初期ボードを準備。
         2. プレイヤーとコンピュータのターンを交互に処理。
+           PONDERINGがTrueなら、プレイヤーの入力待ちの間にコンピュータの応手を先読みする。
         3. ゲーム終了条件を満たすまでループ。
-        4. 終了時に結果を表示。
+        4. 終了時に結果を表示し、GAME_RECORD_PATHが設定されていれば棋譜を1行追記する（途中で終了した場合も）。
 
     戻り値:
         なし
@@ -445,6 +2825,8 @@ def main():
     board = copy.deepcopy(INITIAL_BOARD)
     current_turn = PLAYER_STONE
     pass_count = 0
+    pondered = None  # 直前のプレイヤーの手に対する先読みの結果
+    moves = []  # 棋譜（打った手の表記）
 
     while True:
         display_game_state(board)  # ボード表示
@@ -453,17 +2835,30 @@ def main():
 
         if check_game_end(board, player_moves, computer_moves, pass_count):
             display_end_game_results(board)  # 最終結果表示
+            if GAME_RECORD_PATH:
+                save_game_record(GAME_RECORD_PATH, moves, board, True)
             return
 
+        before = [row[:] for row in board]  # 打たれた手を棋譜に残すため、着手前の局面を控える
         if current_turn == PLAYER_STONE:
+            ponderer = Ponderer() if PONDERING else None
+            if ponderer:
+                ponderer.start(board)  # 入力待ちの間に応手を先読み
             result = handle_player_turn(board)  # プレイヤーのターン
+            pondered = ponderer.stop(board) if ponderer else None
             if result is None:  # 終了選択
+                if GAME_RECORD_PATH and moves:
+                    save_game_record(GAME_RECORD_PATH, moves, board, False)
                 return
             pass_count = 0 if result else pass_count + 1
         else:
-            result = handle_computer_turn(board)  # コンピュータのターン
+            result = handle_computer_turn(board, pondered)  # コンピュータのターン
+            pondered = None
             pass_count = 0 if result else pass_count + 1
 
+        played = find_played_move(before, board)
+        if played:
+            moves.append(move_to_text(1 << (played[0] * BOARD_SIZE + played[1])))
         current_turn = COMPUTER_STONE if current_turn == PLAYER_STONE else PLAYER_STONE  # ターン交代
 
 if __name__ == "__main__":
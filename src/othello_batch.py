@@ -0,0 +1,268 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+import othello
+
+if othello.BOARD_SIZE != 8:
+    raise ImportError("othello_batchはuint64のビットボードを使うため、8x8の盤面でのみ使えます")
+
+# NumPyのuint64で表したビットボード用の定数（othello.pyのビットボードと同じマスの並び）
+NP_FULL = np.uint64(othello.BB_FULL)
+NP_CORNERS = np.uint64(othello.BB_CORNERS)
+NP_LEFT_SHIFTS = [(np.uint64(shift), np.uint64(mask)) for shift, mask in othello.BB_LEFT_SHIFTS]
+NP_RIGHT_SHIFTS = [(np.uint64(shift), np.uint64(mask)) for shift, mask in othello.BB_RIGHT_SHIFTS]
+NP_SQUARES = np.arange(othello.BOARD_SIZE * othello.BOARD_SIZE, dtype=np.uint64)
+# パターン評価の各インスタンス (評価値の表, マス番号の配列, 各桁の重み（3のべき乗）)
+NP_PATTERNS = [(np.array(table, dtype=np.int64), np.array(squares), 3 ** np.arange(len(squares), dtype=np.int64))
+               for table, squares in othello.PATTERN_INSTANCES]
+_POPCOUNT_BYTES = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+def popcount(bits):
+    """
+    uint64の配列の各要素の立っているビット数を数える。
+
+    引数:
+        bits: uint64の配列
+
+    処理:
+        NumPy 2.0以降ならnp.bitwise_countを使い、それより古ければ8バイトに分けて表を引いて合計する。
+
+    戻り値:
+        numpy.ndarray: int64の配列（bitsと同じ形）
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).astype(np.int64)
+    bits = np.ascontiguousarray(bits, dtype=np.uint64)
+    return _POPCOUNT_BYTES[bits.view(np.uint8)].reshape(bits.shape + (8,)).sum(axis=-1)
+
+def to_bitboards(positions):
+    """
+    局面の配列を、コンピュータから見た (自分, 相手) のuint64配列の組に変換する。
+
+    引数:
+        positions: 次のいずれか
+            - (N, 8, 8) の文字の配列（othello.pyのボードと同じ "@", "O", "."）
+            - (N, 8, 8) の数値の配列（1: コンピュータの石、-1: プレイヤーの石、0: 空き）
+            - (自分, 相手) のビットボードの組、または (N, 2) のビットボードの配列
+
+    処理:
+        1. 8x8の配列なら、各マスが自分・相手の石かを真偽値にし、packbitsで64ビットにまとめる。
+        2. ビットボードならuint64に変換するだけ。
+
+    戻り値:
+        tuple: (コンピュータの石, プレイヤーの石) のuint64配列（各 (N,)）
+    """
+    if isinstance(positions, tuple):
+        return np.asarray(positions[0], dtype=np.uint64), np.asarray(positions[1], dtype=np.uint64)
+    positions = np.asarray(positions)
+    if positions.ndim == 2:
+        return positions[:, 0].astype(np.uint64), positions[:, 1].astype(np.uint64)
+    cells = positions.reshape(len(positions), -1)
+    if cells.dtype.kind in "USO":
+        own, opp = cells == othello.COMPUTER_STONE, cells == othello.PLAYER_STONE
+    else:
+        own, opp = cells == 1, cells == -1
+    # マスnが下位からnビット目になるように、リトルエンディアンの8バイトとしてまとめる
+    own_bits = np.packbits(own, axis=1, bitorder="little").view("<u8")[:, 0].astype(np.uint64)
+    opp_bits = np.packbits(opp, axis=1, bitorder="little").view("<u8")[:, 0].astype(np.uint64)
+    return own_bits, opp_bits
+
+def batch_moves(own, opp):
+    """
+    全局面の有効な手をまとめて求める（othello.bb_get_movesの配列版）。
+
+    引数:
+        own: 手番側の石のuint64配列
+        opp: 相手の石のuint64配列
+
+    戻り値:
+        numpy.ndarray: 有効な手のビットボードのuint64配列
+    """
+    empty = ~(own | opp) & NP_FULL
+    moves = np.zeros_like(own)
+    for shifts, shift_op in ((NP_LEFT_SHIFTS, np.left_shift), (NP_RIGHT_SHIFTS, np.right_shift)):
+        for shift, mask in shifts:
+            line = opp & mask
+            run = line & shift_op(own, shift)
+            for _ in range(othello.BB_FILL_STEPS):
+                run |= line & shift_op(run, shift)
+            moves |= shift_op(run, shift) & mask
+    return moves & empty
+
+def batch_neighbors(bits):
+    """
+    各局面で、指定したマスに8方向で隣接するマスを求める（othello.bb_neighborsの配列版）。
+
+    引数:
+        bits: マスのビットボードのuint64配列
+
+    戻り値:
+        numpy.ndarray: 隣接するマスのuint64配列
+    """
+    neighbors = np.zeros_like(bits)
+    for shift, mask in NP_LEFT_SHIFTS:
+        neighbors |= np.left_shift(bits, shift) & mask
+    for shift, mask in NP_RIGHT_SHIFTS:
+        neighbors |= np.right_shift(bits, shift) & mask
+    return neighbors
+
+def batch_evaluate(own, opp, own_moves=None, opp_moves=None, evaluator=None):
+    """
+    全局面の評価値をまとめて求める（othello.bb_evaluateの配列版）。
+
+    引数:
+        own: 評価する側の石のuint64配列
+        opp: 相手の石のuint64配列
+        own_moves: ownの有効な手（計算済みなら渡す。省略時はbatch_movesで求める）
+        opp_moves: oppの有効な手（同上）
+        evaluator: "pattern" または "simple"。省略時はothello.EVALUATOR
+
+    処理:
+        1. "simple"なら、角の石の差 * CORNER_VALUE + 石の数の差 + 着手可能数の差 * MOBILITY_VALUE。
+        2. "pattern"なら、各パターンのマスを3進数の番号にして評価値の表を引いて合計し、
+           開放石の数の差 * FRONTIER_VALUE を引き、着手可能数の差 * MOBILITY_VALUE を加える。
+
+    戻り値:
+        numpy.ndarray: int64の評価値の配列（ownにとって高いほど良い）
+    """
+    evaluator = evaluator or othello.EVALUATOR
+    if own_moves is None:
+        own_moves = batch_moves(own, opp)
+    if opp_moves is None:
+        opp_moves = batch_moves(opp, own)
+    mobility = (popcount(own_moves) - popcount(opp_moves)) * othello.MOBILITY_VALUE
+    if evaluator != "pattern":
+        corners = popcount(own & NP_CORNERS) - popcount(opp & NP_CORNERS)
+        return corners * othello.CORNER_VALUE + popcount(own) - popcount(opp) + mobility
+    # 各マスを 0: 空き、1: 評価する側、2: 相手 の3進数の桁にする
+    digits = (((own[:, None] >> NP_SQUARES) & np.uint64(1)) + 2 * ((opp[:, None] >> NP_SQUARES) & np.uint64(1)))
+    digits = digits.astype(np.int64)
+    score = np.zeros(len(own), dtype=np.int64)
+    for table, squares, weights in NP_PATTERNS:
+        score += table[digits[:, squares] @ weights]
+    frontier = batch_neighbors(~(own | opp) & NP_FULL)
+    score -= (popcount(own & frontier) - popcount(opp & frontier)) * othello.FRONTIER_VALUE
+    return score + mobility
+
+def analyze_positions(positions, evaluator=None):
+    """
+    局面の配列をまとめて解析する。
+
+    引数:
+        positions: to_bitboardsが受け付ける局面の配列（コンピュータから見て評価する）
+        evaluator: "pattern" または "simple"。省略時はothello.EVALUATOR
+
+    処理:
+        1. ビットボードに変換し、両者の有効な手・石の数・評価値をまとめて求める。
+
+    戻り値:
+        dict: 次のキーを持つ辞書（値はすべて長さNの配列）
+            "scores": 評価値（evaluate_boardと同じ値）
+            "computer_moves", "player_moves": 有効な手のビットボード（uint64）
+            "computer_count", "player_count": 石の数
+    """
+    own, opp = to_bitboards(positions)
+    own_moves = batch_moves(own, opp)
+    opp_moves = batch_moves(opp, own)
+    return {
+        "scores": batch_evaluate(own, opp, own_moves, opp_moves, evaluator),
+        "computer_moves": own_moves,
+        "player_moves": opp_moves,
+        "computer_count": popcount(own),
+        "player_count": popcount(opp),
+    }
+
+def masks_to_arrays(bits):
+    """
+    ビットボードの配列を (N, 8, 8) の真偽値の配列に変換する（有効な手のマスクの表示などに使う）。
+
+    引数:
+        bits: uint64の配列
+
+    戻り値:
+        numpy.ndarray: (N, 8, 8) のbool配列
+    """
+    cells = (np.asarray(bits, dtype=np.uint64)[:, None] >> NP_SQUARES) & np.uint64(1)
+    return cells.astype(bool).reshape(-1, othello.BOARD_SIZE, othello.BOARD_SIZE)
+
+def random_positions(count, seed=0):
+    """
+    初期局面からランダムに打って、ベンチマーク用の局面を作る。
+
+    引数:
+        count: 局面数
+        seed: 乱数シード
+
+    戻り値:
+        tuple: (コンピュータの石, プレイヤーの石) のuint64配列
+    """
+    rng = random.Random(seed)
+    own_list, opp_list = [], []
+    while len(own_list) < count:
+        own, opp = othello.board_to_bitboards(othello.INITIAL_BOARD, othello.COMPUTER_STONE)
+        for _ in range(rng.randint(0, 60)):
+            moves = othello.bb_get_moves(own, opp)
+            if not moves:
+                own, opp = opp, own  # パス
+                continue
+            move = 1 << rng.choice([r * othello.BOARD_SIZE + c for r, c in othello.bb_to_moves(moves)])
+            flips = othello.bb_get_flips(own, opp, move)
+            own, opp = opp ^ flips, own | move | flips
+        # 局面ごとにどちらをコンピュータとするかもランダムに決める
+        if rng.random() < 0.5:
+            own, opp = opp, own
+        own_list.append(own)
+        opp_list.append(opp)
+    return np.array(own_list, dtype=np.uint64), np.array(opp_list, dtype=np.uint64)
+
+def main():
+    """
+    NumPyによる一括評価の速度を計測し、evaluate_boardと結果が一致するか確かめる。
+
+    処理:
+        1. ランダムな局面をN個作る。
+        2. (N, 8, 8) の配列から一括解析した時間と、evaluate_boardを1局面ずつ呼んだ時間を計測する。
+        3. 評価値・有効な手・石の数がすべて一致するか確かめ、1秒あたりの局面数を表示する。
+
+    戻り値:
+        なし（一致しなければ終了コード1で終了）
+    """
+    parser = argparse.ArgumentParser(description="NumPyによるオセロ局面の一括評価のベンチマークを行います。")
+    parser.add_argument("--positions", type=int, default=100000, help="局面数")
+    parser.add_argument("--evaluator", choices=["pattern", "simple"], default=othello.EVALUATOR, help="評価関数")
+    parser.add_argument("--seed", type=int, default=0, help="局面を作る乱数シード")
+    args = parser.parse_args()
+
+    othello.EVALUATOR = args.evaluator
+    own, opp = random_positions(args.positions, args.seed)
+    boards = [othello.bitboards_to_board(int(o), int(p), othello.COMPUTER_STONE) for o, p in zip(own, opp)]
+    array = np.array(boards)
+
+    start = time.perf_counter()
+    result = analyze_positions(array)
+    batch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [othello.evaluate_board(board) for board in boards]
+    loop_seconds = time.perf_counter() - start
+
+    mismatches = int(np.count_nonzero(result["scores"] != np.array(expected, dtype=np.int64)))
+    for index, board in enumerate(boards):
+        computer, player = othello.board_to_bitboards(board, othello.COMPUTER_STONE)
+        if (int(result["computer_moves"][index]) != othello.bb_get_moves(computer, player)
+                or int(result["player_moves"][index]) != othello.bb_get_moves(player, computer)
+                or int(result["computer_count"][index]) != computer.bit_count()
+                or int(result["player_count"][index]) != player.bit_count()):
+            mismatches += 1
+    print(f"局面数: {args.positions}  評価関数: {args.evaluator}")
+    print(f"一括評価（NumPy）: {batch_seconds:.3f} 秒  {args.positions / batch_seconds:>12,.0f} 局面/秒")
+    print(f"evaluate_board:    {loop_seconds:.3f} 秒  {args.positions / loop_seconds:>12,.0f} 局面/秒")
+    if mismatches:
+        print(f"不一致: {mismatches} 件")
+        raise SystemExit(1)
+    print("すべての局面で評価値・有効な手・石の数が一致しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import time
+
+import othello
+
+def main():
+    """
+    オセロの定石ブックを作成する。
+
+    処理:
+        1. コマンドライン引数から手数・探索深さ・出力先を受け取る。
+        2. othello.build_opening_bookで初期局面から局面をたどって探索し、ファイルに書き出す。
+        3. 登録した局面数とかかった時間を表示する。
+
+    戻り値:
+        なし
+    """
+    parser = argparse.ArgumentParser(description="オセロの定石ブックを作成します。")
+    parser.add_argument("--plies", type=int, default=othello.BOOK_PLIES, help="登録する最大の手数")
+    parser.add_argument("--depth", type=int, default=othello.BOOK_SEARCH_DEPTH, help="各局面の探索深さ")
+    parser.add_argument("--output", default=othello.OPENING_BOOK_PATH, help="出力するファイル")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = othello.build_opening_book(
+        args.output, plies=args.plies, depth=args.depth,
+        progress=lambda n: print(f"\r登録した局面: {n}", end="", flush=True))
+    print(f"\n{count} 局面を {args.output} に書き出しました（{time.perf_counter() - start:.1f} 秒）。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+import argparse
+import json
+import sys
+import time
+
+import othello
+
+# 局面の文字列表記: 64マスを行優先に並べた "@"（黒）、"O"（白）、"."（空き）と、空白の後に手番側の石
+START_POSITION = "".join("".join(row) for row in othello.INITIAL_BOARD) + " " + othello.PLAYER_STONE
+STONES = (othello.PLAYER_STONE, othello.COMPUTER_STONE)
+
+def parse_position(text):
+    """
+    局面の文字列表記を (ボード, 手番側の石) に変換する。
+
+    引数:
+        text: "startpos"、または64マスの文字列と手番側の石を空白で区切ったもの
+
+    戻り値:
+        tuple: (8x8の2次元リスト, 手番側の石)
+
+    例外:
+        ValueError: 表記が正しくない場合
+    """
+    text = text.strip()
+    if text == "startpos":
+        text = START_POSITION
+    cells, _, stone = text.partition(" ")
+    stone = stone.strip()
+    size = othello.BOARD_SIZE
+    if len(cells) != size * size or set(cells) - {othello.EMPTY, *STONES}:
+        raise ValueError(f"局面は {size * size} 文字の '{othello.PLAYER_STONE}', '{othello.COMPUTER_STONE}', "
+                         f"'{othello.EMPTY}' で指定してください")
+    if stone not in STONES:
+        raise ValueError(f"手番は '{othello.PLAYER_STONE}' または '{othello.COMPUTER_STONE}' で指定してください")
+    return [list(cells[r * size:(r + 1) * size]) for r in range(size)], stone
+
+def format_position(board, stone):
+    """
+    (ボード, 手番側の石) を局面の文字列表記にする（parse_positionの逆）。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        stone: 手番側の石
+
+    戻り値:
+        str: 64マスの文字列と手番側の石
+    """
+    return "".join("".join(row) for row in board) + " " + stone
+
+def analyze_position(board, stone, depth=None, time_limit=None, solve=False, stats=False):
+    """
+    1つの局面を探索し、最善手・評価値・読み筋・ノード数をまとめる（画面表示や定石ブックは使わない）。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）
+        stone: 手番側の石
+        depth: 最大の探索深さ。省略時はtime_limitがなければMINIMAX_DEPTH、あれば制限なし
+        time_limit: 思考時間（秒）。Noneなら深さだけで打ち切る
+        solve: Trueなら最後まで読み切り、評価値を最終石数差にする（読み切れなければ通常の探索）
+        stats: Trueなら探索の統計（SearchStats.to_dict）を "stats" に含める
+
+    処理:
+        1. 両者とも打てなければ、終局として最終石数差を返す。
+        2. 手番側だけ打てなければ、相手番の局面を探索して評価値を反転し、読み筋の先頭にパスを加える。
+        3. solveなら読み切り、そうでなければbb_search_with_cacheで探索する
+           （解析キャッシュに同じ深さ以上の結果があれば探索せずに使い、"cached"をTrueにする）。
+        4. 読み筋は置換表の最善手をたどって取り出す（キャッシュの結果なら最善手だけ）。
+
+    戻り値:
+        dict: {"move", "score", "depth", "exact", "pv", "nodes", "cached", "seconds", "nps"}
+              （moveは "d3" のような表記で、終局ならNone。scoreは手番側から見た値）
+    """
+    if depth is None:
+        depth = othello.MINIMAX_DEPTH if time_limit is None else othello.BOARD_SIZE * othello.BOARD_SIZE
+    own, opp = othello.board_to_bitboards(board, stone)
+    start = time.perf_counter()
+    if not othello.bb_get_moves(own, opp):
+        if not othello.bb_get_moves(opp, own):
+            return {"move": None, "score": othello.bb_final_score(own, opp), "depth": 0, "exact": True, "pv": [],
+                    "nodes": 1, "cached": False, "seconds": time.perf_counter() - start, "nps": 0.0}
+        opponent = othello.COMPUTER_STONE if stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+        result = analyze_position(board, opponent, max(depth - 1, 1), time_limit, solve, stats)
+        result.update(move="pass", score=-result["score"], depth=result["depth"] + 1, pv=["pass"] + result["pv"])
+        return result
+    deadline = None if time_limit is None else start + time_limit
+    result = None
+    if solve:
+        ctx = othello.SearchContext(deadline=deadline)
+        try:
+            move, score = othello.bb_solve_endgame_root(own, opp, othello.ENDGAME_MODE, ctx)
+            empties = (othello.BB_FULL & ~(own | opp)).bit_count()
+            result = {"move": othello.move_to_text(move), "score": score, "depth": empties, "exact": True,
+                      "pv": [othello.move_to_text(move)], "nodes": ctx.nodes, "cached": False}
+        except othello.SearchTimeout:
+            pass  # 読み切れなければ通常の探索に切り替える
+    if result is None:
+        ctx = othello.SearchContext(workers=othello.SEARCH_WORKERS, stats=othello.SearchStats() if stats else None)
+        move = othello.bb_search_with_cache(own, opp, depth, deadline, ctx)
+        pv = othello.bb_principal_variation(own, opp, ctx.completed_depth, ctx.table)
+        pv = [othello.move_to_text(pv_move) for _, pv_move in pv]
+        if ctx.cache_hit or not pv or pv[0] != othello.move_to_text(move):
+            pv = [othello.move_to_text(move)]  # 置換表に読み筋が残っていなければ最善手だけにする
+        result = {"move": othello.move_to_text(move), "score": ctx.best_score, "depth": ctx.completed_depth,
+                  "exact": False, "pv": pv, "nodes": ctx.nodes, "cached": ctx.cache_hit}
+        if stats:
+            result["stats"] = ctx.stats.to_dict()
+    seconds = time.perf_counter() - start
+    result.update(seconds=seconds, nps=result["nodes"] / seconds if seconds else 0.0)
+    return result
+
+class EngineProtocol:
+    """
+    標準入出力の1行1コマンドのプロトコルでエンジンを操作する（GTPのように応答は "=" または "?" で始まる）。
+
+    属性:
+        board: 現在の局面のボード
+        stone: 手番側の石
+        depth: goで使う最大の探索深さ（Noneなら既定）
+        time_limit: goで使う思考時間（秒）。Noneなら深さだけで打ち切る
+
+    コマンド:
+        position startpos | position <64マス> <手番>   局面を設定する
+        play <手>                                      手番側が打つ（"pass" も可）
+        go [depth N] [time 秒] [solve]                 探索して最善手・評価値・読み筋・ノード数を返す
+        moves / eval / show                            有効な手 / 静的評価 / 局面を返す
+        set depth N | set time 秒 | set evaluator 名 | set workers N
+        newgame / quit                                 置換表を消して初期局面に戻す / 終了する
+    """
+
+    def __init__(self, depth=None, time_limit=None):
+        self.board, self.stone = parse_position("startpos")
+        self.depth = depth
+        self.time_limit = time_limit
+
+    def handle(self, line):
+        """
+        1行のコマンドを実行して応答を返す。
+
+        引数:
+            line: コマンドの行
+
+        戻り値:
+            str or None: 応答（成功は "= 結果"、失敗は "? 理由"）。空行ならNone
+        """
+        words = line.split()
+        if not words:
+            return None
+        command, args = words[0].lower(), words[1:]
+        handler = getattr(self, f"cmd_{command}", None)
+        if handler is None:
+            return f"? 不明なコマンドです: {command}"
+        try:
+            return "= " + handler(args)
+        except (ValueError, IndexError) as error:
+            return f"? {error}"
+
+    def cmd_position(self, args):
+        """局面を設定する（引数: "startpos" または64マスと手番）。"""
+        self.board, self.stone = parse_position(" ".join(args))
+        return ""
+
+    def cmd_play(self, args):
+        """手番側が1手打ち、手番を交代する（有効な手があるときのパスは不可）。"""
+        move = othello.text_to_move(args[0])
+        own, opp = othello.board_to_bitboards(self.board, self.stone)
+        moves = othello.bb_get_moves(own, opp)
+        if move and not move & moves or not move and moves:
+            raise ValueError(f"{args[0]} は打てません")
+        if move:
+            othello.flip_stones(self.board, *divmod(move.bit_length() - 1, othello.BOARD_SIZE), self.stone)
+        self.stone = othello.COMPUTER_STONE if self.stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+        return ""
+
+    def cmd_go(self, args):
+        """現在の局面を探索し、"最善手 score 評価値 depth 深さ nodes ノード数 nps 速度 time 秒 pv 読み筋" を返す。"""
+        depth, time_limit, solve = self.depth, self.time_limit, False
+        words = iter(args)
+        for word in words:
+            if word == "depth":
+                depth = int(next(words, ""))
+            elif word == "time":
+                time_limit = float(next(words, ""))
+            elif word == "solve":
+                solve = True
+            else:
+                raise ValueError(f"不明な指定です: {word}")
+        result = analyze_position(self.board, self.stone, depth, time_limit, solve)
+        return (f"{result['move'] or 'none'} score {result['score']} depth {result['depth']} "
+                f"nodes {result['nodes']} nps {result['nps']:.0f} time {result['seconds']:.3f} "
+                f"pv {' '.join(result['pv'])}").rstrip()
+
+    def cmd_moves(self, args):
+        """手番側の有効な手を空白区切りで返す。"""
+        own, opp = othello.board_to_bitboards(self.board, self.stone)
+        moves = othello.bb_get_moves(own, opp)
+        return " ".join(othello.move_to_text(1 << (r * othello.BOARD_SIZE + c)) for r, c in othello.bb_to_moves(moves))
+
+    def cmd_eval(self, args):
+        """手番側から見た静的評価値（bb_evaluate）を返す。"""
+        return str(othello.bb_evaluate(*othello.board_to_bitboards(self.board, self.stone)))
+
+    def cmd_show(self, args):
+        """現在の局面の文字列表記を返す。"""
+        return format_position(self.board, self.stone)
+
+    def cmd_set(self, args):
+        """goの既定の深さ・思考時間、評価関数、並列探索のプロセス数を設定する（評価関数を変えたら置換表を消す）。"""
+        name, value = args[0], args[1]
+        if name == "depth":
+            self.depth = int(value)
+        elif name == "time":
+            self.time_limit = None if value.lower() == "none" else float(value)
+        elif name == "evaluator":
+            if value not in ("pattern", "simple"):
+                raise ValueError(f"不明な評価関数です: {value}")
+            if value != othello.EVALUATOR:
+                othello.TRANSPOSITION_TABLE.clear()  # 前の評価関数で求めた評価値を使わない
+            othello.EVALUATOR = value
+        elif name == "workers":
+            othello.SEARCH_WORKERS = int(value)
+        else:
+            raise ValueError(f"不明な設定です: {name}")
+        return ""
+
+    def cmd_newgame(self, args):
+        """置換表を消し、初期局面に戻す。"""
+        othello.TRANSPOSITION_TABLE.clear()
+        self.board, self.stone = parse_position("startpos")
+        return ""
+
+def run_protocol(input_file, output_file, depth=None, time_limit=None):
+    """
+    プロトコルモード: 1行ずつコマンドを読み、応答と空行を書き出す（quitまたは入力の終わりで終了）。
+
+    引数:
+        input_file: コマンドを読むファイル（通常は標準入力）
+        output_file: 応答を書くファイル（通常は標準出力）
+        depth: goの既定の探索深さ
+        time_limit: goの既定の思考時間（秒）
+
+    戻り値:
+        なし
+    """
+    engine = EngineProtocol(depth, time_limit)
+    for line in input_file:
+        if line.strip().lower() == "quit":
+            output_file.write("=\n\n")
+            break
+        response = engine.handle(line)
+        if response is not None:
+            output_file.write(response.rstrip() + "\n\n")
+            output_file.flush()
+
+def parse_stream_line(line):
+    """
+    ストリームモードの入力1行を解析する。
+
+    引数:
+        line: JSONのオブジェクト（{"position": ..., "board": [...], "stone", "depth", "time", "solve", "id"}）
+              または局面の文字列表記
+
+    戻り値:
+        tuple: (ボード, 手番側の石, 局面ごとの指定の辞書)
+
+    例外:
+        ValueError: 局面、または "depth"（正の整数）・"time"（正の数）・"solve"（真偽値）の指定が正しくない場合
+    """
+    line = line.strip()
+    if not line.startswith("{"):
+        board, stone = parse_position(line)
+        return board, stone, {}
+    request = json.loads(line)
+    depth, time_limit = request.get("depth"), request.get("time")
+    if depth is not None and (type(depth) is not int or depth < 1):
+        raise ValueError(f"depth は正の整数で指定してください: {depth!r}")
+    if time_limit is not None and (type(time_limit) not in (int, float) or not time_limit > 0):
+        raise ValueError(f"time は正の数（秒）で指定してください: {time_limit!r}")
+    if not isinstance(request.get("solve", False), bool):
+        raise ValueError(f"solve は true または false で指定してください: {request['solve']!r}")
+    board_rows = request.get("board", [])
+    if not isinstance(board_rows, list) or not all(isinstance(row, str) for row in board_rows):
+        raise ValueError("board は行の文字列のリストで指定してください")
+    if not all(isinstance(request.get(key, ""), str) for key in ("position", "stone")):
+        raise ValueError("position と stone は文字列で指定してください")
+    if "board" in request:
+        board, stone = parse_position("".join(request["board"]) + " " + request.get("stone", othello.PLAYER_STONE))
+    else:
+        board, stone = parse_position(request["position"])
+    return board, stone, request
+
+def run_stream(input_file, output_file, depth=None, time_limit=None, solve=False, stats=False):
+    """
+    ストリームモード: 局面を1行ずつ読み、解析結果をJSON Lines形式で1行ずつ書き出す。
+
+    引数:
+        input_file: 局面を読むファイル
+        output_file: 結果を書くファイル
+        depth: 既定の探索深さ（行ごとの "depth" で上書きできる）
+        time_limit: 既定の思考時間（秒）（行ごとの "time" で上書きできる）
+        solve: 既定で読み切るか（行ごとの "solve" で上書きできる）
+        stats: 探索の統計を含めるか
+
+    処理:
+        1. 空行と "#" で始まる行は読み飛ばす。
+        2. 置換表を消してから各局面をanalyze_positionで解析し、入力の "id" と局面を添えて書き出す
+           （前の行の探索結果を使わないので、結果は入力の順によらない）。
+        3. 解析できない行は {"line", "error"} を書き出して続ける。
+
+    戻り値:
+        int: 解析できなかった行数
+    """
+    errors = 0
+    for number, line in enumerate(input_file, 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            board, stone, request = parse_stream_line(line)
+            othello.TRANSPOSITION_TABLE.clear()  # 局面ごとに置換表を消す
+            result = analyze_position(board, stone, request.get("depth", depth), request.get("time", time_limit),
+                                      request.get("solve", solve), stats)
+            record = {"id": request["id"]} if "id" in request else {}
+            record.update(line=number, position=format_position(board, stone), **result)
+        except (ValueError, KeyError) as error:
+            errors += 1
+            record = {"line": number, "error": str(error)}
+        output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output_file.flush()
+    return errors
+
+def main():
+    """
+    ヘッドレスのエンジンを起動する。
+
+    処理:
+        1. --streamがなければプロトコルモードで標準入出力のコマンドを処理する。
+        2. --streamがあれば、そのファイル（"-"なら標準入力）の局面をまとめて解析し、
+           結果をJSON Lines形式で--output（省略時は標準出力）に書き出す。
+
+    戻り値:
+        なし（ストリームモードで解析できない行があれば終了コード1で終了）
+    """
+    parser = argparse.ArgumentParser(description="オセロAIを標準入出力のプロトコルで操作し、局面を解析します。")
+    parser.add_argument("--stream", default=None, help="局面のファイル（1行1局面、\"-\"なら標準入力）をまとめて解析する")
+    parser.add_argument("--output", default=None, help="ストリームモードの結果のファイル（省略時は標準出力）")
+    parser.add_argument("--depth", type=int, default=None, help="最大の探索深さ")
+    parser.add_argument("--time", type=float, default=None, help="1局面あたりの思考時間（秒）")
+    parser.add_argument("--solve", action="store_true", help="ストリームモードで最後まで読み切る")
+    parser.add_argument("--stats", action="store_true", help="ストリームモードで探索の統計も出力する")
+    parser.add_argument("--evaluator", choices=["pattern", "simple"], default=othello.EVALUATOR, help="評価関数")
+    parser.add_argument("--workers", type=int, default=1, help="ルートの手を分担するプロセス数")
+    args = parser.parse_args()
+
+    othello.EVALUATOR = args.evaluator
+    othello.SEARCH_WORKERS = args.workers
+    if args.stream is None:
+        run_protocol(sys.stdin, sys.stdout, args.depth, args.time)
+        return
+    input_file = sys.stdin if args.stream == "-" else open(args.stream, encoding="utf-8")
+    output_file = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+    try:
+        errors = run_stream(input_file, output_file, args.depth, args.time, args.solve, args.stats)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    if errors:
+        print(f"解析できなかった行: {errors} 件", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
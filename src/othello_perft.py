@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import othello
+
+# 基準値を保存するファイル（--save-baselineで作成し、--check-baselineで比較する）
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "othello_perft_baseline.json")
+SLOWDOWN_TOLERANCE = 0.2  # 基準値よりこの割合を超えて遅くなったら失敗とする
+
+# 検証用の局面と、深さ1から順の葉ノード数の正解値（パスも1手として数え、終局した局面は葉とする）
+PERFT_POSITIONS = [
+    {
+        "name": "initial",
+        "board": [
+            "........",
+            "........",
+            "........",
+            "...@O...",
+            "...O@...",
+            "........",
+            "........",
+            "........",
+        ],
+        "stone": othello.PLAYER_STONE,
+        "counts": [4, 12, 56, 244, 1396, 8200, 55092],
+    },
+    {
+        "name": "midgame",
+        "board": [
+            "......@.",
+            "....O.@.",
+            "....OOOO",
+            ".@@OO...",
+            "..@@O...",
+            ".O@@OOO.",
+            "....O...",
+            "...OO@..",
+        ],
+        "stone": othello.PLAYER_STONE,
+        "counts": [10, 108, 1234, 13715],
+    },
+    {
+        "name": "late-midgame",
+        "board": [
+            "..OO...O",
+            "..OO..O.",
+            ".@O@@@@@",
+            ".OOO@@@.",
+            "OOOO@@@O",
+            "..@O@.O@",
+            ".@@OOOO.",
+            "..@O....",
+        ],
+        "stone": othello.PLAYER_STONE,
+        "counts": [13, 182, 2211, 27825],
+    },
+    {
+        "name": "endgame-passes",
+        "board": [
+            "O..OOOOO",
+            ".O@@OOOO",
+            "@@O@@OOO",
+            "@@@OO@OO",
+            "@@@@OO@O",
+            "@@@@@..O",
+            "@@@@@@@O",
+            "@@@@OOO.",
+        ],
+        "stone": othello.PLAYER_STONE,
+        "counts": [6, 25, 75, 175, 271],
+    },
+]
+
+def perft_list(board, stone, depth):
+    """
+    2次元リストのボードで、指定の深さまでの葉ノード数を数える（"list"バックエンド）。
+
+    引数:
+        board: 8x8の2次元リスト（ボード状態）。探索中はその場で着手・取り消しする
+        stone: 手番側の石
+        depth: 残りの深さ
+
+    処理:
+        1. 深さ0なら1を返す。
+        2. 手がなければ、相手にも手がなければ終局として1、あればパスして相手番で数える。
+        3. 各手をflip_stonesで着手し、数えたらundo_flip_stonesで戻す。
+
+    戻り値:
+        int: 葉ノード数
+    """
+    if depth == 0:
+        return 1
+    opponent_stone = othello.COMPUTER_STONE if stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+    moves = othello.get_valid_moves(board, stone)
+    if not moves:
+        if not othello.get_valid_moves(board, opponent_stone):
+            return 1  # 終局
+        return perft_list(board, opponent_stone, depth - 1)  # パス
+    total = 0
+    for row, col in moves:
+        undo = othello.flip_stones(board, row, col, stone)
+        total += perft_list(board, opponent_stone, depth - 1)
+        othello.undo_flip_stones(board, undo)
+    return total
+
+def perft_bitboard(own, opp, depth):
+    """
+    ビットボードで、指定の深さまでの葉ノード数を数える（"bitboard"バックエンド）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        depth: 残りの深さ
+
+    処理:
+        perft_listと同じ規則で、bb_get_movesとbb_get_flipsを使って数える。
+
+    戻り値:
+        int: 葉ノード数
+    """
+    if depth == 0:
+        return 1
+    moves = othello.bb_get_moves(own, opp)
+    if not moves:
+        if not othello.bb_get_moves(opp, own):
+            return 1  # 終局
+        return perft_bitboard(opp, own, depth - 1)  # パス
+    total = 0
+    while moves:
+        move = moves & -moves
+        moves ^= move
+        flips = othello.bb_get_flips(own, opp, move)
+        total += perft_bitboard(opp ^ flips, own | move | flips, depth - 1)
+    return total
+
+def run_perft(position, backend, depth):
+    """
+    1つの局面・バックエンドでperftを実行し、正解値との一致と速度を調べる。
+
+    引数:
+        position: PERFT_POSITIONSの要素
+        backend: "list" または "bitboard"
+        depth: 深さ（正解値がある深さまで）
+
+    戻り値:
+        dict: {"position", "backend", "depth", "nodes", "expected", "ok", "seconds", "nps"}
+    """
+    board = [list(row) for row in position["board"]]
+    start = time.perf_counter()
+    if backend == "list":
+        nodes = perft_list(board, position["stone"], depth)
+    else:
+        nodes = perft_bitboard(*othello.board_to_bitboards(board, position["stone"]), depth)
+    seconds = time.perf_counter() - start
+    expected = position["counts"][depth - 1]
+    return {"position": position["name"], "backend": backend, "depth": depth, "nodes": nodes,
+            "expected": expected, "ok": nodes == expected, "seconds": seconds,
+            "nps": nodes / seconds if seconds else 0.0}
+
+def main():
+    """
+    perftで着手生成の正しさと速度を検証する。
+
+    処理:
+        1. 各局面・各バックエンドについて、正解値がある最大の深さ（--depthで制限可）でperftを実行する。
+        2. 葉ノード数と1秒あたりのノード数を表示する。
+        3. 正解値と一致しなければ失敗（終了コード1）とする。
+        4. --save-baselineなら速度を基準値として保存し、--check-baselineなら基準値と比べて
+           許容範囲を超えて遅くなった場合に失敗とする。
+
+    戻り値:
+        なし（失敗時は終了コード1で終了）
+    """
+    parser = argparse.ArgumentParser(description="オセロの着手生成のperftベンチマークと回帰テストを行います。")
+    parser.add_argument("--depth", type=int, default=None, help="最大の深さ（省略時は正解値がある最大の深さ）")
+    parser.add_argument("--backend", choices=["list", "bitboard"], action="append",
+                        help="計測するバックエンド（複数指定可、省略時は両方）")
+    parser.add_argument("--save-baseline", action="store_true", help="速度を基準値として保存する")
+    parser.add_argument("--check-baseline", action="store_true", help="基準値より遅くなっていないか確認する")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基準値のファイル")
+    parser.add_argument("--tolerance", type=float, default=SLOWDOWN_TOLERANCE, help="許容する速度低下の割合")
+    args = parser.parse_args()
+    if othello.BOARD_SIZE != 8:
+        parser.error("perftの局面と正解値は8x8の盤面用です（盤面の大きさによる速度の比較はothello_scaling.pyを使う）")
+
+    backends = args.backend or ["list", "bitboard"]
+    results = []
+    for position in PERFT_POSITIONS:
+        depth = len(position["counts"]) if args.depth is None else min(args.depth, len(position["counts"]))
+        for backend in backends:
+            result = run_perft(position, backend, depth)
+            results.append(result)
+            mark = "OK" if result["ok"] else f"NG（正解 {result['expected']}）"
+            print(f"{result['position']:<16}{backend:<10}深さ{depth:>2} {result['nodes']:>10} ノード "
+                  f"{result['nps']:>12,.0f} ノード/秒  {mark}")
+
+    failed = [r for r in results if not r["ok"]]
+    if args.save_baseline:
+        baseline = {f"{r['position']}/{r['backend']}/{r['depth']}": r["nps"] for r in results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"基準値を {args.baseline} に保存しました。")
+    if args.check_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for r in results:
+            reference = baseline.get(f"{r['position']}/{r['backend']}/{r['depth']}")
+            if reference and r["nps"] < reference * (1.0 - args.tolerance):
+                print(f"速度低下: {r['position']}/{r['backend']} {r['nps']:,.0f} ノード/秒 "
+                      f"（基準値 {reference:,.0f}）", file=sys.stderr)
+                failed.append(r)
+    if failed:
+        print(f"失敗: {len(failed)} 件", file=sys.stderr)
+        sys.exit(1)
+    print("すべて成功しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import collections
+import concurrent.futures
+import copy
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+import othello
+import othello_engine
+
+# 棋譜の形式（1行1局）: 手の表記を区切りなしでつなげた手順、タブ、メタデータのJSON
+#   例: "f5d6c3d3c4...\t{"date": "2024-06-01T12:00:00", "board_size": 8, "black_discs": 36, "white_discs": 28}"
+# パスは書かず、読み込むときに手番側に打てる手がないことから補う。
+# 10x10以上の盤面の "a10" のような3文字の手も、英字1文字とそれに続く数字で1手に区切って読む。
+# "board_size" のない棋譜は8x8の棋譜として扱う。
+MOVE_PATTERN = re.compile(r"[a-z][0-9]+")
+
+def open_text(path, mode="r"):
+    """
+    テキストファイルを開く（".gz"で終わればgzip圧縮として読み書きし、"-"なら標準入出力を使う）。
+
+    引数:
+        path: ファイルのパス
+        mode: "r" または "w"
+
+    戻り値:
+        file: テキストモードのファイルオブジェクト
+    """
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def parse_record(line):
+    """
+    棋譜の1行を (手の表記のリスト, メタデータ) に分ける。
+
+    引数:
+        line: 棋譜の1行
+
+    戻り値:
+        tuple: (["f5", "d6", ...], メタデータの辞書（なければ空の辞書）)
+
+    例外:
+        ValueError: 手の表記やメタデータが正しくない場合、または現在の盤面（BOARD_SIZE）と大きさが違う棋譜の場合
+    """
+    text, _, metadata = line.rstrip("\n").partition("\t")
+    text = text.strip().lower()
+    moves = MOVE_PATTERN.findall(text)
+    if "".join(moves) != text:
+        raise ValueError(f"手順が正しくありません: {text}")
+    metadata = json.loads(metadata) if metadata.strip() else {}
+    size = metadata.get("board_size", 8)
+    if size != othello.BOARD_SIZE:
+        raise ValueError(f"{size}x{size}の盤面の棋譜です（現在の盤面は{othello.BOARD_SIZE}x{othello.BOARD_SIZE}）")
+    for move in moves:
+        othello.text_to_move(move)  # 表記を確かめる
+    return moves, metadata
+
+def read_records(path):
+    """
+    棋譜ファイルを1局ずつ読み出すジェネレータ（ファイル全体をメモリに読み込まない）。
+
+    引数:
+        path: 棋譜ファイルのパス（".gz"ならgzip圧縮、"-"なら標準入力）
+
+    処理:
+        空行と "#" で始まる行は読み飛ばす。
+
+    戻り値:
+        generator: (行番号, 手の表記のリスト, メタデータ) を1局ずつ返す
+    """
+    input_file = open_text(path)
+    try:
+        for number, line in enumerate(input_file, 1):
+            if line.strip() and not line.lstrip().startswith("#"):
+                yield (number,) + parse_record(line)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+
+def replay_game(moves):
+    """
+    棋譜の手順を初期局面からflip_stonesで1手ずつ再生するジェネレータ。
+
+    引数:
+        moves: 手の表記のリスト（パスを含まない）
+
+    処理:
+        1. 手番側に打てる手がなければ、パスとして (ボード, 手番, None) を返して手番を交代する。
+        2. 手が有効か確かめ、(ボード, 手番, (row, col)) を返してから着手する。
+        3. 返すボードは着手前の局面で、同じリストを使い回す（残す場合は呼び出し側でコピーする）。
+
+    戻り値:
+        generator: (ボード, 手番側の石, 手の座標またはNone) を1手ずつ返す
+
+    例外:
+        ValueError: 無効な手があった場合
+    """
+    board = copy.deepcopy(othello.INITIAL_BOARD)
+    stone = othello.PLAYER_STONE
+    for ply, text in enumerate(moves, 1):
+        valid_moves = othello.get_valid_moves(board, stone)
+        if not valid_moves:
+            yield board, stone, None  # パス
+            stone = othello.COMPUTER_STONE if stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+            valid_moves = othello.get_valid_moves(board, stone)
+        row, col = divmod(othello.text_to_move(text).bit_length() - 1, othello.BOARD_SIZE)
+        if (row, col) not in valid_moves:
+            raise ValueError(f"{ply}手目の {text} は打てません")
+        yield board, stone, (row, col)
+        othello.flip_stones(board, row, col, stone)
+        stone = othello.COMPUTER_STONE if stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+
+_ANALYSIS_SETTINGS = {"depth": 4, "time_limit": None}  # ワーカープロセスで使う解析の設定
+
+def _init_analysis_worker(settings, evaluator):
+    """
+    解析のワーカープロセスを初期化する（プロセスプールのinitializer）。
+
+    引数:
+        settings: {"depth", "time_limit"}
+        evaluator: 評価関数の名前
+
+    戻り値:
+        なし
+    """
+    _ANALYSIS_SETTINGS.update(settings)
+    othello.EVALUATOR = evaluator
+
+def annotate_game(task):
+    """
+    1局の各手にエンジンの評価を付ける（プロセスプールのワーカーで実行される）。
+
+    引数:
+        task: (行番号, 棋譜の1行)
+
+    処理:
+        1. 棋譜を解析し、置換表を消してから、replay_gameで再生しながら各局面をanalyze_positionで探索する。
+        2. 打たれた手の評価値は、次の局面の評価値（手番が替われば符号を反転）とする。
+           最善手と同じ手なら最善手の評価値を使い、最善手との差（loss）は0以上にする。
+        3. 無効な棋譜なら {"line", "error"} を返す。
+
+    戻り値:
+        dict: {"line", "metadata", "moves", "nodes", "seconds"}
+              （movesは手ごとの {"ply", "stone", "move", "best", "score", "played_score", "loss", "pv"}）
+    """
+    number, line = task
+    start = time.perf_counter()
+    try:
+        moves, metadata = parse_record(line)
+        othello.TRANSPOSITION_TABLE.clear()  # どのワーカーで解析しても同じ結果になるように、局ごとに置換表を消す
+        annotations = []
+        nodes = 0
+        stone = othello.PLAYER_STONE
+        board = None
+        for board, stone, move in replay_game(moves):
+            if move is None:
+                continue  # パスは評価しない
+            result = othello_engine.analyze_position(board, stone, _ANALYSIS_SETTINGS["depth"],
+                                                     _ANALYSIS_SETTINGS["time_limit"])
+            nodes += result["nodes"]
+            if annotations:
+                _set_played_score(annotations[-1], result, stone)
+            text = othello.move_to_text(1 << (move[0] * othello.BOARD_SIZE + move[1]))
+            annotations.append({"ply": len(annotations) + 1, "stone": stone, "move": text, "best": result["move"],
+                                "score": result["score"], "played_score": None, "loss": None, "pv": result["pv"]})
+        if annotations:
+            # 最後の手の後の局面（終局なら最終石数差）で、最後の手の評価値を決める
+            stone = othello.COMPUTER_STONE if stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+            result = othello_engine.analyze_position(board, stone, _ANALYSIS_SETTINGS["depth"],
+                                                     _ANALYSIS_SETTINGS["time_limit"])
+            nodes += result["nodes"]
+            _set_played_score(annotations[-1], result, stone)
+    except ValueError as error:
+        return {"line": number, "error": str(error)}
+    return {"line": number, "metadata": metadata, "moves": annotations, "nodes": nodes,
+            "seconds": time.perf_counter() - start}
+
+def _set_played_score(annotation, result, stone):
+    """
+    次の局面の解析結果から、打たれた手の評価値と最善手との差を記入する。
+
+    引数:
+        annotation: 打たれた手の注釈（annotate_gameのmovesの要素）
+        result: 次の局面のanalyze_positionの結果
+        stone: 次の局面の手番側の石
+
+    戻り値:
+        なし
+    """
+    if annotation["move"] == annotation["best"]:
+        played_score = annotation["score"]
+    else:
+        played_score = result["score"] if stone == annotation["stone"] else -result["score"]
+    annotation["played_score"] = played_score
+    annotation["loss"] = max(annotation["score"] - played_score, 0)
+
+def analyze_records(input_path, output_file, depth=4, time_limit=None, workers=None, evaluator=None):
+    """
+    棋譜ファイルの全局をプロセスプールで解析し、1局1行のJSON Lines形式で書き出す。
+
+    引数:
+        input_path: 棋譜ファイルのパス（".gz"ならgzip圧縮、"-"なら標準入力）
+        output_file: 結果を書くファイル
+        depth: 1局面あたりの探索深さ
+        time_limit: 1局面あたりの思考時間（秒）。Noneなら深さだけで打ち切る
+        workers: プロセス数。省略時はCPUコア数
+        evaluator: 評価関数の名前。省略時はothello.EVALUATOR
+
+    処理:
+        1. 棋譜を1行ずつ読み、未完了の局がプロセス数の4倍を超えないように少しずつプールに渡す
+           （ファイルの大きさによらずメモリ使用量を一定に保つ）。
+        2. 結果は入力の順に書き出す。
+
+    戻り値:
+        tuple: (解析した局数, 解析できなかった局数)
+    """
+    settings = {"depth": depth, "time_limit": time_limit}
+    evaluator = evaluator or othello.EVALUATOR
+    workers = workers or os.cpu_count() or 1
+    input_file = open_text(input_path)
+    tasks = ((number, line) for number, line in enumerate(input_file, 1)
+             if line.strip() and not line.lstrip().startswith("#"))
+    games = errors = 0
+
+    def write(result):
+        nonlocal games, errors
+        games += 1
+        errors += "error" in result
+        output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    try:
+        if workers == 1:
+            _init_analysis_worker(settings, evaluator)
+            for task in tasks:
+                write(annotate_game(task))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_analysis_worker,
+                                                        initargs=(settings, evaluator)) as pool:
+                pending = collections.deque()
+                for task in tasks:
+                    pending.append(pool.submit(annotate_game, task))
+                    if len(pending) >= workers * 4:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+    return games, errors
+
+def main():
+    """
+    棋譜ファイルの各手にエンジンの評価を付ける。
+
+    処理:
+        1. コマンドライン引数から棋譜ファイル・出力先・探索深さ・プロセス数を受け取る。
+        2. analyze_recordsで解析し、局数と処理速度を標準エラー出力に表示する。
+
+    戻り値:
+        なし（解析できない棋譜があれば終了コード1で終了）
+    """
+    parser = argparse.ArgumentParser(description="オセロの棋譜ファイルをまとめて解析し、各手に評価を付けます。")
+    parser.add_argument("input", help="棋譜ファイル（.gzも可、\"-\"なら標準入力）")
+    parser.add_argument("--output", default="-", help="結果のJSON Linesファイル（.gzも可、省略時は標準出力）")
+    parser.add_argument("--depth", type=int, default=4, help="1局面あたりの探索深さ")
+    parser.add_argument("--time", type=float, default=None, help="1局面あたりの思考時間（秒）")
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数（省略時はCPUコア数）")
+    parser.add_argument("--evaluator", choices=["pattern", "simple"], default=othello.EVALUATOR, help="評価関数")
+    args = parser.parse_args()
+
+    output_file = open_text(args.output, "w")
+    start = time.perf_counter()
+    try:
+        games, errors = analyze_records(args.input, output_file, args.depth, args.time, args.workers, args.evaluator)
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+    seconds = time.perf_counter() - start
+    print(f"解析した局数: {games}（{seconds:.1f} 秒、{games / seconds if seconds else 0.0:.2f} 局/秒）",
+          file=sys.stderr)
+    if errors:
+        print(f"解析できなかった棋譜: {errors} 件", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import othello
+import othello_perft
+
+DEFAULT_SIZES = (8, 10, 12, 16)  # 比較する盤面の一辺
+
+def measure(perft_depth, search_depth):
+    """
+    このプロセスの盤面の大きさ（OTHELLO_BOARD_SIZE）で、着手生成と探索の速度を計測する。
+
+    引数:
+        perft_depth: perftの深さ
+        search_depth: 探索の深さ
+
+    処理:
+        1. 初期局面からperftをlistとbitboardの両方のバックエンドで実行する。
+        2. 初期局面を新しい置換表で深さsearch_depthまで反復深化で探索する（評価関数は"simple"で揃える）。
+
+    戻り値:
+        dict: {"size", "perft_nodes", "list_nps", "bitboard_nps", "search_nodes", "search_nps"}
+    """
+    board = [row[:] for row in othello.INITIAL_BOARD]
+    start = time.perf_counter()
+    nodes = othello_perft.perft_list(board, othello.PLAYER_STONE, perft_depth)
+    list_seconds = time.perf_counter() - start
+    own, opp = othello.board_to_bitboards(board, othello.PLAYER_STONE)
+    start = time.perf_counter()
+    othello_perft.perft_bitboard(own, opp, perft_depth)
+    bitboard_seconds = time.perf_counter() - start
+
+    othello.EVALUATOR = "simple"
+    ctx = othello.SearchContext(table=othello.TranspositionTable())
+    start = time.perf_counter()
+    othello.bb_iterative_deepening(own, opp, search_depth, None, ctx)
+    search_seconds = time.perf_counter() - start
+    return {"size": othello.BOARD_SIZE, "perft_nodes": nodes, "list_nps": nodes / list_seconds,
+            "bitboard_nps": nodes / bitboard_seconds, "search_nodes": ctx.nodes,
+            "search_nps": ctx.nodes / search_seconds}
+
+def run_size(size, perft_depth, search_depth):
+    """
+    盤面の大きさを変えた子プロセスでmeasureを実行する（盤面の定数は起動時に決まるため）。
+
+    引数:
+        size: 盤面の一辺
+        perft_depth: perftの深さ
+        search_depth: 探索の深さ
+
+    戻り値:
+        dict: measureの戻り値
+    """
+    env = dict(os.environ, OTHELLO_BOARD_SIZE=str(size))
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "--perft-depth", str(perft_depth),
+         "--search-depth", str(search_depth)],
+        env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+def main():
+    """
+    盤面の大きさごとに、1秒あたりのノード数がどう変わるかを計測する。
+
+    処理:
+        1. 各大きさについて子プロセスで着手生成（perft）と探索の速度を計測する。
+        2. 大きさごとのノード/秒と、8x8（先頭の大きさ）に対する比を表示する。
+
+    戻り値:
+        なし
+    """
+    parser = argparse.ArgumentParser(description="オセロの盤面の大きさごとに着手生成と探索の速度を比較します。")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="盤面の一辺（カンマ区切り）")
+    parser.add_argument("--perft-depth", type=int, default=6, help="perftの深さ")
+    parser.add_argument("--search-depth", type=int, default=5, help="探索の深さ")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.perft_depth, args.search_depth)))
+        return
+    results = [run_size(int(size), args.perft_depth, args.search_depth) for size in args.sizes.split(",")]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False))
+        return
+    base = results[0]
+    print(f"perft 深さ{args.perft_depth}・探索 深さ{args.search_depth}（初期局面、評価関数 simple）")
+    print(f"{'盤面':<8}{'list':>14}{'bitboard':>14}{'探索':>14}   （ノード/秒、括弧内は{base['size']}x{base['size']}比）")
+    for r in results:
+        print(f"{str(r['size']) + 'x' + str(r['size']):<8}"
+              f"{r['list_nps']:>10,.0f}({r['list_nps'] / base['list_nps']:.2f})"
+              f"{r['bitboard_nps']:>10,.0f}({r['bitboard_nps'] / base['bitboard_nps']:.2f})"
+              f"{r['search_nps']:>10,.0f}({r['search_nps'] / base['search_nps']:.2f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import random
+import time
+
+import othello
+
+# エンジン設定の既定値（--a / --b で "key=value,key=value" の形で上書きする）
+DEFAULT_ENGINE_CONFIG = {
+    "depth": 4,  # 最大の探索深さ
+    "time_limit": None,  # 1手あたりの思考時間（秒）。Noneなら深さだけで打ち切る
+    "endgame_empties": 0,  # 空きマスがこの数以下なら読み切る（0なら読み切らない）
+    "use_book": False,  # 定石ブックを使うか
+    "ordering": "+".join(othello.MOVE_ORDERING),  # 手の並べ替えヒューリスティック（"+"区切り）
+    "evaluator": othello.EVALUATOR,  # 末端の評価関数（"pattern" または "simple"）
+}
+
+def parse_engine_config(text):
+    """
+    "depth=5,time_limit=0.1" 形式の文字列をエンジン設定に変換する。
+
+    引数:
+        text: カンマ区切りの key=value の並び（空文字なら既定値のまま）
+
+    処理:
+        1. 既定値をコピーし、指定されたキーだけ既定値と同じ型に変換して上書きする。
+        2. 未知のキーはエラーにする。
+
+    戻り値:
+        dict: エンジン設定
+    """
+    config = dict(DEFAULT_ENGINE_CONFIG)
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        if key not in config:
+            raise ValueError(f"不明な設定です: {key}")
+        if key == "time_limit":
+            config[key] = None if value.lower() == "none" else float(value)
+        elif key == "use_book":
+            config[key] = value.lower() in ("1", "true", "yes")
+        elif key in ("ordering", "evaluator"):
+            config[key] = value
+        else:
+            config[key] = int(value)
+    return config
+
+def engine_move(own, opp, config, table):
+    """
+    設定に従って1手を選ぶ（画面表示や待機は行わない）。
+
+    引数:
+        own: 手番側の石のビットボード（整数）
+        opp: 相手の石のビットボード（整数）
+        config: エンジン設定
+        table: このエンジン専用の置換表
+
+    処理:
+        1. 設定の評価関数に切り替える（このプロセスのEVALUATORを書き換える）。
+        2. 定石ブックを使う設定なら、登録された局面はその手を返す。
+        3. 空きマスがendgame_empties以下なら最後まで読み切る。
+        4. それ以外はbb_search_with_cacheで、解析キャッシュを引いてから反復深化で探索する。
+
+    戻り値:
+        tuple: (手のビット, 探索したノード数)
+    """
+    othello.EVALUATOR = config["evaluator"]
+    if config["use_book"]:
+        book = othello.get_opening_book()
+        entry = book.lookup(own, opp) if book else None
+        if entry:
+            return entry[0], 0
+    deadline = None if config["time_limit"] is None else time.perf_counter() + config["time_limit"]
+    empties = (othello.BB_FULL & ~(own | opp)).bit_count()
+    if empties <= config["endgame_empties"]:
+        ctx = othello.SearchContext(deadline=deadline)
+        try:
+            move, _ = othello.bb_solve_endgame_root(own, opp, othello.ENDGAME_MODE, ctx)
+            return move, ctx.nodes
+        except othello.SearchTimeout:
+            pass  # 読み切れなければ通常の探索に切り替える
+    ordering = [name for name in config["ordering"].split("+") if name]
+    ctx = othello.SearchContext(table=table, ordering=ordering)
+    move = othello.bb_search_with_cache(own, opp, config["depth"], deadline, ctx)
+    return move, ctx.nodes
+
+def play_game(task):
+    """
+    エンジン同士で1局対戦する（プロセスプールのワーカーで実行される）。
+
+    引数:
+        task: (対局番号, 乱数シード, ランダムに打つ手数, 設定A, 設定B)
+
+    処理:
+        1. 対局番号の組（2局）ごとに同じシードでランダムな序盤を作り、先後を入れ替えて公平にする。
+        2. 両者が打てなくなるまでエンジン同士で交互に打つ（パスも含む）。
+        3. 最終石数からAの勝ち・引き分け・負けを決める。
+
+    戻り値:
+        dict: 対局結果（Aの得点、石数、手数、各エンジンの手数とノード数）
+    """
+    index, seed, random_plies, config_a, config_b = task
+    rng = random.Random(seed * 1000003 + index // 2)
+    a_is_black = index % 2 == 0
+    black, white = othello.board_to_bitboards(othello.INITIAL_BOARD, othello.PLAYER_STONE)
+    own, opp = black, white  # 手番側, 相手（黒番から始める）
+    black_to_move = True
+    tables = {"a": othello.TranspositionTable(), "b": othello.TranspositionTable()}
+    stats = {"a": [0, 0], "b": [0, 0]}  # [手数, ノード数]
+    plies = 0
+    while True:
+        moves = othello.bb_get_moves(own, opp)
+        if not moves:
+            if not othello.bb_get_moves(opp, own):
+                break  # 両者とも打てないので終局
+            own, opp, black_to_move = opp, own, not black_to_move  # パス
+            continue
+        if plies < random_plies:
+            candidates = othello.bb_to_moves(moves)
+            row, col = rng.choice(candidates)
+            move = 1 << (row * othello.BOARD_SIZE + col)
+        else:
+            engine = "a" if black_to_move == a_is_black else "b"
+            move, nodes = engine_move(own, opp, config_a if engine == "a" else config_b, tables[engine])
+            stats[engine][0] += 1
+            stats[engine][1] += nodes
+        flips = othello.bb_get_flips(own, opp, move)
+        own, opp = opp ^ flips, own | move | flips
+        black_to_move = not black_to_move
+        plies += 1
+    if black_to_move:
+        black, white = own, opp
+    else:
+        black, white = opp, own
+    a_discs, b_discs = (black.bit_count(), white.bit_count()) if a_is_black else (white.bit_count(), black.bit_count())
+    score = 1.0 if a_discs > b_discs else 0.5 if a_discs == b_discs else 0.0
+    return {"score": score, "a_discs": a_discs, "b_discs": b_discs, "plies": plies,
+            "a_moves": stats["a"][0], "a_nodes": stats["a"][1],
+            "b_moves": stats["b"][0], "b_nodes": stats["b"][1]}
+
+def elo_difference(score):
+    """
+    勝率（引き分けは0.5勝）からイロレーティングの差を求める。
+
+    引数:
+        score: Aの平均得点（0〜1）
+
+    戻り値:
+        float: AのBに対するレーティング差（勝率0または1のときは±無限大）
+    """
+    if score <= 0.0:
+        return float('-inf')
+    if score >= 1.0:
+        return float('inf')
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+def summarize(results, seconds):
+    """
+    対局結果を集計する。
+
+    引数:
+        results: play_gameの戻り値のリスト
+        seconds: 全対局にかかった時間（秒）
+
+    処理:
+        1. 勝ち・引き分け・負けと平均得点、レーティング差と95%信頼区間を計算する。
+        2. 1秒あたりの対局数と、エンジンごとの1手あたりの平均ノード数を計算する。
+
+    戻り値:
+        dict: 集計結果
+    """
+    games = len(results)
+    wins = sum(1 for r in results if r["score"] == 1.0)
+    draws = sum(1 for r in results if r["score"] == 0.5)
+    losses = games - wins - draws
+    score = (wins + draws * 0.5) / games if games else 0.5
+    # 得点の標準誤差から、レーティング差の95%信頼区間の幅を求める
+    variance = sum((r["score"] - score) ** 2 for r in results) / games if games else 0.0
+    margin = 1.96 * math.sqrt(variance / games) if games else 0.0
+    low, high = max(score - margin, 0.0), min(score + margin, 1.0)
+    a_moves = sum(r["a_moves"] for r in results)
+    b_moves = sum(r["b_moves"] for r in results)
+    return {
+        "games": games,
+        "a_wins": wins,
+        "draws": draws,
+        "a_losses": losses,
+        "a_score": score,
+        "elo": elo_difference(score),
+        "elo_low": elo_difference(low),
+        "elo_high": elo_difference(high),
+        "seconds": seconds,
+        "games_per_sec": games / seconds if seconds else 0.0,
+        "a_nodes_per_move": sum(r["a_nodes"] for r in results) / a_moves if a_moves else 0.0,
+        "b_nodes_per_move": sum(r["b_nodes"] for r in results) / b_moves if b_moves else 0.0,
+        "average_plies": sum(r["plies"] for r in results) / games if games else 0.0,
+    }
+
+def run_tournament(games, config_a, config_b, workers=None, seed=0, random_plies=6):
+    """
+    エンジン設定AとBを多数対局させる。
+
+    引数:
+        games: 対局数（先後入れ替えの組にするため偶数を推奨）
+        config_a: エンジン設定A
+        config_b: エンジン設定B
+        workers: プロセス数。省略時はCPUコア数
+        seed: 序盤のランダムな手を決める乱数シード
+        random_plies: 序盤にランダムに打つ手数
+
+    処理:
+        1. 対局をプロセスプールに配り、結果を集める。
+        2. summarizeで集計する。
+
+    戻り値:
+        dict: 集計結果
+    """
+    tasks = [(index, seed, random_plies, config_a, config_b) for index in range(games)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_game(task) for task in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(play_game, tasks, chunksize=max(1, games // (workers * 8))))
+    return summarize(results, time.perf_counter() - start)
+
+def main():
+    """
+    エンジン同士の自己対戦をまとめて実行し、結果を表示する。
+
+    処理:
+        1. コマンドライン引数から対局数・プロセス数・シード・2つのエンジン設定を受け取る。
+        2. run_tournamentで対局し、勝率・レーティング差・処理速度を表示する。
+
+    戻り値:
+        なし
+    """
+    parser = argparse.ArgumentParser(description="オセロAI同士の自己対戦を行い、2つの設定を比較します。")
+    parser.add_argument("--games", type=int, default=100, help="対局数")
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数（省略時はCPUコア数）")
+    parser.add_argument("--seed", type=int, default=0, help="序盤のランダムな手の乱数シード")
+    parser.add_argument("--random-plies", type=int, default=6, help="序盤にランダムに打つ手数")
+    parser.add_argument("--a", default="", help='エンジンAの設定（例: "depth=5,time_limit=0.1"）')
+    parser.add_argument("--b", default="", help="エンジンBの設定")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    config_a = parse_engine_config(args.a)
+    config_b = parse_engine_config(args.b)
+    summary = run_tournament(args.games, config_a, config_b, args.workers, args.seed, args.random_plies)
+    if args.json:
+        # 勝率0または1のときの無限大はJSONで表せないのでnullにする
+        summary = {key: None if isinstance(value, float) and math.isinf(value) else value
+                   for key, value in summary.items()}
+        print(json.dumps({"a": config_a, "b": config_b, **summary}, ensure_ascii=False))
+        return
+    print(f"A: {config_a}")
+    print(f"B: {config_b}")
+    print(f"対局数: {summary['games']}  A勝ち: {summary['a_wins']}  引き分け: {summary['draws']}  "
+          f"A負け: {summary['a_losses']}")
+    print(f"Aの得点率: {summary['a_score']:.3f}  レーティング差(A-B): {summary['elo']:+.1f} "
+          f"(95%: {summary['elo_low']:+.1f} 〜 {summary['elo_high']:+.1f})")
+    print(f"処理速度: {summary['games_per_sec']:.2f} 局/秒（{summary['seconds']:.1f} 秒）")
+    print(f"1手あたりの平均ノード数: A {summary['a_nodes_per_move']:.0f}  B {summary['b_nodes_per_move']:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import random
+import sys
+import time
+
+import puyo_puyo
+
+def recursive_cleared(board):
+    """
+    変更前の方法 (全セルから再帰の塗りつぶし) で、消えるぷよの座標を求める関数 (比較用)
+
+    :param board: ゲームボード
+    :return: 消えるぷよの(x, y)のセット
+    """
+    height, width = len(board), len(board[0])
+
+    def fill(x, y, color, cluster):
+        if not (0 <= x < width and 0 <= y < height):
+            return
+        if board[y][x] != color or (x, y) in cluster:
+            return
+        cluster.add((x, y))
+        fill(x + 1, y, color, cluster)
+        fill(x - 1, y, color, cluster)
+        fill(x, y + 1, color, cluster)
+        fill(x, y - 1, color, cluster)
+
+    cleared = set()
+    for y in range(height):
+        for x in range(width):
+            if board[y][x] != "":
+                cluster = set()
+                fill(x, y, board[y][x], cluster)
+                if len(cluster) >= puyo_puyo.CLEAR_COUNT:
+                    cleared.update(cluster)
+    return cleared
+
+class ListState:
+    """
+    変更前の表現 (リストのリストのボード) でぷよを落とすための状態 (比較用)
+
+    :詳細:
+    - GameStateと同じシードなら同じ順番のぷよを出します。
+    :param seed: 乱数のシード
+    :param width: ボードの幅
+    :param height: ボードの高さ
+    """
+
+    def __init__(self, seed, width, height):
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.board = [["" for _ in range(width)] for _ in range(height)]
+        self.game_over = False
+        self.drops = 0
+        self.chains = 0
+        self.new_puyo()
+
+    def new_puyo(self):
+        self.current_puyo = self.rng.choice(puyo_puyo.PUYO_CHARS)
+
+def rescan_place(state, column):
+    """
+    変更前の方法 (連鎖の各段でボード全体を走査し、全列を詰める) でGameState.placeと同じ処理をする関数 (比較用)
+
+    :param state: ListState (その場で更新する)
+    :param column: 落とす列
+    :return: 起きた連鎖の段数
+    """
+    board = state.board
+    y = 0
+    while y + 1 < state.height and board[y + 1][column] == "":
+        y += 1
+    board[y][column] = state.current_puyo
+    state.drops += 1
+    if y == 0:
+        state.game_over = True
+        state.current_puyo = None
+        return 0
+    chains = 0
+    while puyo_puyo.check_and_clear_puyos(board):
+        chains += 1
+    state.chains += chains
+    state.new_puyo()
+    return chains
+
+def board_to_colors(board):
+    """
+    リストのリストのボードを、GameStateと同じ並びの色ごとのビットボードに変換する関数
+
+    :param board: ゲームボード
+    :return: 色ごとのビットボードのリスト (PUYO_CHARSと同じ順)
+    """
+    height = len(board)
+    colors = [0] * len(puyo_puyo.PUYO_CHARS)
+    for y, row in enumerate(board):
+        for x, color in enumerate(row):
+            if color != "":
+                colors[puyo_puyo.PUYO_CHARS.index(color)] |= 1 << (x * (height + 1) + height - 1 - y)
+    return colors
+
+def make_boards(kind, count, width, height, seed):
+    """
+    ベンチマーク用のボードを作る関数
+
+    :param kind: "random" (ランダムな色を落とした盤面), "full" (全セル同じ色), "stripes" (1列ごとに2色),
+                 "checker" (市松模様。塊がない)
+    :param count: ボードの数
+    :param width: ボードの幅
+    :param height: ボードの高さ
+    :param seed: 乱数のシード
+    :return: ボードのリスト
+    """
+    rng = random.Random(seed)
+    colors = puyo_puyo.PUYO_CHARS
+    boards = []
+    for _ in range(count):
+        if kind == "random":
+            board = [["" for _ in range(width)] for _ in range(height)]
+            for x in range(width):
+                for y in range(height - 1, height - 1 - rng.randint(0, height), -1):
+                    board[y][x] = rng.choice(colors)
+        elif kind == "full":
+            board = [[colors[0]] * width for _ in range(height)]
+        elif kind == "stripes":
+            board = [[colors[x % 2] for x in range(width)] for _ in range(height)]
+        else:
+            board = [[colors[(x + y) % 2] for x in range(width)] for y in range(height)]
+        boards.append(board)
+    return boards
+
+def bench_groups(kind, count, width, height, seed):
+    """
+    塊の検出を、変更前の方法・find_groups・find_bit_groupsで計測し、結果が一致するか確かめる関数
+
+    :param kind: ボードの種類 (make_boardsを参照)
+    :param count: ボードの数
+    :param width: ボードの幅
+    :param height: ボードの高さ
+    :param seed: 乱数のシード
+    :return: {"kind", "old", "new", "bits", "ok"} (old・new・bitsは1秒あたりのボード数。oldは再帰が深すぎればNone)
+    """
+    boards = make_boards(kind, count, width, height, seed)
+    start = time.perf_counter()
+    found = [{cell for group in puyo_puyo.find_groups(board) for cell in group} for board in boards]
+    new_rate = count / (time.perf_counter() - start)
+    colors = [board_to_colors(board) for board in boards]
+    start = time.perf_counter()
+    found_bits = [[puyo_puyo.find_bit_groups(bits, bits, height + 1) for bits in board_colors]
+                  for board_colors in colors]
+    bits_rate = count / (time.perf_counter() - start)
+    ok = all(sum(found_bits[i]) == sum(1 << (x * (height + 1) + height - 1 - y) for x, y in found[i])
+             for i in range(count))
+    start = time.perf_counter()
+    try:
+        expected = [recursive_cleared(board) for board in boards]
+    except RecursionError:
+        return {"kind": kind, "old": None, "new": new_rate, "bits": bits_rate, "ok": ok}
+    old_rate = count / (time.perf_counter() - start)
+    return {"kind": kind, "old": old_rate, "new": new_rate, "bits": bits_rate, "ok": ok and found == expected}
+
+def board_bytes(width, height):
+    """
+    ぷよで埋まったボード1つのメモリ使用量を、変更前の表現と色ごとのビットボードで求める関数
+
+    :param width: ボードの幅
+    :param height: ボードの高さ
+    :return: (リストのリストのバイト数, ビットボードのバイト数) (色の文字列は共有されるため数えません)
+    """
+    board = make_boards("stripes", 1, width, height, 0)[0]
+    colors = board_to_colors(board)
+    list_bytes = sys.getsizeof(board) + sum(sys.getsizeof(row) for row in board)
+    bit_bytes = sys.getsizeof(colors) + sum(sys.getsizeof(bits) for bits in colors)
+    return list_bytes, bit_bytes
+
+def run_drops(new_state, place, drops, width, height, seed):
+    """
+    ランダムな列にぷよを落とし続ける関数 (ゲームオーバーになったら次のシードで新しいゲームを始める)
+
+    :param new_state: シード・幅・高さから状態を作る関数 (GameStateまたはListState)
+    :param place: 状態と列を受け取ってぷよを落とす関数
+    :param drops: 落とすぷよの数
+    :param width: ボードの幅
+    :param height: ボードの高さ
+    :param seed: 乱数のシード
+    :return: (連鎖の段数の合計, 最後のボード)
+    """
+    rng = random.Random(seed)
+    game = 0
+    state = new_state(seed, width, height)
+    chains = 0
+    for _ in range(drops):
+        if state.game_over:
+            game += 1
+            state = new_state(seed + game, width, height)
+        chains += place(state, rng.randrange(width))
+    return chains, state.board
+
+def bench_drops(drops, width, height, seed):
+    """
+    ぷよを落として連鎖を処理する速度を、変更前の方法とGameState.placeで計測し、結果が一致するか確かめる関数
+
+    :param drops: 落とすぷよの数
+    :param width: ボードの幅
+    :param height: ボードの高さ
+    :param seed: 乱数のシード
+    :return: {"old", "new", "chains", "ok"} (old・newは1秒あたりのぷよの数)
+    """
+    start = time.perf_counter()
+    expected = run_drops(ListState, rescan_place, drops, width, height, seed)
+    old_rate = drops / (time.perf_counter() - start)
+    start = time.perf_counter()
+    result = run_drops(puyo_puyo.GameState, puyo_puyo.GameState.place, drops, width, height, seed)
+    new_rate = drops / (time.perf_counter() - start)
+    return {"old": old_rate, "new": new_rate, "chains": result[0], "ok": result == expected}
+
+def main():
+    """
+    ぷよぷよのシミュレーションの速度を計測する関数
+
+    :詳細:
+    - ランダムな盤面と最悪ケースの盤面 (全セル同じ色など) で、塊の検出の速度を変更前の方法と比べます。
+    - ランダムな列にぷよを落とし続け、連鎖の処理を含めた1秒あたりのぷよの数を変更前の方法と比べます。
+    - ボード1つのメモリ使用量を、リストのリストと色ごとのビットボードで比べます。
+    - 結果が一致しなければ終了コード1で終了します。
+    """
+    parser = argparse.ArgumentParser(description="ぷよぷよのシミュレーションの速度を計測します。")
+    parser.add_argument("--boards", type=int, default=2000, help="ボードの数")
+    parser.add_argument("--width", type=int, default=puyo_puyo.BOARD_WIDTH, help="ボードの幅")
+    parser.add_argument("--height", type=int, default=puyo_puyo.BOARD_HEIGHT, help="ボードの高さ")
+    parser.add_argument("--drops", type=int, default=20000, help="落とすぷよの数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    args = parser.parse_args()
+
+    print(f"塊の検出 ({args.width}x{args.height}、{args.boards} 盤面、盤面/秒)")
+    failed = False
+    for kind in ("random", "full", "stripes", "checker"):
+        result = bench_groups(kind, args.boards, args.width, args.height, args.seed)
+        old = "再帰が深すぎて失敗" if result["old"] is None else f"{result['old']:>12,.0f}"
+        print(f"  {kind:<8} 変更前: {old}  find_groups: {result['new']:>12,.0f}  "
+              f"find_bit_groups: {result['bits']:>12,.0f}  {'OK' if result['ok'] else 'NG'}")
+        failed |= not result["ok"]
+    result = bench_drops(args.drops, args.width, args.height, args.seed)
+    print(f"ぷよの落下と連鎖 ({args.drops} 個、ぷよ/秒)")
+    print(f"  変更前: {result['old']:>12,.0f}  GameState.place: {result['new']:>12,.0f}  "
+          f"連鎖 {result['chains']} 段  {'OK' if result['ok'] else 'NG'}")
+    failed |= not result["ok"]
+    list_bytes, bit_bytes = board_bytes(args.width, args.height)
+    print(f"ボード1つのメモリ  リストのリスト: {list_bytes:,} バイト  ビットボード: {bit_bytes:,} バイト")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
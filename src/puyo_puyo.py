@@ -1,7 +1,6 @@
 import os
 import random
 import time
-import msvcrt # Windows固有のキーボード入力を扱うライブラリ
 
 # --- 定数と変数 ---
 # ゲームボードの幅 (列数)
@@ -10,202 +9,525 @@ BOARD_WIDTH = 6
 BOARD_HEIGHT = 12
 # ぷよの種類 (色)
 PUYO_CHARS = ["R", "G", "B", "Y"]
+# 消えるのに必要な連結数
+CLEAR_COUNT = 4
+# 1ステップで受け付ける操作 (Noneは何もしない)
+ACTIONS = (None, "left", "right", "down")
 
-# ゲームボードを空のセル ("") で初期化
-board = [["" for _ in range(BOARD_WIDTH)] for _ in range(BOARD_HEIGHT)]
-# 現在操作中のぷよ
-current_puyo = None
-# 現在操作中のぷよのX座標
-current_puyo_x = 0
-# 現在操作中のぷよのY座標
-current_puyo_y = 0
+# --- シミュレーション (画面表示・キー入力・待ち時間なし) ---
+class GameState:
+    """
+    ぷよぷよの盤面と操作中のぷよをまとめたゲームの状態
 
-# --- ゲームの各機能 ---
-def clear_screen():
+    :詳細:
+    - 画面表示やキー入力、`time.sleep`を一切行わないため、AIやバランス調整のための大量のシミュレーションに使えます。
+    - 乱数は`seed`で初期化した専用の`random.Random`を使うため、同じシードなら同じぷよの順番になります。
+    - `step(action)`は画面版の1ティック分 (操作 → 落下または固定) を、`place(column)`は指定した列への
+      即時落下から連鎖の処理までを1回で進めます。画面版は`step_chains(action)`で連鎖を1段ずつ進めて描画します。
+    - ボードは色ごとのビットボード (`colors`。`PUYO_CHARS`と同じ順の整数のリスト) で持ちます。
+      セル(x, y)のビットは`x * (height + 1) + (height - 1 - y)`番目で、各列を下の行から並べ、
+      列の間に常に0の番兵ビットを1つ置きます (上下の移動は1ビット、左右の移動は`height + 1`ビットのシフトです)。
+    - 列ごとのぷよの数 (`heights`) を固定・消去・落下のたびに更新するため、着地する行・衝突・ゲームオーバーの
+      判定はセルをたどらずに求められます (ボードは常に下に詰まった状態です)。
+    - `board`は表示や比較のために、ビットボードからリストのリストのボードを作って返します。
+    :param seed: 乱数のシード (Noneなら毎回異なる)
+    :param width: ボードの幅 (列数)
+    :param height: ボードの高さ (行数)
     """
-    画面をクリアする関数
 
+    def __init__(self, seed=None, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.width = width
+        self.height = height
+        self.stride = height + 1  # 1列分のビット数 (番兵ビットを含む)
+        # 番兵ビットを除いた、ボードのすべてのセルのビット
+        self.full_mask = sum(((1 << height) - 1) << (x * self.stride) for x in range(width))
+        self.rng = random.Random(seed)
+        # ゲームボードを空 (すべての色のビットが0) で初期化
+        self.colors = [0] * len(PUYO_CHARS)
+        self.heights = [0] * width  # 列ごとのぷよの数
+        self.current_puyo = None
+        self.current_x = 0
+        self.current_y = 0
+        self.game_over = False
+        self.drops = 0  # 固定したぷよの数
+        self.chains = 0  # 消去が起きた回数の合計 (連鎖の段数の合計)
+        self.new_puyo()
+
+    def clone(self):
+        """
+        状態を複製する関数
+
+        :詳細:
+        - ボードと乱数の状態も複製するため、複製後は元の状態と独立に同じ続きを再現できます。
+        :return: 複製したGameState
+        """
+        other = GameState.__new__(GameState)
+        other.__dict__.update(self.__dict__)
+        other.colors = self.colors[:]
+        other.heights = self.heights[:]
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        return other
+
+    @property
+    def board(self):
+        """
+        ビットボードから、リストのリストのゲームボードを作る関数 (表示・比較用)
+
+        :return: 行ごとのリスト (空のセルは"")。作り直すため、変更してもGameStateには反映されません
+        """
+        board = [["" for _ in range(self.width)] for _ in range(self.height)]
+        for color, bits in zip(PUYO_CHARS, self.colors):
+            while bits:
+                x, row = divmod((bits & -bits).bit_length() - 1, self.stride)
+                board[self.height - 1 - row][x] = color
+                bits &= bits - 1
+        return board
+
+    def cell_bit(self, x, y):
+        """
+        セル(x, y)に対応するビットを求める関数
+
+        :param x: 列 (0 〜 width - 1)
+        :param y: 行 (0 〜 height - 1。0が最上段)
+        :return: ビット (整数)
+        """
+        return 1 << (x * self.stride + self.height - 1 - y)
+
+    def new_puyo(self):
+        """
+        新しいぷよを生成し、ボードの一番上に配置する関数
+
+        :詳細:
+        - 専用の乱数でランダムな色のぷよを選びます。
+        - ぷよの初期位置をボード上部の中央に設定します。
+        """
+        self.current_puyo = self.rng.choice(PUYO_CHARS)
+        self.current_x = self.width // 2
+        self.current_y = 0
+
+    def landing_row(self, column):
+        """
+        指定した列に落としたぷよが着地する行を求める関数
+
+        :param column: 列 (0 〜 width - 1)
+        :return: 着地する行 (列が一番上まで埋まっていれば-1)
+        """
+        return self.height - 1 - self.heights[column]
+
+    def playable_columns(self):
+        """
+        ぷよを落としてもゲームオーバーにならない列をすべて求める関数 (配置を選ぶAI用)
+
+        :詳細:
+        - 列ごとのぷよの数だけを見るため、ボードのセルは調べません。
+        :return: 列のリスト (着地する行が最上段より下の列)
+        """
+        limit = self.height - 2
+        return [x for x, filled in enumerate(self.heights) if filled <= limit]
+
+    def step(self, action=None):
+        """
+        ゲームを1ティック進める関数 (画面版のメインループ1回分)
+
+        :param action: "left", "right", "down" (一番下まで落下) または None
+        :詳細:
+        - 操作を反映した後、ぷよが1マス下に落ちられるかを判定します。左右の移動先がぷよで埋まっていれば移動しません。
+        - 落ちられなければぷよを固定し、最上段ならゲームオーバー、そうでなければ連鎖を処理して次のぷよを出します。
+        - 連鎖は最後まで1回で処理します (1段ずつ表示する場合は`step_chains`を使います)。
+        - ゲームオーバー後に呼んでも何もしません。
+        :return: このティックで起きた連鎖の段数 (固定しなかった場合や消えなかった場合は0)
+        """
+        if self.game_over or not self._move(action):
+            return 0
+        return self._lock()
+
+    def step_chains(self, action=None):
+        """
+        `step`と同じくゲームを1ティック進め、連鎖を1段処理するごとに止まるジェネレータ (画面版用)
+
+        :param action: "left", "right", "down" (一番下まで落下) または None
+        :詳細:
+        - ぷよを固定したティックでは、消去と落下を1段終えるたびに、その段の番号 (1から) を返して止まります。
+          呼び出し側はそのたびにボードを描画できます。
+        - 連鎖が終わると次のぷよを出して終わります。固定しなかったティックやゲームオーバーでは何も返しません。
+        - 最後まで回すと`step`を呼んだのと同じ状態になります。
+        :return: 連鎖の段数を1段ずつ返すジェネレータ
+        """
+        if self.game_over or not self._move(action):
+            return
+        bit = self._fix()
+        if not bit:
+            return
+        for chain in chain_steps(self.colors, bit, self.stride, self.full_mask, self.heights):
+            self.chains += 1
+            yield chain
+        self.new_puyo()
+
+    def place(self, column):
+        """
+        操作中のぷよを指定した列に落として固定し、連鎖まで処理する関数
+
+        :param column: 落とす列 (0 〜 width - 1)
+        :詳細:
+        - 途中の列の高さは調べず、指定した列の着地する行にぷよを直接置きます。
+          (画面版の左右移動は高い列に遮られるため、同じ列まで動かせるとは限りません)
+        - 列の一番上まで埋まっている場合はゲームオーバーになります。
+        :return: 起きた連鎖の段数
+        """
+        if self.game_over:
+            return 0
+        if not 0 <= column < self.width:
+            raise ValueError(f"列は0〜{self.width - 1}で指定してください: {column}")
+        self.current_x = column
+        self.current_y = max(self.landing_row(column), 0)
+        return self._lock()
+
+    def _move(self, action):
+        """
+        操作を反映し、落ちられればぷよを1マス下に移動する関数
+
+        :param action: "left", "right", "down" (一番下まで落下) または None
+        :return: 着地する行に達していて固定するならTrue (その場合は下に移動しません)
+        """
+        if action in ("left", "right"):
+            target = self.current_x + (-1 if action == "left" else 1)
+            if 0 <= target < self.width and self.current_y <= self.landing_row(target):
+                self.current_x = target
+        elif action == "down":
+            # 一番下までぷよを落下させる
+            self.current_y = self.landing_row(self.current_x)
+        elif action is not None and action not in ACTIONS:
+            raise ValueError(f"不明な操作です: {action}")
+
+        # 衝突判定 (着地する行に達したら固定する)
+        if self.current_y >= self.landing_row(self.current_x):
+            return True
+        # ぷよを1マス下に移動
+        self.current_y += 1
+        return False
+
+    def _fix(self):
+        """
+        操作中のぷよをボードに書き込む関数
+
+        :詳細:
+        - 最上段に固定した場合はゲームオーバーにします (すでにぷよがあるセルなら、そのぷよを置き換えます)。
+        - 固定したぷよは操作中ではなくなるため`current_puyo`をNoneにします (連鎖の途中の表示に残さないため)。
+        :return: 固定したセルのビット (ゲームオーバーなら0)
+        """
+        bit = self.cell_bit(self.current_x, self.current_y)
+        index = PUYO_CHARS.index(self.current_puyo)
+        self.drops += 1
+        self.current_puyo = None
+        # ゲームオーバー判定 (ぷよが最上段に配置された場合)
+        if self.current_y == 0:
+            self.colors = [bits & ~bit for bits in self.colors]
+            self.colors[index] |= bit
+            self.game_over = True
+            return 0
+        self.colors[index] |= bit
+        self.heights[self.current_x] += 1
+        return bit
+
+    def _lock(self):
+        """
+        操作中のぷよをボードに固定し、連鎖を最後まで処理する関数
+
+        :詳細:
+        - `_fix`で固定し、ゲームオーバーでなければ固定したセルのビットから`resolve_chains`で連鎖を処理し、
+          次のぷよを出します。
+        :return: 起きた連鎖の段数
+        """
+        bit = self._fix()
+        if not bit:
+            return 0
+        chains = resolve_chains(self.colors, bit, self.stride, self.full_mask, self.heights)
+        self.chains += chains
+        self.new_puyo()
+        return chains
+
+# --- 盤面の処理 (ビットボード) ---
+def resolve_chains(colors, dirty, stride, full_mask, heights=None):
+    """
+    変化したセルだけを調べて連鎖を最後まで処理する関数
+
+    :param colors: 色ごとのビットボードのリスト (その場で更新する)
+    :param dirty: ぷよが置かれた、または移動したセルのビット
+    :param stride: 1列分のビット数 (ボードの高さ + 1)
+    :param full_mask: ボードのすべてのセルのビット
+    :param heights: 列ごとのぷよの数 (渡した場合は消去と落下の後の数に更新します)
     :詳細:
-    Windows環境では 'cls' コマンド、macOS/Linux環境では 'clear' コマンドを使用して、
-    コンソールの表示をクリアします。
+    - `chain_steps`を最後まで進めます。
+    :return: 起きた連鎖の段数
     """
-    os.system('cls' if os.name == 'nt' else 'clear')
+    chains = 0
+    for chains in chain_steps(colors, dirty, stride, full_mask, heights):
+        pass
+    return chains
 
-def draw_board():
+def chain_steps(colors, dirty, stride, full_mask, heights=None):
     """
-    現在のゲームボードを画面に描画する関数
+    変化したセルだけを調べて連鎖を1段ずつ処理するジェネレータ
 
+    :param colors: 色ごとのビットボードのリスト (その場で更新する)
+    :param dirty: ぷよが置かれた、または移動したセルのビット
+    :param stride: 1列分のビット数 (ボードの高さ + 1)
+    :param full_mask: ボードのすべてのセルのビット
+    :param heights: 列ごとのぷよの数 (渡した場合は各段の消去と落下の後の数に更新します)
     :詳細:
-    - 画面をクリアし、ゲームのタイトルを表示します。
-    - ゲームボードの各セルをループでチェックし、ぷよや空のセル("・")を配置して表示します。
-    - 現在操作中のぷよもボード上の正しい位置に描画します。
-    - 最後に操作説明のテキストを表示します。
+    - 変化する前のボードには4つ以上の塊がないことが前提です (ぷよを1つ置くたびに呼べば常に成り立ちます)。
+    - 新しくできる塊は必ず変化したセルを含むため、`find_bit_groups`で変化したセルからだけ塊を探します。
+    - 消えたぷよのビットを各色から落とし、`drop_bits`で詰めて、移動したぷよを次の段の変化したセルにします。
+    - 1段の消去と落下を終えるたびに止まるため、画面版は段ごとにボードを描画できます。
+    :return: 連鎖の段数 (1から) を1段ずつ返すジェネレータ
     """
-    clear_screen()
-    print("==================")
-    print("  ぷよぷよ (Python)  ")
-    print("==================")
-    
-    for y in range(BOARD_HEIGHT):
-        row_str = ""
-        for x in range(BOARD_WIDTH):
-            if current_puyo and x == current_puyo_x and y == current_puyo_y:
-                row_str += current_puyo + " "
-            elif board[y][x] != "":
-                row_str += board[y][x] + " "
-            else:
-                row_str += "・ "
-        print(row_str)
-    
-    print("------------------")
-    print("  ←: 左, →: 右, ↓: 落下, X: 終了")
+    chains = 0
+    column_mask = (1 << (stride - 1)) - 1
+    while dirty:
+        cleared = 0
+        for bits in colors:
+            if bits & dirty:
+                cleared |= find_bit_groups(bits, dirty, stride)
+        if not cleared:
+            return
+        chains += 1
+        for i, bits in enumerate(colors):
+            if bits & cleared:
+                colors[i] = bits & ~cleared
+        dirty = drop_bits(colors, full_mask)
+        if heights is not None:
+            occupied = 0
+            for bits in colors:
+                occupied |= bits
+            for x in range(len(heights)):
+                heights[x] = ((occupied >> (x * stride)) & column_mask).bit_length()
+        yield chains
 
-def new_puyo():
+def find_bit_groups(bits, seeds, stride, min_size=CLEAR_COUNT):
     """
-    新しいぷよを生成し、ボードの一番上に配置する関数
+    指定したセルを含む同じ色の塊のうち、指定の数以上のものを求める関数
 
+    :param bits: 1色分のビットボード
+    :param seeds: 塊を探し始めるセルのビット (その色のぷよがないセルは無視します)
+    :param stride: 1列分のビット数 (ボードの高さ + 1)
+    :param min_size: 返す塊の最小のぷよの数
     :詳細:
-    - グローバル変数`current_puyo`にランダムな色のぷよを割り当てます。
-    - ぷよの初期位置をボード上部の中央に設定します。
+    - 起点の1ビットを上下 (1ビット)・左右 (`stride`ビット) にシフトして広げ、色のビットボードとのANDを取る処理を、
+      増えなくなるまで繰り返して塊を求めます。列の端からはみ出したビットは番兵ビットかボードの外に出るため、
+      色のビットボードとのANDで消え、列をまたいだ隣接は生じません。
+    - 1回の展開で塊の全体が1マスずつ広がるため、繰り返しの回数は塊の大きさではなく直径に比例します。
+    :return: 見つかった塊のビットをすべて合わせたビットボード
     """
-    global current_puyo, current_puyo_x, current_puyo_y
-    current_puyo = random.choice(PUYO_CHARS)
-    current_puyo_x = BOARD_WIDTH // 2
-    current_puyo_y = 0
+    found = 0
+    seeds &= bits
+    while seeds:
+        group = seeds & -seeds
+        while True:
+            grown = (group | (group << 1) | (group >> 1) | (group << stride) | (group >> stride)) & bits
+            if grown == group:
+                break
+            group = grown
+        seeds &= ~group
+        if group.bit_count() >= min_size:
+            found |= group
+    return found
 
-def check_and_clear_puyos():
+def drop_bits(colors, full_mask):
+    """
+    すべての列のぷよをビット演算で同時に落下させる関数
+
+    :param colors: 色ごとのビットボードのリスト (その場で更新する)
+    :param full_mask: ボードのすべてのセルのビット
+    :詳細:
+    - 1つ下のセルが空いているぷよを求め、そのビットをすべての列でまとめて1ビット下へずらします。
+    - 下が空いたぷよがなくなるまで繰り返します (繰り返しの回数は、列ごとの空きの深さとその上のぷよの数で決まります)。
+    - 列の一番下のぷよの「1つ下」は隣の列の番兵ビットで、空きには含めないため、列をまたいで落ちることはありません。
+    :return: 移動したぷよの移動後のビット
+    """
+    occupied = 0
+    for bits in colors:
+        occupied |= bits
+    moved = 0
+    while True:
+        falling = occupied & ((full_mask & ~occupied) << 1)
+        if not falling:
+            return moved
+        for i, bits in enumerate(colors):
+            if bits & falling:
+                colors[i] = (bits & ~falling) | ((bits & falling) >> 1)
+        occupied = (occupied & ~falling) | (falling >> 1)
+        moved = (moved & ~falling) | (falling >> 1)
+
+# --- 盤面の処理 (リストのリストのボード) ---
+def check_and_clear_puyos(board):
     """
     4つ以上のぷよの塊をチェックし、消去する関数
 
+    :param board: ゲームボード (その場で更新する)
     :詳細:
-    - ボード全体を走査し、空でないセルから`find_cluster`関数を呼び出します。
-    - 4つ以上の同じ色のぷよが繋がっているかを確認します。
+    - `find_groups`でボード全体を1回だけ走査し、4つ以上の同じ色のぷよの塊をすべて求めます。
     - ぷよの塊が見つかった場合、それらをボードから消去し、上にあるぷよを落下させます。
     - ぷよが消去された場合はTrueを、そうでない場合はFalseを返します。
     :return: ぷよが消去されたかどうか (bool)
     """
-    cleared_puyos = set()
-    
-    for y in range(BOARD_HEIGHT):
-        for x in range(BOARD_WIDTH):
-            if board[y][x] != "":
-                cluster = set()
-                find_cluster(x, y, board[y][x], cluster)
-                if len(cluster) >= 4:
-                    cleared_puyos.update(cluster)
-    
-    if cleared_puyos:
+    groups = find_groups(board)
+
+    if groups:
         # 識別されたぷよを消去
-        for x, y in cleared_puyos:
-            board[y][x] = ""
-        
+        for group in groups:
+            for x, y in group:
+                board[y][x] = ""
+
         # ぷよを落下させる
-        drop_puyos()
+        drop_puyos(board)
         return True
     return False
 
-def find_cluster(x, y, color, cluster):
+def find_groups(board, min_size=CLEAR_COUNT):
     """
-    再帰的に同じ色の連結したぷよを見つける関数
+    ボード上の同じ色の連結したぷよの塊のうち、指定の数以上のものをすべて求める関数
 
-    :param x: チェックを開始するぷよのX座標
-    :param y: チェックを開始するぷよのY座標
-    :param color: 探すぷよの色
-    :param cluster: 見つかったぷよの座標を格納するセット
+    :param board: ゲームボード
+    :param min_size: 返す塊の最小のぷよの数
     :詳細:
-    - ぷよのボード内での座標が有効であるか、色が一致するか、すでにクラスタに含まれていないかをチェックします。
-    - 条件を満たす場合、そのぷよをクラスタに追加し、隣接する4方向のぷよに対してこの関数を再帰的に呼び出します。
+    - 訪問済みのセルを1つの配列で管理し、未訪問のぷよからスタックを使った塗りつぶしで塊を求めます。
+    - 各セルを一度しか訪問しないため、計算量はセル数に比例します (O(幅 × 高さ))。
+    - 再帰を使わないため、大きなボードでも再帰の深さの上限に達しません。
+    :return: 塊のリスト (各塊は(x, y)のリスト)
     """
-    if not (0 <= x < BOARD_WIDTH and 0 <= y < BOARD_HEIGHT):
-        return
-    if board[y][x] != color or (x, y) in cluster:
-        return
-
-    cluster.add((x, y))
-    find_cluster(x + 1, y, color, cluster)
-    find_cluster(x - 1, y, color, cluster)
-    find_cluster(x, y + 1, color, cluster)
-    find_cluster(x, y - 1, color, cluster)
+    height, width = len(board), len(board[0])
+    visited = [False] * (width * height)
+    groups = []
+    for start in range(width * height):
+        if visited[start]:
+            continue
+        visited[start] = True
+        y, x = divmod(start, width)
+        color = board[y][x]
+        if color == "":
+            continue
+        group = [(x, y)]
+        stack = [(x, y)]
+        while stack:
+            cx, cy = stack.pop()
+            for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                if 0 <= nx < width and 0 <= ny < height and not visited[ny * width + nx] and board[ny][nx] == color:
+                    visited[ny * width + nx] = True
+                    group.append((nx, ny))
+                    stack.append((nx, ny))
+        if len(group) >= min_size:
+            groups.append(group)
+    return groups
 
-def drop_puyos():
+def drop_puyos(board):
     """
     空のスペースを埋めるためにぷよを落下させる関数
 
+    :param board: ゲームボード (その場で更新する)
     :詳細:
     - 各列を上から下へ走査します。
     - 空でないセルを見つけたら、そのぷよを列の一番下の空きスペースに移動させます。
     - これにより、ぷよが下へ自然に落下する効果を生み出します。
     """
-    for x in range(BOARD_WIDTH):
-        empty_y = BOARD_HEIGHT - 1
-        for y in range(BOARD_HEIGHT - 1, -1, -1):
+    height = len(board)
+    for x in range(len(board[0])):
+        empty_y = height - 1
+        for y in range(height - 1, -1, -1):
             if board[y][x] != "":
                 board[empty_y][x] = board[y][x]
                 if empty_y != y:
                     board[y][x] = ""
                 empty_y -= 1
 
+# --- 画面表示 ---
+def clear_screen():
+    """
+    画面をクリアする関数
+
+    :詳細:
+    Windows環境では 'cls' コマンド、macOS/Linux環境では 'clear' コマンドを使用して、
+    コンソールの表示をクリアします。
+    """
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+def draw_board(state):
+    """
+    現在のゲームボードを画面に描画する関数
+
+    :param state: 描画するGameState
+    :詳細:
+    - 画面をクリアし、ゲームのタイトルを表示します。
+    - ゲームボードの各セルをループでチェックし、ぷよや空のセル("・")を配置して表示します。
+    - 現在操作中のぷよもボード上の正しい位置に描画します。
+    - 最後に操作説明のテキストを表示します。
+    """
+    clear_screen()
+    print("==================")
+    print("  ぷよぷよ (Python)  ")
+    print("==================")
+
+    board = state.board
+    for y in range(state.height):
+        row_str = ""
+        for x in range(state.width):
+            if state.current_puyo and x == state.current_x and y == state.current_y:
+                row_str += state.current_puyo + " "
+            elif board[y][x] != "":
+                row_str += board[y][x] + " "
+            else:
+                row_str += "・ "
+        print(row_str)
+
+    print("------------------")
+    print("  ←: 左, →: 右, ↓: 落下, X: 終了")
+
 # --- メインゲームループ ---
 def run_game():
     """
     ゲームを実行するメインの関数
 
     :詳細:
-    - `new_puyo()`を呼び出して最初のぷよを生成します。
-    - 無限ループに入り、以下の処理を繰り返します。
-        - ユーザーのキー入力を処理し、ぷよを移動させます。
-        - ぷよが落下可能かどうかをチェックし、可能であれば1マス下に移動させます。
-        - 落下不可であれば、ぷよをボードに固定し、ゲームオーバーやぷよの消去判定を行います。
-        - `X`キーが押された場合はループを抜けてゲームを終了します。
+    - `GameState`を作り、無限ループで以下の処理を繰り返します。
+        - ユーザーのキー入力を操作に変換し、`GameState.step_chains`で1ティック進めます。
+        - 連鎖が起きた場合は、1段ごとにボードを描画して少し待ちます。
+        - ゲームオーバーになるか、`X`キーが押された場合はループを抜けてゲームを終了します。
+    - キー入力にはWindows固有の`msvcrt`を使うため、ほかの環境ではメッセージを表示して終了します。
     """
-    global current_puyo_x, current_puyo_y
+    try:
+        import msvcrt  # Windows固有のキーボード入力を扱うライブラリ (シミュレーションには不要)
+    except ImportError:
+        print("キー入力にmsvcrtを使うため、画面版はWindowsのコンソールで実行してください。")
+        return
 
-    new_puyo()
+    state = GameState()
 
     while True:
-        draw_board()
+        draw_board(state)
 
         # Windows環境での非ブロッキングなキー入力を処理
+        action = None
         if msvcrt.kbhit():
             key = msvcrt.getch()
-            
+
             # 矢印キーの処理
             if key == b'\xe0' or key == b'\x00':
                 key = msvcrt.getch()
-                if key == b'K' and current_puyo_x > 0: # 左矢印
-                    current_puyo_x -= 1
-                elif key == b'M' and current_puyo_x < BOARD_WIDTH - 1: # 右矢印
-                    current_puyo_x += 1
-                elif key == b'P': # 下矢印
-                    # 一番下までぷよを落下させる
-                    while current_puyo_y + 1 < BOARD_HEIGHT and board[current_puyo_y + 1][current_puyo_x] == "":
-                        current_puyo_y += 1
+                action = {b'K': "left", b'M': "right", b'P': "down"}.get(key)  # 左・右・下矢印
             elif key.lower() == b'x':
-                break # ゲームループを終了
-        
-        # 衝突判定
-        if current_puyo_y + 1 >= BOARD_HEIGHT or board[current_puyo_y + 1][current_puyo_x] != "":
-            # ぷよをボードに固定
-            board[current_puyo_y][current_puyo_x] = current_puyo
-            
-            # ゲームオーバー判定 (ぷよが最上段に配置された場合)
-            if current_puyo_y == 0:
-                draw_board()
-                print("==================")
-                print("   ゲームオーバー   ")
-                print("==================")
-                break
-                
-            # 消去するぷよの塊をチェック
-            while check_and_clear_puyos():
-                draw_board()
-                time.sleep(0.5)
-            
-            new_puyo()
-        else:
-            # ぷよを1マス下に移動
-            current_puyo_y += 1
-            
+                break  # ゲームループを終了
+
+        for _ in state.step_chains(action):
+            draw_board(state)
+            time.sleep(0.5)  # 連鎖を1段ずつ見やすくする待機
+
+        if state.game_over:
+            draw_board(state)
+            print("==================")
+            print("   ゲームオーバー   ")
+            print("==================")
+            break
+
         time.sleep(0.2)
 
 if __name__ == "__main__":
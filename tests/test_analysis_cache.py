@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# 子プロセスで同じ局面を2回解析し、1回目の結果と2回目のノード数・cachedを出力するスクリプト
+# （解析キャッシュのファイルは引数で渡し、テストごとに空のファイルから始める）
+CACHE_SCRIPT = """
+import sys
+import othello
+import othello_engine
+
+othello.ANALYSIS_CACHE_PATH = sys.argv[1]
+second_time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else None
+board = [row[:] for row in othello.INITIAL_BOARD]
+first = othello_engine.analyze_position(board, othello.PLAYER_STONE, depth=4)
+othello.TRANSPOSITION_TABLE.clear()  # 置換表ではなく解析キャッシュから返ることを確かめる
+second = othello_engine.analyze_position(board, othello.PLAYER_STONE, depth=4, time_limit=second_time_limit)
+print(first["move"], first["score"], first["nodes"], int(first["cached"]))
+print(second["move"], second["score"], second["nodes"], int(second["cached"]))
+"""
+
+def analyze_twice(*args):
+    """
+    空の解析キャッシュで同じ局面を2回解析する。
+
+    引数:
+        args: 2回目の解析の時間制限（秒）。省略すれば時間制限なし
+
+    戻り値:
+        list: 1回目と2回目の [最善手, 評価値, ノード数, cached(0/1)]
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "analysis.sqlite3")
+        output = subprocess.run([sys.executable, "-c", CACHE_SCRIPT, path, *args], cwd=SRC_DIR,
+                                env=dict(os.environ, OTHELLO_BOARD_SIZE="8"),
+                                capture_output=True, text=True, check=True).stdout
+    return [line.split() for line in output.splitlines()]
+
+class AnalysisCacheTest(unittest.TestCase):
+    """analyze_positionが解析キャッシュを通り、同じ局面の2回目は探索せずに返すか確かめる。"""
+
+    def test_second_analysis_is_served_from_cache(self):
+        first, second = analyze_twice()
+        self.assertEqual(first[3], "0")
+        self.assertGreater(int(first[2]), 0)
+        self.assertEqual(second, [first[0], first[1], "0", "1"])
+
+    def test_timed_analysis_uses_entry_of_same_depth(self):
+        first, second = analyze_twice("10")
+        self.assertEqual(second, [first[0], first[1], "0", "1"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# 子プロセスで標準入力の局面をrun_streamで解析し、書き出した結果をそのまま標準出力に出すスクリプト
+STREAM_SCRIPT = """
+import sys
+import othello_engine
+
+othello_engine.run_stream(sys.stdin, sys.stdout, depth=2)
+"""
+
+def run_stream(requests):
+    """
+    8x8の子プロセスでストリームモードを実行する。
+
+    引数:
+        requests: 1行ずつ書くJSONの辞書のリスト（"position" がなければ初期局面を補う）
+
+    戻り値:
+        list: 書き出された結果の辞書のリスト
+    """
+    initial = "." * 27 + "@O" + "." * 6 + "O@" + "." * 27 + " @"
+    lines = [json.dumps({"position": initial, **request}) for request in requests]
+    output = subprocess.run([sys.executable, "-c", STREAM_SCRIPT], cwd=SRC_DIR, input="\n".join(lines) + "\n",
+                            env=dict(os.environ, OTHELLO_BOARD_SIZE="8"),
+                            capture_output=True, text=True, check=True).stdout
+    return [json.loads(line) for line in output.splitlines()]
+
+class StreamModeTest(unittest.TestCase):
+    """ストリームモードで、指定の型が正しくない行がその行のエラーになり、続く行を解析できるか確かめる。"""
+
+    def test_invalid_values_are_reported_per_line(self):
+        requests = [{"depth": "3"}, {"time": "1"}, {"depth": True}, {"depth": 0}, {"solve": 1},
+                    {"board": 5}, {"stone": 1}, {"depth": 1, "id": "ok"}]
+        records = run_stream(requests)
+        self.assertEqual(len(records), len(requests))
+        for number, record in enumerate(records[:-1], 1):
+            self.assertEqual(record["line"], number)
+            self.assertIn("error", record)
+        self.assertEqual(records[-1]["id"], "ok")
+        self.assertEqual(records[-1]["depth"], 1)
+        self.assertNotIn("error", records[-1])
+
+if __name__ == "__main__":
+    unittest.main()
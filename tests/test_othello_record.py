@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# 子プロセスで1局を最後まで打ち、棋譜に書いて読み戻し、同じ手順と最後の局面になるか確かめるスクリプト
+# （盤面の大きさは起動時に環境変数OTHELLO_BOARD_SIZEから決まるため、大きさごとに別のプロセスで実行する）
+ROUNDTRIP_SCRIPT = """
+import othello
+import othello_record
+
+board = [row[:] for row in othello.INITIAL_BOARD]
+stone = othello.PLAYER_STONE
+moves = []
+passes = 0
+while passes < 2:
+    valid_moves = othello.get_valid_moves(board, stone)
+    if valid_moves:
+        row, col = valid_moves[len(valid_moves) // 2]
+        othello.flip_stones(board, row, col, stone)
+        moves.append(othello.move_to_text(1 << (row * othello.BOARD_SIZE + col)))
+        passes = 0
+    else:
+        passes += 1
+    stone = othello.COMPUTER_STONE if stone == othello.PLAYER_STONE else othello.PLAYER_STONE
+line = othello.format_game_record(moves, {"board_size": othello.BOARD_SIZE})
+parsed, metadata = othello_record.parse_record(line)
+assert parsed == moves, "手順が一致しません"
+assert metadata["board_size"] == othello.BOARD_SIZE
+for replayed, stone, move in othello_record.replay_game(parsed):
+    if move is not None:
+        last = (stone, move)
+othello.flip_stones(replayed, *last[1], last[0])  # replay_gameは着手前の局面を返すので最後の手を打つ
+assert replayed == board, "最後の局面が一致しません"
+print(len(moves), sum(len(move) == 3 for move in moves))
+"""
+
+def run_roundtrip(size):
+    """
+    盤面の大きさを変えた子プロセスで棋譜の読み書きを確かめる。
+
+    引数:
+        size: 盤面の一辺
+
+    戻り値:
+        tuple: (打った手の数, 3文字の手の数)
+    """
+    env = dict(os.environ, OTHELLO_BOARD_SIZE=str(size))
+    output = subprocess.run([sys.executable, "-c", ROUNDTRIP_SCRIPT], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    moves, long_moves = map(int, output.split())
+    return moves, long_moves
+
+class GameRecordRoundTripTest(unittest.TestCase):
+    """棋譜をformat_game_recordで書き、parse_recordとreplay_gameで読み戻せるか確かめる。"""
+
+    def test_8x8(self):
+        moves, long_moves = run_roundtrip(8)
+        self.assertGreater(moves, 0)
+        self.assertEqual(long_moves, 0)
+
+    def test_10x10(self):
+        moves, long_moves = run_roundtrip(10)
+        self.assertGreater(long_moves, 0)  # "a10" のような3文字の手を含む
+
+    def test_12x12(self):
+        moves, long_moves = run_roundtrip(12)
+        self.assertGreater(long_moves, 0)
+
+    def test_other_board_size_is_rejected(self):
+        env = dict(os.environ, OTHELLO_BOARD_SIZE="8")
+        script = ("import othello_record\n"
+                  "try:\n"
+                  "    othello_record.parse_record('a10b3\\t{\"board_size\": 10}')\n"
+                  "except ValueError:\n"
+                  "    print('rejected')\n")
+        output = subprocess.run([sys.executable, "-c", script], cwd=SRC_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "rejected")
+
+if __name__ == "__main__":
+    unittest.main()